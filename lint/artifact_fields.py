@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Cheddar Artifact Fields
+
+Shared reading of artifact fields that several lint tools interpret the
+same way:
+
+    - artifact types: the type each level names in schemas, thresholds,
+      policies and role catalogs ("mission" -> "mission_definition"),
+    - timestamps: lineage.timestamp, documentation_log.last_updated, key
+      validity windows and session times, as ISO 8601 strings or YAML
+      dates/datetimes. Naive values are UTC.
+
+Usage:
+    from artifact_fields import LEVEL_TYPES, parse_datetime, parse_timestamp
+    
+    LEVEL_TYPES.get(level, level)                # Artifact type of a level
+    parse_datetime("2026-01-15T10:00:00Z")       # aware datetime
+    parse_timestamp("2026-01-15")                # epoch seconds
+"""
+
+from datetime import date, datetime, timezone
+from typing import Optional
+
+# Artifact type of each level; other levels are their own type
+LEVEL_TYPES = {
+    "mission": "mission_definition",
+    "personal": "personal_artifact",
+}
+
+
+def parse_datetime(value: object) -> Optional[datetime]:
+    """Aware datetime of an ISO 8601 timestamp or date (naive means UTC), or None."""
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, date):
+        moment = datetime(value.year, value.month, value.day)
+    elif isinstance(value, str) and value:
+        try:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def parse_timestamp(value: object) -> Optional[float]:
+    """Epoch seconds of an ISO 8601 timestamp or date (naive means UTC), or None."""
+    moment = parse_datetime(value)
+    return None if moment is None else moment.timestamp()
+
+
+def format_timestamp(epoch: float) -> str:
+    """ISO 8601 UTC form of epoch seconds."""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
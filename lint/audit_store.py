@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+Cheddar AI Audit Store
+
+Stores AI session logs (ai_audit/README.md) and answers audit queries from
+sidecar indexes instead of parsing every session file.
+
+Session logs are immutable YAML files under
+ai_audit/sessions/{YYYY}/{MM}/{DD}/session_{uuid}.yaml. The index
+(SQLite, .cheddar/cache/audit-index.sqlite) records for each session:
+
+    - its id, file, start/end time and outcome (time-range queries use an
+      index on the start time),
+    - every action with its type, the artifact it touched and its approval
+      status (artifact -> sessions, action type -> sessions and
+      approval status -> sessions are index lookups),
+    - the artifacts loaded into its context.
+
+Queries read only the index rows that match; session files are opened only
+when full records are exported. Results stream, so exporting millions of
+matches runs in constant memory.
+
+Sessions are never rewritten, so refreshing the index only lists day
+directories whose mtime changed and parses files it has not seen. The index
+holds nothing that is not in the session files: `rebuild` recreates it from
+scratch. One index file may serve several audit roots; every query and
+rebuild only sees the rows of files under its own root.
+
+Usage:
+    python audit_store.py query --artifact brief_prkin_v1 --action write
+    python audit_store.py query --status pending_review --since 2026-01-01
+    python audit_store.py query --artifact brief_prkin_v1 --ndjson --full > export.ndjson
+    python audit_store.py index      # Pick up new session files
+    python audit_store.py rebuild    # Recreate the index from the session files
+
+Exit codes:
+    0 - Success
+    2 - Usage/configuration error
+    3 - Internal error
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+import yaml
+
+from artifact_fields import format_timestamp, parse_timestamp
+from loader import load_yaml_file
+from schema_registry import find_cache_dir
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+INDEX_FILE_NAME = "audit-index.sqlite"
+
+# Session ids become file names, so they are limited to these characters
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+\Z")
+
+# Action types matched by `--action write`
+WRITE_ACTIONS = ("append", "create", "delete", "modify", "update", "write")
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    session_id TEXT,
+    started REAL,
+    ended REAL,
+    outcome TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS actions (
+    session INTEGER NOT NULL,
+    type TEXT,
+    artifact TEXT,
+    status TEXT,
+    at REAL
+);
+CREATE TABLE IF NOT EXISTS loaded (
+    session INTEGER NOT NULL,
+    artifact TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started);
+CREATE INDEX IF NOT EXISTS actions_artifact ON actions (artifact, type);
+CREATE INDEX IF NOT EXISTS actions_type ON actions (type);
+CREATE INDEX IF NOT EXISTS actions_status ON actions (status);
+CREATE INDEX IF NOT EXISTS loaded_artifact ON loaded (artifact);
+"""
+
+
+def find_audit_root() -> Path:
+    """Locate the default audit directory (ai_audit at repo root)."""
+    return Path(__file__).parent.parent / "ai_audit"
+
+
+def action_artifact(action: dict) -> Optional[str]:
+    """Id of the artifact an action touched, if it names one."""
+    artifact = action.get("artifact") or action.get("artifact_id")
+    if artifact:
+        return str(artifact)
+    target = action.get("target")
+    if isinstance(target, str) and target.endswith((".yaml", ".yml")):
+        return Path(target).stem
+    return None
+
+
+def approval_status(action: dict) -> Optional[str]:
+    """Approval status of an action: its status, or approved if approved_by is set."""
+    status = action.get("status")
+    if status:
+        return str(status)
+    if action.get("approved_by"):
+        return "approved"
+    return None
+
+
+def index_rows(session: object) -> tuple[dict, list[tuple], list[str]]:
+    """
+    Index fields of a parsed session log.
+    
+    Returns (session fields, action rows (type, artifact, status, at),
+    loaded artifact ids).
+    """
+    if not isinstance(session, dict) or not isinstance(session.get("ai_session"), dict):
+        raise ValueError("Not an ai_session document")
+    body = session["ai_session"]
+    
+    outcome = body.get("outcome")
+    fields = {
+        "session_id": body.get("session_id"),
+        "started": parse_timestamp(body.get("timestamp_start")),
+        "ended": parse_timestamp(body.get("timestamp_end")),
+        "outcome": outcome.get("status") if isinstance(outcome, dict) else None,
+    }
+    
+    actions = []
+    for action in body.get("actions") or []:
+        if not isinstance(action, dict):
+            continue
+        actions.append((
+            action.get("type"),
+            action_artifact(action),
+            approval_status(action),
+            parse_timestamp(action.get("timestamp")),
+        ))
+    
+    context = body.get("context")
+    loaded = []
+    if isinstance(context, dict):
+        for entry in context.get("artifacts_loaded") or []:
+            if isinstance(entry, dict) and entry.get("id"):
+                loaded.append(str(entry["id"]))
+    
+    return fields, actions, loaded
+
+
+class AuditStore:
+    """Session log directory plus its SQLite sidecar index."""
+    
+    def __init__(self, root: Path, index_path: Path):
+        self.root = Path(os.path.abspath(root))
+        self.sessions_dir = self.root / "sessions"
+        if str(index_path) != ":memory:":
+            Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(index_path))
+        self.conn.executescript(SCHEMA_SQL)
+    
+    def close(self) -> None:
+        self.conn.close()
+    
+    def _scope(self) -> tuple[str, str]:
+        """Bounds of the index paths under this store's sessions directory."""
+        prefix = str(self.sessions_dir) + os.sep
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+    
+    def session_path(self, session_id: str, started: float) -> Path:
+        """
+        Where a session starting at epoch seconds started is stored.
+        
+        Raises ValueError for a session id that is not a plain file name
+        part (see SESSION_ID_PATTERN).
+        """
+        if not SESSION_ID_PATTERN.match(str(session_id)):
+            raise ValueError(f"Invalid session_id: {session_id!r}")
+        day = format_timestamp(started)[:10].split("-")
+        return self.sessions_dir.joinpath(*day) / f"session_{session_id}.yaml"
+    
+    def record(self, session: dict) -> Path:
+        """
+        Write a new session log and index it.
+        
+        Raises ValueError for a session without id or start time or with an
+        invalid id, and FileExistsError if the session was already recorded.
+        """
+        fields, actions, loaded = index_rows(session)
+        if not fields["session_id"] or fields["started"] is None:
+            raise ValueError("ai_session needs session_id and timestamp_start")
+        
+        path = self.session_path(fields["session_id"], fields["started"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            yaml.dump(session, f, Dumper=SafeDumper, sort_keys=False, allow_unicode=True)
+        try:
+            # Session logs are immutable: never replace an existing one
+            os.link(tmp_path, path)
+        finally:
+            os.unlink(tmp_path)
+        
+        with self.conn:
+            self._insert(os.path.abspath(path), fields, actions, loaded, None)
+        return path
+    
+    def _insert(
+        self,
+        path: str,
+        fields: dict,
+        actions: list[tuple],
+        loaded: list[str],
+        error: Optional[str]
+    ) -> None:
+        cursor = self.conn.execute(
+            "INSERT INTO sessions (path, session_id, started, ended, outcome, error) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (path, fields.get("session_id"), fields.get("started"),
+             fields.get("ended"), fields.get("outcome"), error),
+        )
+        session = cursor.lastrowid
+        self.conn.executemany(
+            "INSERT INTO actions (session, type, artifact, status, at) VALUES (?, ?, ?, ?, ?)",
+            [(session,) + action for action in actions],
+        )
+        self.conn.executemany(
+            "INSERT INTO loaded (session, artifact) VALUES (?, ?)",
+            [(session, artifact) for artifact in loaded],
+        )
+    
+    def _day_dirs(self) -> Iterator[str]:
+        """Every sessions/{YYYY}/{MM}/{DD} directory."""
+        dirs = [str(self.sessions_dir)]
+        for _ in range(3):
+            children = []
+            for directory in dirs:
+                try:
+                    with os.scandir(directory) as entries:
+                        children.extend(
+                            entry.path for entry in entries
+                            if entry.is_dir() and not entry.name.startswith(".")
+                        )
+                except FileNotFoundError:
+                    continue
+            dirs = sorted(children)
+        return iter(dirs)
+    
+    def refresh(self) -> dict:
+        """
+        Index session files added since the last refresh.
+        
+        Only day directories whose mtime changed are listed. Returns
+        {"sessions_indexed", "sessions_failed"}.
+        """
+        known_dirs = dict(self.conn.execute("SELECT path, mtime_ns FROM dirs"))
+        indexed = 0
+        failed = 0
+        
+        for directory in self._day_dirs():
+            mtime_ns = os.stat(directory).st_mtime_ns
+            if known_dirs.get(directory) == mtime_ns:
+                continue
+            
+            known = {
+                row[0] for row in self.conn.execute(
+                    "SELECT path FROM sessions WHERE path >= ? AND path < ?",
+                    (directory + os.sep, directory + chr(ord(os.sep) + 1)),
+                )
+            }
+            with self.conn:
+                for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+                    if (
+                        not entry.name.startswith("session_")
+                        or not entry.name.endswith((".yaml", ".yml"))
+                        or entry.path in known
+                    ):
+                        continue
+                    try:
+                        fields, actions, loaded = index_rows(load_yaml_file(Path(entry.path)))
+                        error = None
+                        indexed += 1
+                    except Exception as e:
+                        # Recorded so a broken file is not re-parsed on every refresh
+                        fields, actions, loaded = {}, [], []
+                        error = str(e)
+                        failed += 1
+                    self._insert(entry.path, fields, actions, loaded, error)
+                
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO dirs (path, mtime_ns) VALUES (?, ?)",
+                    (directory, mtime_ns),
+                )
+        
+        return {"sessions_indexed": indexed, "sessions_failed": failed}
+    
+    def rebuild(self) -> dict:
+        """Discard this root's index rows and re-create them from the session files."""
+        scope = self._scope()
+        sessions = "SELECT id FROM sessions WHERE path >= ? AND path < ?"
+        with self.conn:
+            for table in ("actions", "loaded"):
+                self.conn.execute(f"DELETE FROM {table} WHERE session IN ({sessions})", scope)
+            for table in ("sessions", "dirs"):
+                self.conn.execute(f"DELETE FROM {table} WHERE path >= ? AND path < ?", scope)
+        return self.refresh()
+    
+    def query(
+        self,
+        artifact: Optional[str] = None,
+        action: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[dict]:
+        """
+        Sessions under this store's root matching every given filter,
+        oldest first.
+        
+        artifact, action and status must hold for the same action; with
+        only artifact given, sessions that loaded the artifact into their
+        context match too. action "write" matches every WRITE_ACTIONS type.
+        since/until bound the session start time (epoch seconds).
+        """
+        conditions = ["path >= ? AND path < ?"]
+        params: list = list(self._scope())
+        
+        if artifact is not None or action is not None or status is not None:
+            matches = []
+            if artifact is not None:
+                matches.append("artifact = ?")
+                params.append(artifact)
+            if action is not None:
+                types = WRITE_ACTIONS if action == "write" else (action,)
+                matches.append(f"type IN ({', '.join('?' for _ in types)})")
+                params.extend(types)
+            if status is not None:
+                matches.append("status = ?")
+                params.append(status)
+            subquery = f"SELECT session FROM actions WHERE {' AND '.join(matches)}"
+            if action is None and status is None:
+                subquery += " UNION SELECT session FROM loaded WHERE artifact = ?"
+                params.append(artifact)
+            conditions.append(f"id IN ({subquery})")
+        
+        if since is not None:
+            conditions.append("started >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("started < ?")
+            params.append(until)
+        conditions.append("error IS NULL")
+        
+        sql = (
+            "SELECT session_id, path, started, ended, outcome FROM sessions "
+            f"WHERE {' AND '.join(conditions)} ORDER BY started, path"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        for session_id, path, started, ended, outcome in self.conn.execute(sql, params):
+            yield {
+                "session_id": session_id,
+                "file": path,
+                "timestamp_start": format_timestamp(started) if started is not None else None,
+                "timestamp_end": format_timestamp(ended) if ended is not None else None,
+                "outcome": outcome,
+            }
+    
+    def failures(self) -> list[dict]:
+        """Session files under this store's root that could not be indexed."""
+        return [
+            {"file": path, "message": error}
+            for path, error in self.conn.execute(
+                "SELECT path, error FROM sessions "
+                "WHERE path >= ? AND path < ? AND error IS NOT NULL ORDER BY path",
+                self._scope(),
+            )
+        ]
+
+
+def export_ndjson(results: Iterator[dict], out: TextIO, full: bool = False) -> int:
+    """
+    Stream query results as one JSON object per line.
+    
+    With full, each line also carries the session log itself, read only for
+    the matching sessions. Returns the number of lines written.
+    """
+    count = 0
+    for result in results:
+        if full:
+            result = dict(result, session=load_yaml_file(Path(result["file"])))
+        out.write(json.dumps(result, default=str))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def parse_bound(value: Optional[str]) -> Optional[float]:
+    """--since/--until value as epoch seconds; raises ValueError if invalid."""
+    if value is None:
+        return None
+    epoch = parse_timestamp(value)
+    if epoch is None:
+        raise ValueError(f"Invalid timestamp: {value}")
+    return epoch
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Index and query Cheddar AI session audit logs."
+    )
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=None,
+        help="Audit directory holding sessions/ (default: ai_audit/)",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        help=f"Index file (default: <cache dir>/{INDEX_FILE_NAME})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    query = commands.add_parser("query", help="Find sessions by artifact, action, status or time")
+    query.add_argument("--artifact", help="Artifact id the session touched")
+    query.add_argument("--action", help="Action type (write matches every write type)")
+    query.add_argument("--status", help="Approval status of an action, e.g. pending_review")
+    query.add_argument("--since", help="Sessions starting at or after this ISO 8601 time")
+    query.add_argument("--until", help="Sessions starting before this ISO 8601 time")
+    query.add_argument("--limit", type=int, help="Return at most this many sessions")
+    query.add_argument(
+        "--full",
+        action="store_true",
+        help="Include each session log (with --ndjson)",
+    )
+    output = query.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="Output results as a JSON array")
+    output.add_argument("--ndjson", action="store_true", help="Stream results as NDJSON")
+    
+    commands.add_parser("index", help="Index session files added since the last run")
+    commands.add_parser("rebuild", help="Recreate the index from the session files")
+    
+    args = parser.parse_args()
+    
+    root = args.root if args.root is not None else find_audit_root()
+    if not root.is_dir():
+        print(f"Error: Audit directory not found: {root}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    if args.command == "query":
+        try:
+            since = parse_bound(args.since)
+            until = parse_bound(args.until)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+        if args.full and not args.ndjson:
+            print("Error: --full needs --ndjson", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+    
+    try:
+        store = AuditStore(root, args.index or find_cache_dir() / INDEX_FILE_NAME)
+        try:
+            if args.command == "rebuild":
+                stats = store.rebuild()
+            else:
+                stats = store.refresh()
+            
+            if args.command != "query":
+                print(
+                    f"Indexed {stats['sessions_indexed']} session(s)"
+                    f" ({stats['sessions_failed']} failed)"
+                )
+                for failure in store.failures():
+                    print(f"  ⚠ {failure['file']}: {failure['message']}")
+                return EXIT_SUCCESS
+            
+            results = store.query(
+                artifact=args.artifact,
+                action=args.action,
+                status=args.status,
+                since=since,
+                until=until,
+                limit=args.limit,
+            )
+            if args.ndjson:
+                export_ndjson(results, sys.stdout, full=args.full)
+            elif args.json:
+                print(json.dumps(list(results), indent=2))
+            else:
+                count = 0
+                for result in results:
+                    print(
+                        f"  {result['timestamp_start']}  {result['session_id']}  {result['file']}"
+                    )
+                    count += 1
+                print(f"{count} session(s)")
+        finally:
+            store.close()
+        
+        return EXIT_SUCCESS
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
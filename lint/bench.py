@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Cheddar Lint Benchmark Suite
+
+Measures how the lint tools scale on synthetic corpora (see gen_corpus.py)
+and compares runs against stored baselines.
+
+For every corpus size:
+
+    - each tool (validate_artifact, compute_hash --verify, verify_lineage,
+      run_all) runs as its own process with caches disabled, and its wall
+      time, CPU time, peak RSS and throughput (files per second) are
+      recorded; repeated runs report the median wall time,
+    - the pipeline stages (discover, parse, validate, hash, chain) are timed
+      in-process to show where the time goes.
+
+Corpora are generated once into the work directory and reused while their
+generation options are unchanged.
+
+Baselines are saved under .cheddar/bench/baselines/<name>.json. Comparing
+against one flags every tool whose wall time or peak RSS grew by more than
+the tolerance. Baselines are only meaningful on the machine that made them.
+
+Usage:
+    python bench.py --sizes 100,1000,10000
+    python bench.py --sizes 1000,100000 --save-baseline main
+    python bench.py --sizes 1000,100000 --compare main --tolerance 0.15
+    python bench.py --sizes 10000 --faults hash=0.01 --json
+
+Exit codes:
+    0 - Benchmarks ran (no regressions when comparing)
+    1 - Regression against the baseline
+    2 - Usage/configuration error
+    3 - Internal error
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from compute_hash import compute_hash
+from corpus import ArtifactCorpus
+from gen_corpus import CorpusSpec, ensure_corpus, parse_fanout, parse_faults
+from parallel import default_jobs
+from schema_registry import SchemaRegistry, find_cache_dir
+from validate_artifact import validate_corpus
+from verify_lineage import verify_chain
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_REGRESSION = 1
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+LINT_DIR = Path(__file__).parent
+
+DEFAULT_SIZES = (100, 1000, 10000)
+
+DEFAULT_TOLERANCE = 0.10
+
+# Tool name -> command line (after the interpreter); {corpus} and {jobs} are filled in
+TOOLS = {
+    "validate_artifact": ["validate_artifact.py", "{corpus}", "-r", "-j", "{jobs}"],
+    "compute_hash": ["compute_hash.py", "{corpus}", "-r", "--verify", "-j", "{jobs}"],
+    "verify_lineage": ["verify_lineage.py", "{corpus}", "-r"],
+    "run_all": ["run_all.py", "{corpus}", "-r", "--no-cache", "-j", "{jobs}"],
+}
+
+# Exit codes that mean the tool ran (1 = it found the injected faults)
+TOOL_OK_EXIT_CODES = (0, 1)
+
+# Metrics compared against a baseline
+COMPARED_METRICS = ("wall_s", "peak_rss_mb")
+
+
+def find_bench_dir() -> Path:
+    """Locate the default benchmark directory (.cheddar/bench at repo root)."""
+    return find_cache_dir().parent / "bench"
+
+
+# Runs in a minimal child interpreter. A child's peak RSS includes its
+# parent's at fork, so tools are spawned from this small process rather
+# than from the benchmark process with its corpora and imports.
+LAUNCHER_SOURCE = """
+import json, os, subprocess, sys, time
+for line in sys.stdin:
+    command = json.loads(line)
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    print(json.dumps({
+        "wall_s": time.perf_counter() - start,
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        "peak_rss_kb": usage.ru_maxrss,
+        "exit_code": os.waitstatus_to_exitcode(status),
+    }), flush=True)
+"""
+
+
+class ToolLauncher:
+    """Spawns tool processes and reports their wall time, CPU time and peak RSS."""
+    
+    def __init__(self, env: Optional[dict] = None):
+        # Tools inherit env (default: this process's environment)
+        self.process = subprocess.Popen(
+            [sys.executable, "-S", "-c", LAUNCHER_SOURCE],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            env=env,
+        )
+    
+    def close(self) -> None:
+        self.process.stdin.close()
+        self.process.wait()
+    
+    def run(self, command: list[str]) -> dict:
+        self.process.stdin.write(json.dumps(command) + "\n")
+        self.process.stdin.flush()
+        measured = json.loads(self.process.stdout.readline())
+        return {
+            "wall_s": measured["wall_s"],
+            "cpu_s": measured["cpu_s"],
+            # ru_maxrss is in KiB on Linux; wait4 covers the workers it reaped too
+            "peak_rss_mb": measured["peak_rss_kb"] / 1024,
+            "exit_code": measured["exit_code"],
+        }
+
+
+def tool_command(name: str, corpus_dir: Path, jobs: int) -> list[str]:
+    """Command line running one tool on a corpus."""
+    return [sys.executable] + [
+        str(LINT_DIR / part) if part.endswith(".py") else part.format(corpus=corpus_dir, jobs=jobs)
+        for part in TOOLS[name]
+    ]
+
+
+def measure_tool(
+    launcher: ToolLauncher,
+    name: str,
+    corpus_dir: Path,
+    files: int,
+    jobs: int,
+    repeat: int
+) -> dict:
+    """Median wall time and largest peak RSS over repeat runs of a tool."""
+    command = tool_command(name, corpus_dir, jobs)
+    runs = [launcher.run(command) for _ in range(repeat)]
+    wall = statistics.median(run["wall_s"] for run in runs)
+    failed = [run["exit_code"] for run in runs if run["exit_code"] not in TOOL_OK_EXIT_CODES]
+    return {
+        "wall_s": round(wall, 4),
+        "cpu_s": round(statistics.median(run["cpu_s"] for run in runs), 4),
+        "peak_rss_mb": round(max(run["peak_rss_mb"] for run in runs), 1),
+        "files_per_s": round(files / wall, 1) if wall else None,
+        "exit_code": failed[0] if failed else runs[0]["exit_code"],
+    }
+
+
+def measure_stages(corpus_dir: Path, jobs: int) -> dict:
+    """Seconds spent in each pipeline stage, run in-process without caches."""
+    stages = {}
+    paths = [corpus_dir]
+    
+    start = time.perf_counter()
+    ArtifactCorpus.discover(paths, recursive=True)
+    stages["discover"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    corpus = ArtifactCorpus.load(paths, True, jobs)
+    stages["parse"] = time.perf_counter() - start - stages["discover"]
+    
+    start = time.perf_counter()
+    validate_corpus(corpus, SchemaRegistry(), jobs)
+    stages["validate"] = time.perf_counter() - start
+    
+    artifacts = corpus.lineage_artifacts()
+    start = time.perf_counter()
+    for artifact in artifacts:
+        if "documentation_log" not in artifact:
+            compute_hash(artifact)
+    stages["hash"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    verify_chain(artifacts, skip_hash_verify=True)
+    stages["chain"] = time.perf_counter() - start
+    
+    return {stage: round(seconds, 4) for stage, seconds in stages.items()}
+
+
+def run_benchmarks(
+    specs: list[CorpusSpec],
+    work_dir: Path,
+    tools: list[str],
+    jobs: int,
+    repeat: int,
+    stages: bool = True
+) -> dict:
+    """
+    Benchmark every tool on the corpus of every spec.
+    
+    Returns {"environment": {...}, "results": {"<artifacts>": {...}}}.
+    """
+    report = {
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": default_jobs(),
+            "jobs": jobs,
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+    
+    launcher = ToolLauncher()
+    try:
+        for spec in specs:
+            report["results"][str(spec.artifacts)] = _benchmark_corpus(
+                launcher, spec, work_dir, tools, jobs, repeat, stages
+            )
+    finally:
+        launcher.close()
+    
+    return report
+
+
+def _benchmark_corpus(
+    launcher: ToolLauncher,
+    spec: CorpusSpec,
+    work_dir: Path,
+    tools: list[str],
+    jobs: int,
+    repeat: int,
+    stages: bool
+) -> dict:
+    """Generate (or reuse) one corpus and benchmark every tool on it."""
+    corpus_dir = work_dir / f"n{spec.artifacts}"
+    print(f"Preparing corpus of {spec.artifacts} artifact(s) in {corpus_dir}", file=sys.stderr)
+    manifest = ensure_corpus(spec, corpus_dir, jobs)
+    
+    result = {
+        "artifacts": manifest["artifacts"],
+        "logs": manifest["logs"],
+        "spec": manifest["spec"],
+        "files": len(ArtifactCorpus.discover([corpus_dir], recursive=True)),
+        "tools": {},
+    }
+    files = result["files"]
+    
+    for name in tools:
+        print(f"  {name} ...", file=sys.stderr)
+        result["tools"][name] = measure_tool(launcher, name, corpus_dir, files, jobs, repeat)
+    
+    # After the tools, so the corpus loaded here is gone before they run
+    if stages:
+        result["stages"] = measure_stages(corpus_dir, jobs)
+    
+    return result
+
+
+def compare_reports(report: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """
+    Tool metrics that regressed against the baseline.
+    
+    A metric regresses when it exceeds the baseline value by more than
+    tolerance (a fraction). Sizes or tools missing from either side are
+    skipped.
+    """
+    regressions = []
+    for size, result in report["results"].items():
+        base = baseline["results"].get(size)
+        if base is None:
+            continue
+        for name, metrics in result["tools"].items():
+            base_metrics = base["tools"].get(name)
+            if base_metrics is None:
+                continue
+            for metric in COMPARED_METRICS:
+                before = base_metrics.get(metric)
+                after = metrics.get(metric)
+                if not before or after is None:
+                    continue
+                change = (after - before) / before
+                metrics.setdefault("change", {})[metric] = round(change, 4)
+                if change > tolerance:
+                    regressions.append({
+                        "size": size,
+                        "tool": name,
+                        "metric": metric,
+                        "baseline": before,
+                        "current": after,
+                        "change": round(change, 4),
+                    })
+    return regressions
+
+
+def baseline_path(bench_dir: Path, name: str) -> Path:
+    return bench_dir / "baselines" / f"{name}.json"
+
+
+def save_baseline(report: dict, path: Path) -> None:
+    """Write a report as a baseline (atomically)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def print_report(report: dict, regressions: list[dict]) -> None:
+    """Print a human-readable table of the report."""
+    for size, result in report["results"].items():
+        print(f"{size} artifacts ({result['files']} files)")
+        for name, metrics in result["tools"].items():
+            change = metrics.get("change", {})
+            delta = ""
+            if change:
+                delta = "  vs baseline: " + ", ".join(
+                    f"{metric} {value:+.1%}" for metric, value in change.items()
+                )
+            status = ""
+            if metrics["exit_code"] not in TOOL_OK_EXIT_CODES:
+                status = f"  (exit {metrics['exit_code']})"
+            print(
+                f"  {name:<18} {metrics['wall_s']:>9.3f}s  "
+                f"{metrics['files_per_s'] or 0:>10.1f} files/s"
+                f"  {metrics['peak_rss_mb']:>8.1f} MB{delta}{status}"
+            )
+        if "stages" in result:
+            stages = ", ".join(
+                f"{stage} {seconds:.3f}s" for stage, seconds in result["stages"].items()
+            )
+            print(f"  stages: {stages}")
+        print()
+    
+    for regression in regressions:
+        print(
+            f"✗ Regression: {regression['tool']} at {regression['size']} artifacts, "
+            f"{regression['metric']} {regression['baseline']} -> {regression['current']} "
+            f"({regression['change']:+.1%})"
+        )
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Cheddar lint tools on synthetic corpora."
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated corpus sizes in artifacts (default: 100,1000,10000)",
+    )
+    parser.add_argument(
+        "--tools",
+        default=",".join(TOOLS),
+        help=f"Comma-separated tools to run (default: {','.join(TOOLS)})",
+    )
+    parser.add_argument(
+        "--fanout",
+        default="4,4,4,4",
+        help="Corpus fan-out per level below the mission (default: 4,4,4,4)",
+    )
+    parser.add_argument(
+        "--log-ratio",
+        type=float,
+        default=0.1,
+        help="Fraction of automation briefs with a documentation log (default: 0.1)",
+    )
+    parser.add_argument(
+        "--log-entries",
+        type=int,
+        default=5,
+        help="Entries per documentation log (default: 5)",
+    )
+    parser.add_argument(
+        "--faults",
+        default="",
+        help="Per-artifact fault rates, e.g. hash=0.01,orphan=0.001",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Corpus random seed (default: 0)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per tool; the median wall time is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=default_jobs(),
+        help="Worker processes for the tools (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--no-stages",
+        action="store_true",
+        help="Skip the in-process per-stage timings",
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        help="Where generated corpora are kept (default: .cheddar/bench/corpora)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        metavar="NAME",
+        help="Store this run as baseline NAME",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="NAME",
+        help="Compare against baseline NAME; exit 1 on regression",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed slowdown/growth before a regression is reported (default: 0.10)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output the report as JSON",
+    )
+    
+    args = parser.parse_args()
+    
+    try:
+        sizes = [int(size) for size in args.sizes.split(",")]
+        fanout = parse_fanout(args.fanout)
+        faults = parse_faults(args.faults)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    tools = args.tools.split(",")
+    unknown = [name for name in tools if name not in TOOLS]
+    if unknown:
+        print(f"Error: Unknown tool(s): {', '.join(unknown)}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    if min(sizes) < 1 or args.repeat < 1 or args.jobs < 1:
+        print("Error: --sizes, --repeat and --jobs must be at least 1", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    bench_dir = find_bench_dir()
+    baseline = None
+    if args.compare:
+        baseline = load_baseline(baseline_path(bench_dir, args.compare))
+        if baseline is None:
+            print(f"Error: Baseline not found: {args.compare}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+    
+    specs = [
+        CorpusSpec(
+            artifacts=size,
+            fanout=fanout,
+            log_ratio=args.log_ratio,
+            log_entries=args.log_entries,
+            faults=faults,
+            seed=args.seed,
+        )
+        for size in sizes
+    ]
+    
+    try:
+        report = run_benchmarks(
+            specs,
+            args.work_dir or bench_dir / "corpora",
+            tools,
+            args.jobs,
+            args.repeat,
+            stages=not args.no_stages,
+        )
+        regressions = []
+        if baseline is not None:
+            regressions = compare_reports(report, baseline, args.tolerance)
+            report["baseline"] = args.compare
+            report["regressions"] = regressions
+        if args.save_baseline:
+            save_baseline(report, baseline_path(bench_dir, args.save_baseline))
+        
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_report(report, regressions)
+            if args.save_baseline:
+                print(f"Saved baseline {args.save_baseline}")
+        
+        return EXIT_REGRESSION if regressions else EXIT_SUCCESS
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
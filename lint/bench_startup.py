@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Cheddar CLI Start-up Benchmark
+
+Measures how long `cheddar` commands take on a single small file, from
+process start to exit. Pre-commit hooks pay this cost on every call, so it
+is checked against a budget (by default 50 ms for `cheddar hash --verify`).
+
+Every case runs as a fresh process, started the way the installed console
+script starts the CLI (`from cheddar.cli import main`), repeat times. The
+fastest run is reported next to the median: start-up noise only ever adds
+time. The bare interpreter (`python -c pass`) is measured too, as the floor
+no command can beat on this machine.
+
+lint/ and src/cheddar/ are byte-compiled first, so imports are timed from
+.pyc files as they would be in an installed package.
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --repeat 50 --json
+    python bench_startup.py --budget hash-verify=80       # Slower machine
+    python bench_startup.py --importtime hash-verify      # Slowest imports of one case
+
+Exit codes:
+    0 - Every case within its budget
+    1 - A case exceeded its budget
+    2 - Usage/configuration error
+    3 - Internal error
+"""
+
+import argparse
+import compileall
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from bench import TOOL_OK_EXIT_CODES, ToolLauncher
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_OVER_BUDGET = 1
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+LINT_DIR = Path(__file__).parent
+SRC_DIR = LINT_DIR.parent / "src"
+EXAMPLE_FILE = LINT_DIR.parent / "schemas" / "examples" / "mission_definition.example.yaml"
+
+# What the console script generated for `cheddar = "cheddar.cli:main"` runs
+ENTRY_SOURCE = "import sys; from cheddar.cli import main; sys.exit(main())"
+
+# Case name -> cheddar arguments ({example} is filled in); None is the bare interpreter
+CASES = {
+    "interpreter": None,
+    "help": ["--help"],
+    "hash-verify": ["hash", "{example}", "--verify"],
+    "validate": ["validate", "{example}"],
+    "verify-chain": ["verify-chain", "{example}", "--skip-hash"],
+}
+
+# Case name -> budget in milliseconds for its fastest run
+DEFAULT_BUDGETS_MS = {
+    "help": 30.0,
+    "hash-verify": 50.0,
+}
+
+DEFAULT_REPEAT = 20
+
+DEFAULT_TOP_IMPORTS = 15
+
+
+def case_command(name: str, example: Path) -> list[str]:
+    """Command line running one case."""
+    arguments = CASES[name]
+    if arguments is None:
+        return [sys.executable, "-c", "pass"]
+    return [sys.executable, "-c", ENTRY_SOURCE] + [
+        part.format(example=example) for part in arguments
+    ]
+
+
+def case_environment() -> dict:
+    """Environment that lets the child import cheddar from src/ without installing it."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        part for part in (str(SRC_DIR), env.get("PYTHONPATH")) if part
+    )
+    return env
+
+
+def byte_compile() -> None:
+    """Write .pyc files for lint/ and src/cheddar/ (PYTHONDONTWRITEBYTECODE may be set)."""
+    for directory in (LINT_DIR, SRC_DIR):
+        compileall.compile_dir(str(directory), quiet=1)
+
+
+def measure_startup(
+    names: list[str],
+    example: Path,
+    repeat: int,
+    budgets: dict[str, float]
+) -> dict:
+    """
+    Time every case repeat times.
+    
+    Returns {"<case>": {"min_ms", "median_ms", "peak_rss_mb", "exit_code",
+    "budget_ms", "within_budget"}}; the budget fields are set only for
+    cases that have a budget.
+    """
+    results = {}
+    launcher = ToolLauncher(env=case_environment())
+    try:
+        for name in names:
+            command = case_command(name, example)
+            runs = [launcher.run(command) for _ in range(repeat)]
+            walls = [run["wall_s"] * 1000 for run in runs]
+            failed = [
+                run["exit_code"] for run in runs if run["exit_code"] not in TOOL_OK_EXIT_CODES
+            ]
+            result = {
+                "min_ms": round(min(walls), 1),
+                "median_ms": round(statistics.median(walls), 1),
+                "peak_rss_mb": round(max(run["peak_rss_mb"] for run in runs), 1),
+                "exit_code": failed[0] if failed else runs[0]["exit_code"],
+            }
+            if name in budgets:
+                result["budget_ms"] = budgets[name]
+                result["within_budget"] = result["min_ms"] <= budgets[name]
+            results[name] = result
+    finally:
+        launcher.close()
+    
+    return results
+
+
+def slowest_imports(name: str, example: Path, top: int = DEFAULT_TOP_IMPORTS) -> list[dict]:
+    """The modules with the largest self import time in one run of a case (-X importtime)."""
+    command = case_command(name, example)
+    command.insert(1, "-X")
+    command.insert(2, "importtime")
+    completed = subprocess.run(
+        command,
+        env=case_environment(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    
+    imports = []
+    for line in completed.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        imports.append({
+            "module": fields[2].strip(),
+            "self_ms": int(fields[0]) / 1000,
+            "cumulative_ms": int(fields[1]) / 1000,
+        })
+    
+    imports.sort(key=lambda entry: entry["self_ms"], reverse=True)
+    return imports[:top]
+
+
+def parse_budgets(value: str) -> dict[str, float]:
+    """Parse "case=ms,case=ms" into a budget mapping; raises ValueError."""
+    budgets = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        name, _, ms = part.partition("=")
+        name = name.strip()
+        if name not in CASES:
+            raise ValueError(f"Unknown case: {name}")
+        try:
+            budgets[name] = float(ms)
+        except ValueError:
+            raise ValueError(f"Invalid budget: {part}") from None
+    return budgets
+
+
+def print_results(results: dict) -> None:
+    """Print a human-readable table of the results."""
+    print(f"  {'case':<14} {'min':>9} {'median':>9} {'budget':>9}  {'RSS':>8}")
+    for name, result in results.items():
+        budget = f"{result['budget_ms']:.0f} ms" if "budget_ms" in result else "-"
+        status = ""
+        if "within_budget" in result:
+            status = "  ✓" if result["within_budget"] else "  ✗ over budget"
+        if result["exit_code"] not in TOOL_OK_EXIT_CODES:
+            status += f"  (exit {result['exit_code']})"
+        print(
+            f"  {name:<14} {result['min_ms']:>6.1f} ms {result['median_ms']:>6.1f} ms {budget:>9}"
+            f"  {result['peak_rss_mb']:>5.1f} MB{status}"
+        )
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the start-up time of cheddar commands."
+    )
+    parser.add_argument(
+        "--cases",
+        default=",".join(CASES),
+        help=f"Comma-separated cases to run (default: {','.join(CASES)})",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=(
+            "Runs per case; the fastest is checked against the budget "
+            f"(default: {DEFAULT_REPEAT})"
+        ),
+    )
+    parser.add_argument(
+        "--budget",
+        default="",
+        metavar="CASE=MS,...",
+        help="Override budgets, e.g. hash-verify=80 (defaults: "
+        + ", ".join(f"{name}={ms:.0f}" for name, ms in DEFAULT_BUDGETS_MS.items()) + ")",
+    )
+    parser.add_argument(
+        "--example",
+        type=Path,
+        default=EXAMPLE_FILE,
+        help="Artifact the cases run on (default: the mission definition example)",
+    )
+    parser.add_argument(
+        "--importtime",
+        metavar="CASE",
+        help="Instead of timing, list the slowest imports of one case",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output results as JSON",
+    )
+    
+    args = parser.parse_args()
+    
+    names = args.cases.split(",")
+    unknown = [name for name in names + [args.importtime or "interpreter"] if name not in CASES]
+    if unknown:
+        print(f"Error: Unknown case(s): {', '.join(unknown)}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    try:
+        budgets = dict(DEFAULT_BUDGETS_MS, **parse_budgets(args.budget))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    if args.repeat < 1:
+        print("Error: --repeat must be at least 1", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    if not args.example.is_file():
+        print(f"Error: Example not found: {args.example}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    try:
+        byte_compile()
+        
+        if args.importtime:
+            imports = slowest_imports(args.importtime, args.example)
+            if args.json:
+                print(json.dumps(imports, indent=2))
+            else:
+                print(f"Slowest imports of {args.importtime} (self time):")
+                for entry in imports:
+                    print(
+                        f"  {entry['self_ms']:>7.2f} ms  "
+                        f"(cumulative {entry['cumulative_ms']:>7.2f} ms)"
+                        f"  {entry['module']}"
+                    )
+            return EXIT_SUCCESS
+        
+        results = measure_startup(names, args.example, args.repeat, budgets)
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print_results(results)
+        
+        if any(not result.get("within_budget", True) for result in results.values()):
+            return EXIT_OVER_BUDGET
+        return EXIT_SUCCESS
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Cheddar Context Chain Builder
+
+Assembles the alignment fabric (docs/alignment-fabric.md): the merged
+combined_context that humans and AI consult before acting. Starting from any
+leaf artifact, the chain is resolved upwards through supports_upper_layer
+and merged top to bottom (mission -> flow -> track -> brief -> ...), one
+section per level.
+
+Merged prefixes are cached: the context for mission, mission+flow, ... is
+keyed by the (id, lineage.hash) pairs of the chain so far, so sibling
+briefs reuse their shared ancestors' merged context and its hash instead of
+rebuilding them. Artifacts with a missing or placeholder lineage.hash are
+keyed by their computed hash.
+
+Every combined context carries context.hash, the INV-030 context hash that
+sessions record and re-check at their boundaries. It is a hash chain over
+the sections in merge order, so each cached prefix extends its parent's
+digest with one section.
+
+Usage:
+    python build_context_chain.py artifacts/ -r --leaf brief_retrain_v1 \\
+        --output combined_context.yaml
+    python build_context_chain.py artifacts/ -r --all-leaves --output-dir contexts/
+    python build_context_chain.py --mission mission.yaml --flow flow.yaml \\
+        --cheddar track.yaml --automation brief.yaml --output combined_context.yaml
+    python build_context_chain.py --verify combined_context.yaml
+
+Exit codes:
+    0 - Success (context built, or hash verified)
+    1 - Chain could not be resolved, or context hash mismatch (--verify)
+    2 - Usage/configuration error
+    3 - Internal error
+"""
+
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+from compute_hash import compute_hash, iter_canonical_json
+from corpus import ArtifactCorpus
+from lineage_graph import LineageGraph
+from loader import load_yaml_file
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_CHAIN_ERROR = 1
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+CONTEXT_HASH_SEED = b"cheddar-context-v1"
+
+# Section name for each artifact level; other levels use the level name
+SECTION_NAMES = {
+    "mission": "mission_definition",
+}
+
+# Levels that end a chain (contexts are built for these with --all-leaves)
+LEAF_LEVELS = ("automation_brief", "personal")
+
+
+class _ContextDumper(SafeDumper):
+    """Writes shared sections in full instead of as YAML aliases."""
+    
+    def ignore_aliases(self, data: object) -> bool:
+        return True
+
+
+class ContextChainError(ValueError):
+    """The chain above a leaf cannot be resolved into a context."""
+
+
+def section_name(level: Optional[str]) -> str:
+    """Name of the combined_context section an artifact level merges into."""
+    return SECTION_NAMES.get(level, level or "unknown")
+
+
+def section_content(artifact: dict) -> dict:
+    """An artifact as merged into the context (without loader metadata)."""
+    return {key: value for key, value in artifact.items() if not key.startswith("_")}
+
+
+def extend_context_hash(previous: Optional[str], name: str, section: dict) -> str:
+    """Fold one merged section into the context hash of its prefix."""
+    if previous is None:
+        hasher = hashlib.sha256(CONTEXT_HASH_SEED)
+    else:
+        hasher = hashlib.sha256(previous.encode("ascii"))
+    hasher.update(b"\0" + name.encode("utf-8") + b"\0")
+    for chunk in iter_canonical_json(section):
+        hasher.update(chunk.encode("utf-8"))
+    return f"sha256:{hasher.hexdigest()}"
+
+
+def compute_context_hash(context: dict) -> str:
+    """
+    Recompute the INV-030 hash of a combined context.
+    
+    Sections are folded in the order given by context.chain.
+    """
+    digest = None
+    for link in context["context"]["chain"]:
+        name = section_name(link["level"])
+        digest = extend_context_hash(digest, name, context[name])
+    if digest is None:
+        raise ContextChainError("Combined context has an empty chain")
+    return digest
+
+
+def verify_context_hash(context: dict) -> bool:
+    """Whether a combined context still matches its recorded hash."""
+    return context["context"]["hash"] == compute_context_hash(context)
+
+
+class _Prefix:
+    """A merged context prefix: its sections, chain links and hash."""
+    
+    __slots__ = ("sections", "chain", "digest")
+    
+    def __init__(self, sections: dict, chain: list, digest: str):
+        self.sections = sections
+        self.chain = chain
+        self.digest = digest
+
+
+class ContextBuilder:
+    """Builds combined contexts from a set of artifacts, caching prefixes."""
+    
+    def __init__(self, artifacts: list[dict]):
+        self.graph = LineageGraph(artifacts)
+        self._prefixes: dict[tuple, _Prefix] = {}
+        self._link_hashes: dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def _link_hash(self, artifact: dict) -> str:
+        artifact_id = artifact["id"]
+        link_hash = self._link_hashes.get(artifact_id)
+        if link_hash is None:
+            lineage = artifact.get("lineage")
+            stored = lineage.get("hash") if isinstance(lineage, dict) else None
+            if isinstance(stored, str) and stored and not stored.endswith("..."):
+                link_hash = stored
+            else:
+                link_hash = compute_hash(section_content(artifact))
+            self._link_hashes[artifact_id] = link_hash
+        return link_hash
+    
+    def resolve_chain(self, leaf_id: str) -> list[dict]:
+        """Artifacts from the mission down to leaf_id."""
+        chain = []
+        seen = set()
+        current_id = leaf_id
+        while True:
+            artifact = self.graph.index.get(current_id)
+            if artifact is None:
+                if not chain:
+                    raise ContextChainError(f"Unknown artifact: {leaf_id}")
+                raise ContextChainError(
+                    f"Parent artifact not found: {current_id} (above {chain[-1].get('id')})"
+                )
+            if current_id in seen:
+                raise ContextChainError(f"Circular reference detected involving: {current_id}")
+            seen.add(current_id)
+            chain.append(artifact)
+            
+            if artifact.get("level") == "mission":
+                break
+            current_id = artifact.get("supports_upper_layer")
+            if not current_id:
+                raise ContextChainError(
+                    f"Chain above {leaf_id} ends at {artifact.get('id')} without reaching a mission"
+                )
+        
+        chain.reverse()
+        return chain
+    
+    def build(self, leaf_id: str) -> dict:
+        """
+        Combined context for leaf_id, with its INV-030 context hash.
+        
+        Section dicts are shared with cached prefixes; treat the result as
+        read-only.
+        """
+        key = ()
+        prefix = None
+        for artifact in self.resolve_chain(leaf_id):
+            key += ((artifact["id"], self._link_hash(artifact)),)
+            cached = self._prefixes.get(key)
+            if cached is not None:
+                self.hits += 1
+                prefix = cached
+                continue
+            
+            self.misses += 1
+            name = section_name(artifact.get("level"))
+            if prefix is not None and name in prefix.sections:
+                raise ContextChainError(
+                    f"Chain above {leaf_id} has more than one {name} ({artifact['id']})"
+                )
+            section = section_content(artifact)
+            sections = dict(prefix.sections) if prefix is not None else {}
+            sections[name] = section
+            chain = (prefix.chain if prefix is not None else []) + [{
+                "id": artifact["id"],
+                "level": artifact.get("level"),
+                "hash": key[-1][1],
+            }]
+            digest = extend_context_hash(
+                prefix.digest if prefix is not None else None, name, section
+            )
+            prefix = _Prefix(sections, chain, digest)
+            self._prefixes[key] = prefix
+        
+        context = {
+            "context": {
+                "leaf": leaf_id,
+                "chain": prefix.chain,
+                "hash": prefix.digest,
+            },
+        }
+        context.update(prefix.sections)
+        return context
+    
+    def leaves(self) -> list[str]:
+        """Ids of every artifact at a leaf level, in input order."""
+        return [
+            artifact_id for artifact_id, artifact in self.graph.index.items()
+            if artifact.get("level") in LEAF_LEVELS
+        ]
+
+
+def write_context(context: dict, output: Path) -> None:
+    """Write a combined context as YAML."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        yaml.dump(context, f, Dumper=_ContextDumper, sort_keys=False, allow_unicode=True)
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Build combined_context from a Cheddar artifact chain."
+    )
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="*",
+        help="Artifact files or directories to resolve chains from",
+    )
+    parser.add_argument(
+        "--recursive", "-r",
+        action="store_true",
+        help="Recursively process directories",
+    )
+    parser.add_argument(
+        "--leaf",
+        action="append",
+        default=[],
+        metavar="ID",
+        help="Build the context for this artifact (repeatable)",
+    )
+    parser.add_argument(
+        "--all-leaves",
+        action="store_true",
+        help="Build a context for every automation brief and personal artifact",
+    )
+    for flag, level in (
+        ("--mission", "mission"),
+        ("--flow", "flow_initiative"),
+        ("--cheddar", "cheddar_track"),
+        ("--automation", "automation_brief"),
+    ):
+        parser.add_argument(
+            flag,
+            type=Path,
+            metavar="FILE",
+            help=f"Explicit {level} file (chain given file by file)",
+        )
+    parser.add_argument(
+        "--output", "-o",
+        type=Path,
+        help="Output file for a single context (default: stdout)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        help="Directory for one <leaf id>.yaml context per leaf",
+    )
+    parser.add_argument(
+        "--verify",
+        type=Path,
+        metavar="FILE",
+        help="Check a combined context file against its INV-030 hash",
+    )
+    
+    args = parser.parse_args()
+    
+    try:
+        if args.verify:
+            if not args.verify.exists():
+                print(f"Error: File not found: {args.verify}", file=sys.stderr)
+                return EXIT_USAGE_ERROR
+            context = load_yaml_file(args.verify)
+            recorded = context["context"]["hash"]
+            computed = compute_context_hash(context)
+            if recorded == computed:
+                print(f"✓ Context hash verified: {recorded}")
+                return EXIT_SUCCESS
+            print(f"✗ Context hash mismatch: recorded={recorded}, computed={computed}")
+            return EXIT_CHAIN_ERROR
+        
+        explicit = [
+            path for path in (args.mission, args.flow, args.cheddar, args.automation)
+            if path is not None
+        ]
+        paths = list(args.paths) + explicit
+        if not paths:
+            print("Error: No artifact paths given", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+        for path in paths:
+            if not path.exists():
+                print(f"Error: Path not found: {path}", file=sys.stderr)
+                return EXIT_USAGE_ERROR
+        
+        artifacts = ArtifactCorpus.load(paths, args.recursive).lineage_artifacts()
+        builder = ContextBuilder(artifacts)
+        
+        leaf_ids = list(args.leaf)
+        if args.all_leaves:
+            leaf_ids.extend(builder.leaves())
+        if not leaf_ids and explicit:
+            # The lowest explicit file is the leaf of the given chain
+            lowest = load_yaml_file(explicit[-1])
+            leaf_ids.append(lowest.get("id"))
+        if not leaf_ids:
+            print("Error: Give --leaf, --all-leaves or explicit chain files", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+        if len(leaf_ids) > 1 and args.output_dir is None:
+            print("Error: Several contexts need --output-dir", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+        
+        failed = 0
+        for leaf_id in leaf_ids:
+            try:
+                context = builder.build(leaf_id)
+            except ContextChainError as e:
+                print(f"✗ {leaf_id}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            
+            if args.output_dir is not None:
+                write_context(context, args.output_dir / f"{leaf_id}.yaml")
+            elif args.output is not None:
+                write_context(context, args.output)
+            else:
+                yaml.dump(
+                    context, sys.stdout, Dumper=_ContextDumper, sort_keys=False, allow_unicode=True
+                )
+        
+        if args.output is not None or args.output_dir is not None:
+            built = len(leaf_ids) - failed
+            print(
+                f"Built {built} context(s) "
+                f"(prefix cache: {builder.hits} hits, {builder.misses} misses)"
+            )
+        
+        return EXIT_CHAIN_ERROR if failed else EXIT_SUCCESS
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Cheddar Freshness Checking
+
+Detects artifacts and documentation logs that have not been updated within
+their policy threshold.
+Enforces: INV-011 (Documentation logs MUST be updated within the configured
+evaluation frequency)
+
+Freshness is answered from an expiry index rather than by rescanning every
+file. The index (SQLite, .cheddar/cache/freshness.sqlite) stores for each
+file its type, when it was last updated (lineage.timestamp, or
+documentation_log.last_updated for logs) and when that update expires,
+with an index on the expiry time:
+
+    - "what is stale now" and "what goes stale in the next N days" are
+      range queries on the expiry column; no artifact is loaded,
+    - refreshing the index re-reads only files whose size or mtime changed,
+    - when the thresholds change, expiry times are recomputed in place from
+      the stored update times, again without loading any artifact.
+
+Thresholds come from the freshness section of governance/policy.yaml:
+
+    policy:
+      freshness:
+        default_days: 14
+        by_artifact_type:
+          mission_definition: 90
+          documentation_log: 7
+
+Stale documentation logs are errors (INV-011); other stale artifacts are
+reported as warnings.
+
+Usage:
+    python check_freshness.py <directory> --recursive            # What is stale now
+    python check_freshness.py <directory> --recursive --within 7 # Stale within 7 days
+    python check_freshness.py <directory> --policy policy.yaml   # Explicit thresholds
+
+Exit codes:
+    0 - Nothing stale (always 0 with --within)
+    1 - Stale documentation logs found
+    2 - Usage/configuration error
+    3 - Internal error
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from artifact_fields import LEVEL_TYPES, format_timestamp, parse_timestamp
+from corpus import ArtifactCorpus, parse_file
+from loader import load_yaml_file
+from schema_registry import find_cache_dir
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_STALE = 1
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+INDEX_FILE_NAME = "freshness.sqlite"
+
+SECONDS_PER_DAY = 86400
+
+# Used when governance/policy.yaml does not define freshness
+DEFAULT_THRESHOLDS = {
+    "default_days": 14,
+    "by_artifact_type": {
+        "mission_definition": 90,
+        "flow_initiative": 30,
+        "cheddar_track": 14,
+        "automation_brief": 7,
+        "personal_artifact": 3,
+    },
+}
+
+LOG_TYPE = "documentation_log"
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    artifact_id TEXT,
+    type TEXT,
+    updated_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS items_expires_at ON items (expires_at);
+"""
+
+
+def find_policy_file() -> Path:
+    """Locate the default governance policy (governance/policy.yaml)."""
+    return Path(__file__).parent.parent / "governance" / "policy.yaml"
+
+
+def load_thresholds(policy_path: Optional[Path] = None) -> dict:
+    """
+    Freshness thresholds from a policy file, or the defaults.
+    
+    Returns {"default_days": int, "by_artifact_type": {type: days}}.
+    """
+    if policy_path is None:
+        policy_path = find_policy_file()
+        if not policy_path.exists():
+            return DEFAULT_THRESHOLDS
+    
+    policy = load_yaml_file(policy_path) or {}
+    freshness = (policy.get("policy") or {}).get("freshness")
+    if not isinstance(freshness, dict):
+        return DEFAULT_THRESHOLDS
+    
+    return {
+        "default_days": freshness.get("default_days", DEFAULT_THRESHOLDS["default_days"]),
+        "by_artifact_type": dict(freshness.get("by_artifact_type") or {}),
+    }
+
+
+def threshold_days(thresholds: dict, artifact_type: Optional[str]) -> float:
+    """Days an artifact of this type stays fresh."""
+    return thresholds["by_artifact_type"].get(artifact_type, thresholds["default_days"])
+
+
+def freshness_fields(document: object) -> tuple[Optional[str], Optional[str], Optional[float]]:
+    """(artifact id, type, last update as epoch seconds) of a parsed file."""
+    if not isinstance(document, dict):
+        return None, None, None
+    
+    log = document.get("documentation_log")
+    if isinstance(log, dict):
+        return log.get("artifact_ref"), LOG_TYPE, parse_timestamp(log.get("last_updated"))
+    
+    level = document.get("level")
+    if not level:
+        return None, None, None
+    lineage = document.get("lineage")
+    updated = parse_timestamp(lineage.get("timestamp")) if isinstance(lineage, dict) else None
+    return document.get("id"), LEVEL_TYPES.get(level, level), updated
+
+
+def _covers(root: str, path: str, recursive: bool = True) -> bool:
+    """Whether absolute path is root itself or a file under it."""
+    if path == root:
+        return True
+    if recursive:
+        return path.startswith(root + os.sep)
+    return os.path.dirname(path) == root
+
+
+class FreshnessIndex:
+    """SQLite table of every file's next expiry time."""
+    
+    def __init__(self, db_path: Path, thresholds: Optional[dict] = None):
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript(SCHEMA_SQL)
+        self.thresholds = thresholds if thresholds is not None else DEFAULT_THRESHOLDS
+        self._apply_thresholds()
+    
+    def close(self) -> None:
+        self.conn.close()
+    
+    def _expiry_sql(self) -> tuple[str, list]:
+        """SQL CASE computing expires_at from updated_at and type."""
+        by_type = self.thresholds["by_artifact_type"]
+        cases = " ".join("WHEN ? THEN ?" for _ in by_type)
+        params = []
+        for artifact_type, days in by_type.items():
+            params.extend([artifact_type, days * SECONDS_PER_DAY])
+        params.append(self.thresholds["default_days"] * SECONDS_PER_DAY)
+        if cases:
+            return f"updated_at + (CASE type {cases} ELSE ? END)", params
+        return "updated_at + ?", params
+    
+    def _apply_thresholds(self) -> None:
+        """Recompute every expiry in place if the thresholds changed."""
+        fingerprint = json.dumps(self.thresholds, sort_keys=True)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'thresholds'").fetchone()
+        if row is not None and row[0] == fingerprint:
+            return
+        
+        expiry, params = self._expiry_sql()
+        with self.conn:
+            self.conn.execute(
+                f"UPDATE items SET expires_at = {expiry} WHERE updated_at IS NOT NULL", params
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('thresholds', ?)",
+                (fingerprint,),
+            )
+    
+    def _expires_at(
+        self,
+        artifact_type: Optional[str],
+        updated_at: Optional[float]
+    ) -> Optional[float]:
+        if updated_at is None:
+            return None
+        return updated_at + threshold_days(self.thresholds, artifact_type) * SECONDS_PER_DAY
+    
+    def refresh(self, paths: list[Path], recursive: bool = False) -> dict:
+        """
+        Bring the index in line with the files under paths.
+        
+        Only files whose size or mtime changed are read. Indexed files under
+        paths that are no longer found are dropped; rows for files outside
+        paths are kept. Returns {"files_total", "files_reindexed"}.
+        """
+        known = {
+            row[0]: (row[1], row[2])
+            for row in self.conn.execute("SELECT path, size, mtime_ns FROM items")
+        }
+        
+        seen = set()
+        rows = []
+        for file_path, _ in ArtifactCorpus.discover(paths, recursive):
+            key = os.path.abspath(file_path)
+            seen.add(key)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            if known.get(key) == (st.st_size, st.st_mtime_ns):
+                continue
+            
+            document, _, _ = parse_file(file_path)
+            artifact_id, artifact_type, updated_at = freshness_fields(document)
+            rows.append((
+                key, st.st_size, st.st_mtime_ns, artifact_id, artifact_type,
+                updated_at, self._expires_at(artifact_type, updated_at),
+            ))
+        
+        roots = [os.path.abspath(path) for path in paths]
+        removed = [
+            key for key in known.keys() - seen
+            if any(_covers(root, key, recursive) for root in roots)
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO items "
+                "(path, size, mtime_ns, artifact_id, type, updated_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.executemany("DELETE FROM items WHERE path = ?", [(key,) for key in removed])
+        
+        return {"files_total": len(seen), "files_reindexed": len(rows)}
+    
+    def _query(self, where: str, params: tuple, under: Optional[list[Path]]) -> list[dict]:
+        cursor = self.conn.execute(
+            "SELECT path, artifact_id, type, updated_at, expires_at FROM items "
+            f"WHERE {where} ORDER BY expires_at, path",
+            params,
+        )
+        prefixes = None
+        if under is not None:
+            prefixes = [os.path.abspath(path) for path in under]
+        
+        found = []
+        for path, artifact_id, artifact_type, updated_at, expires_at in cursor:
+            if prefixes is not None and not any(_covers(prefix, path) for prefix in prefixes):
+                continue
+            found.append({
+                "file": path,
+                "artifact": artifact_id,
+                "type": artifact_type,
+                "updated_at": format_timestamp(updated_at),
+                "expires_at": format_timestamp(expires_at),
+            })
+        return found
+    
+    def stale(self, now: Optional[float] = None, under: Optional[list[Path]] = None) -> list[dict]:
+        """Everything whose freshness expired at or before now."""
+        now = time.time() if now is None else now
+        return self._query("expires_at <= ?", (now,), under)
+    
+    def expiring(
+        self,
+        days: float,
+        now: Optional[float] = None,
+        under: Optional[list[Path]] = None
+    ) -> list[dict]:
+        """Everything still fresh now that expires within the next days."""
+        now = time.time() if now is None else now
+        return self._query(
+            "expires_at > ? AND expires_at <= ?", (now, now + days * SECONDS_PER_DAY), under
+        )
+
+
+def stale_results(stale: list[dict], thresholds: dict) -> list[dict]:
+    """Lint results for stale items: errors for logs, warnings otherwise."""
+    results = []
+    for item in stale:
+        days = threshold_days(thresholds, item["type"])
+        is_log = item["type"] == LOG_TYPE
+        finding = {
+            "invariant": "INV-011",
+            "field": "documentation_log.last_updated" if is_log else "lineage.timestamp",
+            "message": f"Stale: last updated {item['updated_at']}, expired {item['expires_at']} "
+                       f"({item['type']} threshold {days} days)",
+        }
+        results.append({
+            "linter": "check_freshness",
+            "file": item["file"],
+            "passed": not is_log,
+            "errors": [finding] if is_log else [],
+            "warnings": [] if is_log else [finding],
+        })
+    return results
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Check Cheddar artifacts and documentation logs for staleness."
+    )
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="+",
+        help="Artifact files or directories",
+    )
+    parser.add_argument(
+        "--recursive", "-r",
+        action="store_true",
+        help="Recursively process directories",
+    )
+    parser.add_argument(
+        "--within",
+        type=float,
+        metavar="DAYS",
+        help="List what goes stale within DAYS instead of what is stale now",
+    )
+    parser.add_argument(
+        "--policy",
+        type=Path,
+        help="Governance policy with freshness thresholds (default: governance/policy.yaml)",
+    )
+    parser.add_argument(
+        "--now",
+        help="Evaluate at this ISO 8601 time instead of the current time",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        help=f"Expiry index file (default: <cache dir>/{INDEX_FILE_NAME})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Build a throwaway in-memory index",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output results as JSON",
+    )
+    
+    args = parser.parse_args()
+    
+    for path in args.paths:
+        if not path.exists():
+            print(f"Error: Path not found: {path}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+    if args.policy is not None and not args.policy.exists():
+        print(f"Error: Policy not found: {args.policy}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    now = None
+    if args.now is not None:
+        now = parse_timestamp(args.now)
+        if now is None:
+            print(f"Error: Invalid --now timestamp: {args.now}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+    
+    try:
+        thresholds = load_thresholds(args.policy)
+        if args.no_cache:
+            db_path = ":memory:"
+        else:
+            db_path = args.index or find_cache_dir() / INDEX_FILE_NAME
+        index = FreshnessIndex(db_path, thresholds)
+        try:
+            index.refresh(args.paths, args.recursive)
+            if args.within is not None:
+                expiring = index.expiring(args.within, now, args.paths)
+            else:
+                stale = index.stale(now, args.paths)
+        finally:
+            index.close()
+        
+        if args.within is not None:
+            if args.json:
+                print(json.dumps(expiring, indent=2))
+            else:
+                for item in expiring:
+                    print(f"  {item['expires_at']}  {item['type']}  {item['file']}")
+                print(f"{len(expiring)} item(s) go stale within {args.within:g} days")
+            return EXIT_SUCCESS
+        
+        results = stale_results(stale, thresholds)
+        if args.json:
+            print(json.dumps(results, indent=2))
+        elif not results:
+            print("✓ Nothing stale")
+        else:
+            for result in results:
+                mark = "✓" if result["passed"] else "✗"
+                print(f"{mark} {result['file']}")
+                for error in result["errors"]:
+                    print(f"  [{error['invariant']}] {error['message']}")
+                for warning in result["warnings"]:
+                    print(f"  ⚠ [{warning['invariant']}] {warning['message']}")
+        
+        all_passed = all(result["passed"] for result in results)
+        return EXIT_SUCCESS if all_passed else EXIT_STALE
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
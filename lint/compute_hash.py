@@ -6,16 +6,20 @@ Computes and optionally updates the lineage.hash field for Cheddar artifacts.
 Enforces: INV-004 (Every artifact MUST include a lineage.hash computed from content)
 
 Algorithm:
-    1. Deep copy artifact
-    2. Remove lineage.hash field (if present)
-    3. Serialize to canonical JSON (sorted keys, no whitespace)
-    4. Compute SHA-256 of UTF-8 encoded canonical form
-    5. Prefix with "sha256:"
+    1. Skip the lineage.hash and lineage.signature fields (if present)
+    2. Serialize to canonical JSON (sorted keys, no whitespace)
+    3. Compute SHA-256 of UTF-8 encoded canonical form
+    4. Prefix with "sha256:"
+
+The artifact is never deep-copied: only the few dicts on the path to
+lineage.hash are shallow-copied, and the canonical JSON is fed to the hasher
+in chunks rather than built as one string.
 
 Usage:
     python compute_hash.py <artifact.yaml>           # Display computed hash
     python compute_hash.py <artifact.yaml> --update  # Update file in place
     python compute_hash.py <artifact.yaml> --verify  # Verify existing hash
+    python compute_hash.py <directory> --verify -r   # Verify every artifact
 
 Exit codes:
     0 - Success (hash computed/verified/updated)
@@ -25,14 +29,21 @@ Exit codes:
 """
 
 import argparse
-import copy
 import hashlib
 import json
 import sys
+from functools import partial
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
+from typing import Iterator
 
 import yaml
 
+from corpus import find_artifact_files
+from loader import load_yaml_file
+from parallel import default_jobs, map_chunked, use_pool
+from profiler import add_profile_arguments, finish_profiling, get_profiler, start_profiling
+
 # Exit codes
 EXIT_SUCCESS = 0
 EXIT_HASH_MISMATCH = 1
@@ -40,12 +51,87 @@ EXIT_USAGE_ERROR = 2
 EXIT_INTERNAL_ERROR = 3
 
 
+# Same settings as json.dumps(..., sort_keys=True, separators=(",", ":"))
+_canonical_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+# Containers nested deeper than this are encoded in one C-encoder call
+STREAM_DEPTH = 2
+
+# Buffer this many characters before each hasher update
+HASH_BUFFER_SIZE = 64 * 1024
+
+
+# lineage fields left out of the hash: the hash itself, and the signature
+# made over it (INV-023)
+UNHASHED_LINEAGE_FIELDS = frozenset({"hash", "signature"})
+
+
+def _without_lineage_hash(lineage: object) -> object:
+    if isinstance(lineage, dict) and not UNHASHED_LINEAGE_FIELDS.isdisjoint(lineage):
+        return {key: value for key, value in lineage.items() if key not in UNHASHED_LINEAGE_FIELDS}
+    return lineage
+
+
+def hashable_view(artifact: dict) -> dict:
+    """
+    Return the artifact as it is hashed: without lineage.hash or
+    lineage.signature.
+    
+    Handles both standard artifacts and the documentation_log wrapper.
+    Only the dicts on the path to a hash field are shallow-copied; the
+    artifact itself is not modified.
+    """
+    content = dict(artifact)
+    
+    if "lineage" in content:
+        content["lineage"] = _without_lineage_hash(content["lineage"])
+    
+    log = content.get("documentation_log")
+    if isinstance(log, dict) and "lineage" in log:
+        log = dict(log)
+        log["lineage"] = _without_lineage_hash(log["lineage"])
+        content["documentation_log"] = log
+    
+    return content
+
+
+def iter_canonical_json(value: object, depth: int = 0) -> Iterator[str]:
+    """
+    Yield the canonical JSON of value in chunks.
+    
+    Concatenated, the chunks equal
+    json.dumps(value, sort_keys=True, separators=(",", ":")).
+    The top levels are streamed member by member; deeper values are
+    encoded whole by the C encoder.
+    """
+    if depth < STREAM_DEPTH and isinstance(value, dict) and value and all(
+        isinstance(key, str) for key in value
+    ):
+        separator = "{"
+        for key in sorted(value):
+            yield separator
+            yield encode_basestring_ascii(key)
+            yield ":"
+            yield from iter_canonical_json(value[key], depth + 1)
+            separator = ","
+        yield "}"
+    elif depth < STREAM_DEPTH and isinstance(value, list) and value:
+        separator = "["
+        for item in value:
+            yield separator
+            yield from iter_canonical_json(item, depth + 1)
+            separator = ","
+        yield "]"
+    else:
+        yield _canonical_encoder.encode(value)
+
+
 def compute_hash(artifact: dict) -> str:
     """
     Compute the lineage hash for an artifact.
     
     The hash is computed from a canonical JSON representation with:
-    - lineage.hash field excluded
+    - lineage.hash and lineage.signature fields excluded
     - Keys sorted alphabetically at all levels
     - No whitespace (compact separators)
     - UTF-8 encoding
@@ -53,32 +139,26 @@ def compute_hash(artifact: dict) -> str:
     Returns:
         Hash string in format "sha256:<64 hex chars>"
     """
-    # Deep copy to avoid modifying original
-    content = copy.deepcopy(artifact)
-    
-    # Remove lineage.hash if present
-    if "lineage" in content and "hash" in content["lineage"]:
-        del content["lineage"]["hash"]
-    
-    # Handle documentation_log wrapper
-    if "documentation_log" in content:
-        log = content["documentation_log"]
-        if "lineage" in log and "hash" in log["lineage"]:
-            del log["lineage"]["hash"]
+    hasher = hashlib.sha256()
+    buffer = []
+    buffered = 0
     
-    # Serialize to canonical JSON
-    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    for chunk in iter_canonical_json(hashable_view(artifact)):
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= HASH_BUFFER_SIZE:
+            hasher.update("".join(buffer).encode("utf-8"))
+            buffer = []
+            buffered = 0
     
-    # Compute SHA-256
-    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    hasher.update("".join(buffer).encode("utf-8"))
     
-    return f"sha256:{digest}"
+    return f"sha256:{hasher.hexdigest()}"
 
 
 def load_artifact(path: Path) -> dict:
     """Load a YAML artifact file."""
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return load_yaml_file(path)
 
 
 def save_artifact(path: Path, artifact: dict) -> None:
@@ -108,14 +188,23 @@ def get_existing_hash(artifact: dict) -> str | None:
 
 
 def set_hash(artifact: dict, hash_value: str) -> dict:
-    """Set lineage.hash in artifact and return modified artifact."""
-    result = copy.deepcopy(artifact)
+    """
+    Set lineage.hash in artifact and return modified artifact.
+    
+    The input is not modified; only the dicts on the path to the hash
+    field are copied.
+    """
+    result = dict(artifact)
     
     # Standard artifacts
     if "lineage" in result:
+        result["lineage"] = dict(result["lineage"])
         result["lineage"]["hash"] = hash_value
     elif "documentation_log" in result and "lineage" in result["documentation_log"]:
-        result["documentation_log"]["lineage"]["hash"] = hash_value
+        log = dict(result["documentation_log"])
+        log["lineage"] = dict(log["lineage"])
+        log["lineage"]["hash"] = hash_value
+        result["documentation_log"] = log
     else:
         # Create lineage block if missing
         result["lineage"] = {"hash": hash_value}
@@ -153,6 +242,99 @@ def format_output(
     return result
 
 
+def process_file(path: Path, mode: str) -> dict:
+    """
+    Compute, verify or update the hash of one file in a bulk run.
+    
+    In update mode the file is only rewritten if its hash changed.
+    Returns the format_output dict, or a dict with an "error" message when
+    the file could not be loaded.
+    """
+    profiler = get_profiler()
+    try:
+        with profiler.file("parse", path):
+            artifact = load_artifact(path)
+    except yaml.YAMLError as e:
+        return {"file": str(path), "action": mode, "error": f"Invalid YAML: {e}"}
+    except Exception as e:
+        return {"file": str(path), "action": mode, "error": f"Failed to load file: {e}"}
+    
+    if not isinstance(artifact, dict):
+        return {"file": str(path), "action": mode, "error": "Not a YAML mapping"}
+    
+    with profiler.file("hash", path):
+        computed_hash = compute_hash(artifact)
+    existing_hash = get_existing_hash(artifact)
+    result = format_output(path, computed_hash, existing_hash, mode)
+    
+    if mode == "update" and computed_hash != existing_hash:
+        save_artifact(path, set_hash(artifact, computed_hash))
+    
+    return result
+
+
+def _process_chunk(paths: list[Path], mode: str) -> list[dict]:
+    """Pool task: process a chunk of files."""
+    return [process_file(path, mode) for path in paths]
+
+
+def process_files(paths: list[Path], mode: str, jobs: int = 1) -> list[dict]:
+    """
+    Process many files in one process, or across a pool with jobs > 1.
+    
+    Results are returned in the order of paths.
+    """
+    with get_profiler().stage("hash"):
+        if use_pool(len(paths), jobs):
+            return map_chunked(partial(_process_chunk, mode=mode), paths, jobs)
+        return _process_chunk(paths, mode)
+
+
+def print_bulk_results(results: list[dict], mode: str, output_json: bool = False) -> int:
+    """
+    Print bulk hashing results.
+    
+    Returns EXIT_HASH_MISMATCH if any file failed to load or, in verify
+    mode, has a missing or mismatched hash.
+    """
+    failed = 0
+    for result in results:
+        if "error" in result:
+            failed += 1
+        elif mode == "verify" and not result["match"]:
+            failed += 1
+    
+    if output_json:
+        print(json.dumps(results, indent=2))
+        return EXIT_HASH_MISMATCH if failed else EXIT_SUCCESS
+    
+    for result in results:
+        path = result["file"]
+        if "error" in result:
+            print(f"✗ {path}: {result['error']}")
+        elif mode == "compute":
+            print(f"{result['computed_hash']}  {path}")
+        elif mode == "verify":
+            if not result["existing_hash"]:
+                print(f"✗ {path}: No existing hash to verify")
+            elif result["match"]:
+                print(f"✓ {path}: Hash verified")
+            else:
+                print(f"✗ {path}: Hash mismatch")
+                print(f"  Expected: {result['existing_hash']}")
+                print(f"  Computed: {result['computed_hash']}")
+        elif mode == "update":
+            if result["match"]:
+                print(f"✓ {path}: Hash unchanged")
+            else:
+                print(f"✓ {path}: Hash updated to {result['computed_hash']}")
+    
+    print()
+    print(f"Files: {len(results)}, failed: {failed}")
+    
+    return EXIT_HASH_MISMATCH if failed else EXIT_SUCCESS
+
+
 def main() -> int:
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -161,7 +343,7 @@ def main() -> int:
     parser.add_argument(
         "path",
         type=Path,
-        help="Artifact file to process",
+        help="Artifact file or directory to process",
     )
     
     mode_group = parser.add_mutually_exclusive_group()
@@ -181,6 +363,18 @@ def main() -> int:
         action="store_true",
         help="Output results as JSON",
     )
+    parser.add_argument(
+        "--recursive", "-r",
+        action="store_true",
+        help="Recursively process a directory",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=default_jobs(),
+        help="Worker processes for directories (default: number of CPUs)",
+    )
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
@@ -188,6 +382,23 @@ def main() -> int:
         print(f"Error: File not found: {args.path}", file=sys.stderr)
         return EXIT_USAGE_ERROR
     
+    if args.path.is_dir():
+        if args.jobs < 1:
+            print("Error: --jobs must be at least 1", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+        
+        mode = "update" if args.update else "verify" if args.verify else "compute"
+        try:
+            profiler = start_profiling(args)
+            with get_profiler().stage("discover"):
+                paths = find_artifact_files(args.path, args.recursive)
+            results = process_files(paths, mode, args.jobs)
+            finish_profiling(profiler, "compute_hash", args)
+            return print_bulk_results(results, mode, args.json)
+        except Exception as e:
+            print(f"Internal error: {e}", file=sys.stderr)
+            return EXIT_INTERNAL_ERROR
+    
     if not args.path.is_file():
         print(f"Error: Not a file: {args.path}", file=sys.stderr)
         return EXIT_USAGE_ERROR
@@ -246,7 +457,7 @@ def main() -> int:
                 print(f"✓ {args.path}: Hash updated to {computed_hash}")
         
         return EXIT_SUCCESS
-        
+    
     except Exception as e:
         print(f"Internal error: {e}", file=sys.stderr)
         return EXIT_INTERNAL_ERROR
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Cheddar Artifact Corpus
+
+Discovers and parses every artifact file exactly once so that schema
+validation, semantic rules and chain verification can all share the same
+parsed documents. Parse failures are recorded on the entry and reported
+once, by whichever check consumes the corpus first (normally validation).
+
+Parsing goes through loader.py (libyaml when available) and can skip
+unchanged files entirely with a ParseCache.
+
+Usage:
+    from corpus import ArtifactCorpus
+    
+    corpus = ArtifactCorpus.load([Path("artifacts/")], recursive=True)
+    for entry in corpus:
+        print(entry.path, entry.error or "ok")
+"""
+
+import os
+from pathlib import Path
+from typing import Iterator, Optional
+
+import yaml
+
+from lineage_graph import LineageRecord
+from loader import ParseCache, content_digest, parse_yaml, read_file
+from parallel import map_chunked, use_pool
+from profiler import get_profiler
+
+
+def find_artifact_files(directory: Path, recursive: bool = False) -> list[Path]:
+    """
+    List the YAML files in a directory, sorted for deterministic output.
+    
+    Hidden files are skipped.
+    """
+    pattern = "**/*.yaml" if recursive else "*.yaml"
+    return sorted(
+        path for path in directory.glob(pattern)
+        if not path.name.startswith(".")
+    )
+
+
+def iter_artifact_files(directory: Path, recursive: bool = False) -> Iterator[Path]:
+    """
+    Yield the files find_artifact_files would list, in the same order.
+    
+    Directories are walked lazily, one listing at a time, so a streaming
+    run never holds the whole tree's paths. Like pathlib's glob, symlinked
+    directories are not descended into.
+    """
+    try:
+        with os.scandir(directory) as listing:
+            entries = sorted(listing, key=lambda entry: entry.name)
+    except OSError:
+        return
+    
+    for entry in entries:
+        if entry.name.endswith(".yaml") and not entry.name.startswith("."):
+            yield directory / entry.name
+        if recursive and entry.is_dir(follow_symlinks=False):
+            yield from iter_artifact_files(directory / entry.name, recursive)
+
+
+def parse_file(
+    path: Path,
+    cache: Optional[ParseCache] = None
+) -> tuple[object, Optional[str], Optional[str]]:
+    """
+    Read and parse one YAML file, consulting cache first if given.
+    
+    Returns (document, error message, content digest); document is None
+    when error is set, and digest is None when the file could not be read.
+    """
+    with get_profiler().file("parse", path):
+        return _parse_file(path, cache)
+
+
+def _parse_file(
+    path: Path,
+    cache: Optional[ParseCache]
+) -> tuple[object, Optional[str], Optional[str]]:
+    try:
+        data, mtime_ns = read_file(path)
+    except Exception as e:
+        return None, f"Failed to load file: {e}", None
+    
+    digest = content_digest(data)
+    if cache is not None:
+        hit, document = cache.lookup(path, len(data), digest)
+        if hit:
+            return document, None, digest
+    
+    try:
+        document = parse_yaml(data, str(path))
+    except yaml.YAMLError as e:
+        return None, f"Invalid YAML: {e}", digest
+    except Exception as e:
+        return None, f"Failed to load file: {e}", digest
+    
+    if cache is not None:
+        cache.store(path, len(data), mtime_ns, digest, document)
+    
+    return document, None, digest
+
+
+def _parse_chunk(paths: list[Path]) -> list[tuple]:
+    """Pool task: parse a chunk of files, returning what the cache needs."""
+    profiler = get_profiler()
+    results = []
+    for path in paths:
+        with profiler.file("parse", path):
+            results.append(_parse_for_cache(path))
+    
+    return results
+
+
+def _parse_for_cache(path: Path) -> tuple:
+    try:
+        data, mtime_ns = read_file(path)
+    except Exception as e:
+        return None, f"Failed to load file: {e}", None, 0, 0
+    
+    digest = content_digest(data)
+    try:
+        document, error = parse_yaml(data, str(path)), None
+    except yaml.YAMLError as e:
+        document, error = None, f"Invalid YAML: {e}"
+    except Exception as e:
+        document, error = None, f"Failed to load file: {e}"
+    
+    return document, error, digest, len(data), mtime_ns
+
+
+class CorpusEntry:
+    """One discovered file: its parsed document or its load error."""
+    
+    __slots__ = ("path", "artifact", "error", "explicit", "digest")
+    
+    def __init__(
+        self,
+        path: Path,
+        artifact: object,
+        error: Optional[str],
+        explicit: bool,
+        digest: Optional[str] = None
+    ):
+        self.path = path
+        self.artifact = artifact
+        self.error = error
+        # SHA-256 of the raw file content, None if the file was unreadable
+        self.digest = digest
+        # True when the file was named directly rather than found in a directory
+        self.explicit = explicit
+    
+    @property
+    def is_artifact(self) -> bool:
+        """Whether the document looks like a Cheddar artifact or log."""
+        return isinstance(self.artifact, dict) and bool(
+            self.artifact.get("level") or self.artifact.get("documentation_log")
+        )
+    
+    @property
+    def in_chain(self) -> bool:
+        """
+        Whether chain verification should consider this entry.
+        
+        Every parsed .yaml/.yml file named explicitly is included, as is
+        every directory file that looks like an artifact.
+        """
+        if not isinstance(self.artifact, dict):
+            return False
+        if self.explicit:
+            return self.path.suffix in (".yaml", ".yml")
+        return self.is_artifact
+
+
+class ArtifactCorpus:
+    """An ordered, parse-once collection of artifact files."""
+    
+    def __init__(self, entries: list[CorpusEntry]):
+        self.entries = entries
+    
+    def __iter__(self) -> Iterator[CorpusEntry]:
+        return iter(self.entries)
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    @classmethod
+    def discover(
+        cls,
+        paths: list[Path],
+        recursive: bool = False
+    ) -> list[tuple[Path, bool]]:
+        """
+        Expand files and directories into (file, explicit) pairs.
+        
+        Each file appears once even if reachable from several paths.
+        """
+        found = []
+        seen = set()
+        
+        for path in paths:
+            if path.is_file():
+                candidates = [(path, True)]
+            elif path.is_dir():
+                candidates = [(p, False) for p in find_artifact_files(path, recursive)]
+            else:
+                continue
+            
+            for file_path, explicit in candidates:
+                key = file_path.resolve()
+                if key in seen:
+                    continue
+                seen.add(key)
+                found.append((file_path, explicit))
+        
+        return found
+    
+    @classmethod
+    def iter_discover(
+        cls,
+        paths: list[Path],
+        recursive: bool = False
+    ) -> Iterator[tuple[Path, bool]]:
+        """
+        Lazily expand files and directories into (file, explicit) pairs.
+        
+        The streaming form of discover, in the same order. Duplicates can
+        only arise across several paths, so a single path is walked
+        without remembering what was seen.
+        """
+        seen = set() if len(paths) > 1 else None
+        
+        for path in paths:
+            if path.is_file():
+                candidates = iter([(path, True)])
+            elif path.is_dir():
+                candidates = ((p, False) for p in iter_artifact_files(path, recursive))
+            else:
+                continue
+            
+            for file_path, explicit in candidates:
+                if seen is not None:
+                    key = os.path.realpath(file_path)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                yield file_path, explicit
+    
+    @classmethod
+    def load(
+        cls,
+        paths: list[Path],
+        recursive: bool = False,
+        jobs: int = 1,
+        cache: Optional[ParseCache] = None
+    ) -> "ArtifactCorpus":
+        """
+        Discover and parse every file under paths.
+        
+        Files whose content matches a cache entry are not parsed at all.
+        With jobs > 1, the remaining files are parsed in a process pool;
+        entry order always follows discovery order.
+        """
+        with get_profiler().stage("discover"):
+            discovered = cls.discover(paths, recursive)
+        return cls.from_files(discovered, jobs, cache)
+    
+    @classmethod
+    def from_files(
+        cls,
+        discovered: list[tuple[Path, bool]],
+        jobs: int = 1,
+        cache: Optional[ParseCache] = None
+    ) -> "ArtifactCorpus":
+        """Parse already-discovered (file, explicit) pairs into a corpus."""
+        with get_profiler().stage("parse"):
+            return cls._parse_files(discovered, jobs, cache)
+    
+    @classmethod
+    def _parse_files(
+        cls,
+        discovered: list[tuple[Path, bool]],
+        jobs: int,
+        cache: Optional[ParseCache]
+    ) -> "ArtifactCorpus":
+        if not use_pool(len(discovered), jobs):
+            entries = []
+            for file_path, explicit in discovered:
+                artifact, error, digest = parse_file(file_path, cache)
+                entries.append(CorpusEntry(file_path, artifact, error, explicit, digest))
+            return cls._finish(entries, cache)
+        
+        entries = []
+        misses = []
+        for file_path, explicit in discovered:
+            entry = CorpusEntry(file_path, None, None, explicit)
+            entries.append(entry)
+            if cache is not None:
+                try:
+                    data, _ = read_file(file_path)
+                except OSError:
+                    misses.append(entry)
+                    continue
+                digest = content_digest(data)
+                hit, artifact = cache.lookup(file_path, len(data), digest)
+                if hit:
+                    entry.artifact = artifact
+                    entry.digest = digest
+                    continue
+            misses.append(entry)
+        
+        parsed = map_chunked(_parse_chunk, [entry.path for entry in misses], jobs)
+        for entry, (artifact, error, digest, size, mtime_ns) in zip(misses, parsed):
+            entry.artifact = artifact
+            entry.error = error
+            entry.digest = digest
+            if cache is not None and error is None:
+                cache.store(entry.path, size, mtime_ns, digest, artifact)
+        
+        return cls._finish(entries, cache)
+    
+    @classmethod
+    def _finish(
+        cls,
+        entries: list[CorpusEntry],
+        cache: Optional[ParseCache]
+    ) -> "ArtifactCorpus":
+        if cache is not None:
+            cache.save()
+        return cls(entries)
+    
+    def lineage_artifacts(self) -> list[dict]:
+        """
+        Artifacts for chain verification, in verify_lineage's format.
+        
+        Includes every entry whose in_chain is true. Each is a shallow copy
+        carrying _source_path; the parsed documents are left untouched.
+        Files that failed to parse are omitted (their error is reported by
+        validation).
+        """
+        artifacts = []
+        for entry in self.entries:
+            if not entry.in_chain:
+                continue
+            
+            artifact = dict(entry.artifact)
+            artifact["_source_path"] = str(entry.path)
+            artifacts.append(artifact)
+        
+        return artifacts
+    
+    def lineage_records(self) -> list[LineageRecord]:
+        """
+        Compact LineageRecords of the entries lineage_artifacts would return.
+        
+        verify_chain accepts these in place of artifact dicts; they hold
+        only the lineage fields, not the documents.
+        """
+        return [
+            LineageRecord.from_artifact(entry.artifact, str(entry.path))
+            for entry in self.entries
+            if entry.in_chain
+        ]
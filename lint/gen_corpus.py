@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Cheddar Synthetic Corpus Generator
+
+Writes schema-valid artifact trees (mission -> flow_initiative ->
+cheddar_track -> automation_brief -> personal) with real lineage hashes,
+for benchmarking and stress-testing the lint pipeline.
+
+Each mission tree is generated independently from (seed, mission index), so
+the same options always give byte-identical files and missions are written
+in parallel. Trees are cut off once the requested number of artifacts is
+reached; only the last mission tree is partial.
+
+Faults can be injected at a per-artifact rate. The manifest records the ids
+of every injected fault.
+
+    hash       lineage.hash corrupted                        (INV-004)
+    upstream   lineage.upstream_hash does not match parent   (INV-005)
+    orphan     supports_upper_layer names a missing parent   (INV-005)
+    schema     a required field removed                      (schema)
+    duplicate  an extra file re-defining the artifact's id   (INV-001)
+    cycle      two extra tracks supporting each other        (INV-005, schema)
+
+Every fault except hash is made before the artifact is hashed, so it shows
+up only as the intended error.
+
+Layout:
+    <out>/corpus.json                     # Manifest (options, counts, faults)
+    <out>/m<NNNNN>/<artifact id>.yaml     # One directory per mission tree
+    <out>/m<NNNNN>/logs/log_<brief id>.yaml
+
+Usage:
+    python gen_corpus.py /tmp/corpus --artifacts 10000
+    python gen_corpus.py /tmp/corpus --artifacts 1000000 --fanout 4,5,5,4 --jobs 8
+    python gen_corpus.py /tmp/corpus --artifacts 1000 --faults hash=0.01,orphan=0.005
+    python gen_corpus.py /tmp/corpus --artifacts 1000 --log-ratio 0.5 --log-entries 200 --seal
+
+Exit codes:
+    0 - Corpus written
+    2 - Usage/configuration error
+    3 - Internal error
+"""
+
+import argparse
+import json
+import random
+import shutil
+import sys
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+from compute_hash import compute_hash
+from parallel import default_jobs, map_chunked, use_pool
+from validate_log import entry_hash
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+# Bump when the same options would produce different files
+GENERATOR_VERSION = 1
+
+MANIFEST_NAME = "corpus.json"
+
+# (level, id prefix) from the root down
+LEVELS = (
+    ("mission", "mission"),
+    ("flow_initiative", "flow"),
+    ("cheddar_track", "track"),
+    ("automation_brief", "brief"),
+    ("personal", "personal"),
+)
+
+FAULT_KINDS = ("hash", "upstream", "orphan", "schema", "duplicate", "cycle")
+
+# Faults that need a parent to point at
+PARENT_FAULTS = ("upstream", "orphan")
+
+# Required fields that may be dropped by a schema fault, per level
+DROPPABLE_FIELDS = {
+    "mission": ("intent", "success_criteria"),
+    "flow_initiative": ("objective",),
+    "cheddar_track": ("issue",),
+    "automation_brief": ("deliverables", "tests", "owner"),
+    "personal": ("acceptance_criteria", "responsible_party"),
+}
+
+STATES = ("active", "resolved", "stinky")
+STATE_WEIGHTS = (70, 20, 10)
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+WORDS = (
+    "latency", "precision", "recall", "drift", "telemetry", "rollout", "canary",
+    "threshold", "pipeline", "regression", "coverage", "triage", "capacity",
+    "retention", "onboarding", "alerting", "backlog", "compliance", "scanner",
+)
+
+
+class CorpusSpec:
+    """Options that fully determine a generated corpus."""
+    
+    __slots__ = (
+        "artifacts", "fanout", "log_ratio", "log_entries", "seal", "faults", "seed",
+    )
+    
+    def __init__(
+        self,
+        artifacts: int,
+        fanout: tuple[int, ...] = (4, 4, 4, 4),
+        log_ratio: float = 0.1,
+        log_entries: int = 5,
+        seal: bool = False,
+        faults: Optional[dict[str, float]] = None,
+        seed: int = 0
+    ):
+        self.artifacts = artifacts
+        self.fanout = tuple(fanout)
+        self.log_ratio = log_ratio
+        self.log_entries = log_entries
+        self.seal = seal
+        self.faults = dict(faults or {})
+        self.seed = seed
+    
+    @property
+    def depth(self) -> int:
+        """Number of levels below the mission."""
+        return len(self.fanout)
+    
+    def tree_size(self) -> int:
+        """Artifacts in one full mission tree."""
+        size = 1
+        width = 1
+        for fanout in self.fanout:
+            width *= fanout
+            size += width
+        return size
+    
+    def mission_budgets(self) -> list[int]:
+        """Artifacts to generate for each mission tree."""
+        full = self.tree_size()
+        budgets = [full] * (self.artifacts // full)
+        if self.artifacts % full:
+            budgets.append(self.artifacts % full)
+        return budgets
+    
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def parse_fanout(value: str) -> tuple[int, ...]:
+    """--fanout value: one number per level below the mission, up to four."""
+    fanout = tuple(int(part) for part in value.split(","))
+    if not 1 <= len(fanout) <= len(LEVELS) - 1 or min(fanout) < 1:
+        raise ValueError(f"Invalid fanout: {value}")
+    return fanout
+
+
+def parse_faults(value: str) -> dict[str, float]:
+    """--faults value: comma-separated kind=rate pairs."""
+    faults = {}
+    for part in filter(None, value.split(",")):
+        kind, _, rate = part.partition("=")
+        if kind not in FAULT_KINDS:
+            raise ValueError(
+                f"Unknown fault kind: {kind} (expected one of {', '.join(FAULT_KINDS)})"
+            )
+        faults[kind] = float(rate)
+        if not 0 <= faults[kind] <= 1:
+            raise ValueError(f"Fault rate must be between 0 and 1: {part}")
+    return faults
+
+
+def _timestamp(seconds: int) -> str:
+    return (EPOCH + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _phrase(rng: random.Random, words: int = 4) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _strings(rng: random.Random, low: int = 1, high: int = 4) -> list[str]:
+    return [_phrase(rng).capitalize() for _ in range(rng.randint(low, high))]
+
+
+def _body(level: str, rng: random.Random) -> dict:
+    """Level-specific required and optional fields."""
+    if level == "mission":
+        return {
+            "intent": _phrase(rng, 8).capitalize() + ".",
+            "success_criteria": [
+                {"metric": rng.choice(WORDS), "target": f">{rng.randint(50, 99)}_percent"}
+                for _ in range(rng.randint(1, 3))
+            ],
+            "authorized_roles": [{"role_name": "board_of_directors"}, {"role_name": "ceo"}],
+        }
+    if level == "flow_initiative":
+        return {
+            "objective": _phrase(rng, 8).capitalize() + ".",
+            "constraints": _strings(rng),
+            "telemetry_signals": [rng.choice(WORDS) for _ in range(rng.randint(1, 4))],
+        }
+    if level == "cheddar_track":
+        return {
+            "issue": _phrase(rng, 10).capitalize() + ".",
+            "hypotheses": _strings(rng),
+            "repro_steps": _strings(rng),
+        }
+    if level == "automation_brief":
+        return {
+            "owner": "platform_lead",
+            "deliverables": _strings(rng),
+            "tests": [
+                {
+                    "name": f"{rng.choice(WORDS)}_check",
+                    "type": "metric_threshold",
+                    "target": ">0.95",
+                }
+                for _ in range(rng.randint(1, 3))
+            ],
+        }
+    return {
+        "responsible_party": "engineer",
+        "acceptance_criteria": _strings(rng),
+    }
+
+
+class _MissionWriter:
+    """Generates and writes one mission tree."""
+    
+    def __init__(self, spec: CorpusSpec, index: int, out_dir: Path):
+        self.spec = spec
+        self.index = index
+        self.rng = random.Random(f"{spec.seed}:{index}")
+        self.dir = out_dir / f"m{index:05d}"
+        self.clock = index * 100000
+        self.counts = {level: 0 for level, _ in LEVELS}
+        self.logs = 0
+        self.faults = {kind: [] for kind in FAULT_KINDS}
+    
+    def _write(self, name: str, document: dict) -> None:
+        path = self.dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.dump(document, f, Dumper=SafeDumper, sort_keys=False, allow_unicode=True)
+    
+    def _fault(self, has_parent: bool) -> Optional[str]:
+        for kind, rate in self.spec.faults.items():
+            if kind in PARENT_FAULTS and not has_parent:
+                continue
+            if rate and self.rng.random() < rate:
+                return kind
+        return None
+    
+    def _artifact(self, depth: int, path: str, parent: Optional[dict]) -> dict:
+        level, prefix = LEVELS[depth]
+        artifact_id = f"{prefix}_b{self.index:05d}{path}_v1"
+        self.clock += 60
+        
+        artifact = {
+            "level": level,
+            "id": artifact_id,
+            "title": _phrase(self.rng, 3).replace(" ", "_"),
+        }
+        if parent is not None:
+            artifact["supports_upper_layer"] = parent["id"]
+        artifact.update(_body(level, self.rng))
+        artifact["cheddar_state"] = self.rng.choices(STATES, STATE_WEIGHTS)[0]
+        artifact["lineage"] = {
+            "upstream_hash": parent["lineage"]["hash"] if parent is not None else None,
+            "hash": None,
+            "signed_by": "bench_signer",
+            "timestamp": _timestamp(self.clock),
+        }
+        
+        fault = self._fault(parent is not None)
+        if fault == "upstream":
+            artifact["lineage"]["upstream_hash"] = f"sha256:{self.rng.getrandbits(256):064x}"
+        elif fault == "orphan":
+            artifact["supports_upper_layer"] = f"{LEVELS[depth - 1][1]}_missing{path}_v1"
+        elif fault == "schema":
+            del artifact[self.rng.choice(DROPPABLE_FIELDS[level])]
+        
+        artifact["lineage"]["hash"] = compute_hash(artifact)
+        if fault == "hash":
+            artifact["lineage"]["hash"] = f"sha256:{self.rng.getrandbits(256):064x}"
+        
+        self._write(f"{artifact_id}.yaml", artifact)
+        self.counts[level] += 1
+        
+        if fault == "duplicate":
+            self._write(f"{artifact_id}.dup.yaml", artifact)
+        elif fault == "cycle":
+            self._write_cycle(path)
+        if fault is not None:
+            self.faults[fault].append(artifact_id)
+        
+        if level == "automation_brief" and self.rng.random() < self.spec.log_ratio:
+            self._write_log(artifact)
+        
+        return artifact
+    
+    def _write_cycle(self, path: str) -> None:
+        first = f"track_cycle_b{self.index:05d}{path}_a_v1"
+        second = f"track_cycle_b{self.index:05d}{path}_b_v1"
+        for artifact_id, other in ((first, second), (second, first)):
+            artifact = {
+                "level": "cheddar_track",
+                "id": artifact_id,
+                "title": "cyclic_track",
+                "supports_upper_layer": other,
+                "issue": "Injected cycle.",
+                "lineage": {
+                    "upstream_hash": None,
+                    "hash": None,
+                    "signed_by": "bench_signer",
+                    "timestamp": _timestamp(self.clock),
+                },
+            }
+            artifact["lineage"]["hash"] = compute_hash(artifact)
+            self._write(f"{artifact_id}.yaml", artifact)
+    
+    def _write_log(self, brief: dict) -> None:
+        count = max(1, self.spec.log_entries)
+        newest = EPOCH + timedelta(seconds=self.clock)
+        entries = []
+        previous = None
+        # Built oldest first so each entry_hash chains from the older entry
+        for age in range(count - 1, -1, -1):
+            entry = {
+                "date": (newest - timedelta(days=age)).strftime("%Y-%m-%d"),
+                "summary": _phrase(self.rng, 6).capitalize() + ".",
+                "what_we_are_doing": _phrase(self.rng, 8).capitalize() + ".",
+                "blockers": [],
+                "cheddar_state": "active",
+                "next_steps": _strings(self.rng, 1, 3),
+            }
+            if self.spec.seal:
+                previous = entry_hash(previous, entry)
+                entry["entry_hash"] = previous
+            entries.append(entry)
+        entries.reverse()
+        
+        log = {
+            "documentation_log": {
+                "last_updated": _timestamp(self.clock),
+                "author": "engineer",
+                "artifact_ref": brief["id"],
+                "entries": entries,
+            },
+        }
+        self._write(f"logs/log_{brief['id']}.yaml", log)
+        self.logs += 1
+    
+    def generate(self, budget: int) -> dict:
+        """Write up to budget artifacts depth first; returns a summary."""
+        remaining = budget
+        fanout = self.spec.fanout
+        
+        # Depth-first with an explicit stack of (depth, path, parent)
+        stack = [(0, "", None)]
+        while stack and remaining:
+            depth, path, parent = stack.pop()
+            artifact = self._artifact(depth, path, parent)
+            remaining -= 1
+            if depth < len(fanout):
+                for child in range(fanout[depth] - 1, -1, -1):
+                    stack.append((depth + 1, f"{path}_{child}", artifact))
+        
+        return {"by_level": self.counts, "logs": self.logs, "faults": self.faults}
+
+
+def _generate_chunk(missions: list[tuple[int, int]], spec: CorpusSpec, out_dir: Path) -> list[dict]:
+    return [
+        _MissionWriter(spec, index, out_dir).generate(budget)
+        for index, budget in missions
+    ]
+
+
+def generate_corpus(spec: CorpusSpec, out_dir: Path, jobs: int = 1) -> dict:
+    """
+    Write the corpus described by spec into out_dir.
+    
+    Returns the manifest, which is also written to out_dir/corpus.json.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    missions = list(enumerate(spec.mission_budgets()))
+    
+    generate = partial(_generate_chunk, spec=spec, out_dir=out_dir)
+    if use_pool(len(missions), jobs):
+        summaries = map_chunked(generate, missions, jobs)
+    else:
+        summaries = generate(missions)
+    
+    manifest = {
+        "generator_version": GENERATOR_VERSION,
+        "spec": spec.to_dict(),
+        "missions": len(missions),
+        "artifacts": 0,
+        "logs": 0,
+        "by_level": {level: 0 for level, _ in LEVELS},
+        "faults": {kind: [] for kind in FAULT_KINDS},
+    }
+    for summary in summaries:
+        manifest["logs"] += summary["logs"]
+        for level, count in summary["by_level"].items():
+            manifest["by_level"][level] += count
+            manifest["artifacts"] += count
+        for kind, ids in summary["faults"].items():
+            manifest["faults"][kind].extend(ids)
+    
+    with open(out_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    
+    return manifest
+
+
+def load_manifest(out_dir: Path) -> Optional[dict]:
+    """Manifest of a generated corpus, or None if there is none."""
+    try:
+        with open(out_dir / MANIFEST_NAME, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_corpus(spec: CorpusSpec, out_dir: Path, jobs: int = 1) -> dict:
+    """Reuse the corpus in out_dir if it was generated from spec, else regenerate it."""
+    manifest = load_manifest(out_dir)
+    if (
+        manifest is not None
+        and manifest.get("generator_version") == GENERATOR_VERSION
+        and manifest.get("spec") == json.loads(json.dumps(spec.to_dict()))
+    ):
+        return manifest
+    
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    return generate_corpus(spec, out_dir, jobs)
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic Cheddar artifact corpus."
+    )
+    parser.add_argument(
+        "output",
+        type=Path,
+        help="Directory to write the corpus into (must be empty or absent)",
+    )
+    parser.add_argument(
+        "--artifacts", "-n",
+        type=int,
+        default=1000,
+        help="Number of hierarchy artifacts to generate (default: 1000)",
+    )
+    parser.add_argument(
+        "--fanout",
+        default="4,4,4,4",
+        help="Children per artifact at each level below the mission; "
+             "fewer numbers make shallower trees (default: 4,4,4,4)",
+    )
+    parser.add_argument(
+        "--log-ratio",
+        type=float,
+        default=0.1,
+        help="Fraction of automation briefs given a documentation log (default: 0.1)",
+    )
+    parser.add_argument(
+        "--log-entries",
+        type=int,
+        default=5,
+        help="Entries per documentation log (default: 5)",
+    )
+    parser.add_argument(
+        "--seal",
+        action="store_true",
+        help="Give every log entry its entry_hash",
+    )
+    parser.add_argument(
+        "--faults",
+        default="",
+        help=f"Per-artifact fault rates, e.g. hash=0.01,orphan=0.001 ({', '.join(FAULT_KINDS)})",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed (default: 0)",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=default_jobs(),
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    
+    args = parser.parse_args()
+    
+    try:
+        spec = CorpusSpec(
+            artifacts=args.artifacts,
+            fanout=parse_fanout(args.fanout),
+            log_ratio=args.log_ratio,
+            log_entries=args.log_entries,
+            seal=args.seal,
+            faults=parse_faults(args.faults),
+            seed=args.seed,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    if args.artifacts < 1 or args.jobs < 1:
+        print("Error: --artifacts and --jobs must be at least 1", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    if args.output.exists() and any(args.output.iterdir()):
+        print(f"Error: Output directory is not empty: {args.output}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    try:
+        manifest = generate_corpus(spec, args.output, args.jobs)
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+    
+    faults = sum(len(ids) for ids in manifest["faults"].values())
+    print(
+        f"Wrote {manifest['artifacts']} artifact(s) in {manifest['missions']} mission tree(s), "
+        f"{manifest['logs']} log(s), {faults} injected fault(s) to {args.output}"
+    )
+    return EXIT_SUCCESS
+
+
+if __name__ == "__main__":
+    sys.exit(main())
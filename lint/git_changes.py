@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+Cheddar Git Changed-Set Lint
+
+Lints only what a branch or a pending commit changes, for pre-commit hooks
+and PR checks (`run_all.py --staged`, `run_all.py --since REV`):
+
+    - the changed .yaml files under the lint roots are read from git
+      (the staged blobs for --staged, the HEAD blobs for --since), parsed
+      and schema-validated,
+    - chain checks (INV-003/INV-005 upstream, cycles, duplicate ids) run
+      for the changed artifacts, for every artifact whose
+      supports_upper_layer chain runs through an id a changed file defined
+      before or defines now, and for other files defining such an id.
+
+Parents and descendants are looked up in a lineage index of HEAD: a SQLite
+table of lineage edges indexed by id and parent id, kept in
+.cheddar/cache/ per repository and lint roots. The index records the
+commit it describes; a run first brings it up to HEAD by parsing only the
+blobs that changed since that commit, so the tree is parsed in full only
+the first time. No other file in the tree is read.
+
+--since REV checks what the branch adds to REV: the changes from the merge
+base of REV and HEAD to HEAD. Uncommitted changes are ignored. --staged
+checks the index (what the next commit will contain) against HEAD.
+
+Usage:
+    python run_all.py artifacts/ -r --staged
+    python run_all.py artifacts/ -r --since origin/main --json
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from corpus import CorpusEntry
+from lineage_graph import LineageRecord
+from lint_state import edge_artifact, edge_fields
+from loader import parse_yaml
+from parallel import imap_chunked, use_pool
+from profiler import get_profiler
+from schema_registry import SchemaRegistry, find_cache_dir, get_registry
+from validate_artifact import load_error_result, validate_loaded_artifact
+from verify_lineage import detect_cycles, duplicate_error, verify_upstream_reference
+from watch import is_lint_target
+
+# Bump when the index layout or the edge extraction changes
+INDEX_FORMAT_VERSION = 1
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS edges (
+    path TEXT PRIMARY KEY,
+    is_log INTEGER NOT NULL,
+    artifact_id TEXT,
+    level TEXT,
+    parent_id TEXT,
+    hash TEXT,
+    upstream_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS edges_artifact_id ON edges (artifact_id);
+CREATE INDEX IF NOT EXISTS edges_parent_id ON edges (parent_id);
+"""
+
+COLUMNS = ("path", "is_log", "artifact_id", "level", "parent_id", "hash", "upstream_hash")
+
+# Statuses of `git diff --name-status` that leave a file in the target tree
+PRESENT_STATUSES = frozenset("AMT")
+
+
+class GitError(Exception):
+    """A git command failed (not a repository, unknown revision, ...)."""
+
+
+def git(root: Path, *args: str) -> bytes:
+    """Run a git command in root and return its stdout; raises GitError."""
+    try:
+        completed = subprocess.run(["git", *args], cwd=root, capture_output=True)
+    except OSError as e:
+        raise GitError(f"Cannot run git: {e}") from None
+    if completed.returncode != 0:
+        message = completed.stderr.decode("utf-8", "replace").strip()
+        raise GitError(message or f"git {args[0]} failed")
+    return completed.stdout
+
+
+def repo_root(path: Path) -> Path:
+    """The top-level directory of the repository containing path."""
+    directory = path if path.is_dir() else path.parent
+    return Path(git(directory, "rev-parse", "--show-toplevel").decode().strip())
+
+
+def resolve_commit(root: Path, rev: str) -> str:
+    """The commit id rev names."""
+    try:
+        return git(root, "rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}").decode().strip()
+    except GitError:
+        raise GitError(f"Unknown revision: {rev}") from None
+
+
+def diff_paths(
+    root: Path,
+    base: str,
+    target: Optional[str],
+    pathspecs: list[str]
+) -> list[tuple[str, str]]:
+    """
+    (status, path) of every file that differs between base and target.
+    
+    target None compares the staged index against base. Renames are
+    reported as a deletion and an addition.
+    """
+    args = ["diff", "--name-status", "-z", "--no-renames", "--no-ext-diff"]
+    if target is None:
+        args += ["--cached", base]
+    else:
+        args += [base, target]
+    fields = git(root, *args, "--", *pathspecs).split(b"\0")
+    return [
+        (fields[i].decode()[:1], os.fsdecode(fields[i + 1]))
+        for i in range(0, len(fields) - 1, 2)
+    ]
+
+
+def list_tree(root: Path, commit: str, pathspecs: list[str]) -> list[str]:
+    """Every file path in commit under pathspecs."""
+    output = git(root, "ls-tree", "-r", "-z", "--name-only", commit, "--", *pathspecs)
+    return [os.fsdecode(name) for name in output.split(b"\0") if name]
+
+
+def iter_blobs(root: Path, specs: list[str]) -> Iterator[tuple[str, Optional[bytes]]]:
+    """
+    Read blobs ("<commit>:<path>", or ":<path>" for the staged version)
+    through one `git cat-file --batch`, yielding (spec, content or None if
+    missing) in order.
+    """
+    process = subprocess.Popen(
+        ["git", "cat-file", "--batch"],
+        cwd=root,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    
+    # Fed from a thread: git blocks writing blobs until they are read
+    def feed() -> None:
+        try:
+            for spec in specs:
+                process.stdin.write(os.fsencode(spec) + b"\n")
+            process.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+    
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        for spec in specs:
+            header = process.stdout.readline()
+            if not header:
+                raise GitError("git cat-file exited early")
+            if header.endswith(b" missing\n") or header.endswith(b" ambiguous\n"):
+                yield spec, None
+                continue
+            size = int(header.split()[2])
+            data = process.stdout.read(size)
+            process.stdout.read(1)  # Trailing newline
+            yield spec, data
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        process.stdout.close()
+        feeder.join()
+
+
+class LintTargets:
+    """The lint roots of a run, as paths relative to the repository root."""
+    
+    def __init__(self, root: Path, paths: list[Path], recursive: bool):
+        self.root = root
+        self.recursive = recursive
+        # git reports the resolved top level, so resolve the roots too
+        self.roots = [Path(os.path.realpath(path)) for path in paths]
+        self.pathspecs = [
+            os.path.relpath(path, root).replace(os.sep, "/") for path in self.roots
+        ]
+    
+    def explicit(self, path: str) -> Optional[bool]:
+        """None if path is not linted; else whether it is a root itself."""
+        full = self.root / path
+        if not is_lint_target(full, self.roots, self.recursive):
+            return None
+        return full in self.roots
+    
+    def display(self, path: str) -> str:
+        """path as reported: relative to the working directory."""
+        return os.path.relpath(self.root / path)
+    
+    def key(self) -> str:
+        """Identifies the repository and roots an index describes."""
+        spec = json.dumps([str(self.root), sorted(self.pathspecs), self.recursive])
+        return hashlib.sha256(spec.encode("utf-8")).hexdigest()[:16]
+
+
+def parse_edge(path: str, explicit: bool, data: bytes) -> Optional[dict]:
+    """The index row of a blob, or None if it is not part of the chain."""
+    try:
+        document = parse_yaml(data, path)
+    except Exception:
+        return None
+    if not CorpusEntry(Path(path), document, None, explicit).in_chain:
+        return None
+    row = {"path": path, "is_log": int("documentation_log" in document)}
+    row.update(edge_fields(document))
+    return row
+
+
+def _parse_edge_chunk(items: list[tuple[str, bool, bytes]]) -> list[Optional[dict]]:
+    """Pool task: index rows of a chunk of blobs."""
+    return [parse_edge(path, explicit, data) for path, explicit, data in items]
+
+
+def find_index_path(targets: LintTargets) -> Path:
+    """Default index location for a repository and set of lint roots."""
+    return find_cache_dir() / f"git-lineage-{targets.key()}.sqlite"
+
+
+class GitLineageIndex:
+    """SQLite lineage edges of the lint targets in one commit."""
+    
+    def __init__(self, db_path: Optional[Path]):
+        if db_path is None:
+            self.conn = sqlite3.connect(":memory:")
+        else:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript(SCHEMA_SQL)
+    
+    def close(self) -> None:
+        self.conn.close()
+    
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def sync(self, targets: LintTargets, head: str, jobs: int = 1) -> int:
+        """
+        Bring the index up to commit head; returns the number of blobs parsed.
+        
+        Only blobs that differ from the indexed commit are read; without a
+        usable indexed commit the whole tree is indexed.
+        """
+        root = targets.root
+        indexed = self._get_meta("commit")
+        if self._get_meta("format") != str(INDEX_FORMAT_VERSION):
+            indexed = None
+        if indexed == head:
+            return 0
+        
+        changed = None
+        if indexed is not None:
+            try:
+                changed = diff_paths(root, indexed, head, targets.pathspecs)
+            except GitError:
+                pass  # Indexed commit no longer exists (e.g. after a rebase and gc)
+        
+        if changed is None:
+            removed = None
+            paths = list_tree(root, head, targets.pathspecs)
+        else:
+            removed = [path for status, path in changed]
+            paths = [path for status, path in changed if status in PRESENT_STATUSES]
+        
+        items = []
+        for path in paths:
+            explicit = targets.explicit(path)
+            if explicit is not None:
+                items.append((path, explicit))
+        
+        blobs = iter_blobs(root, [f"{head}:{path}" for path, _ in items])
+        work = (
+            (path, explicit, data)
+            for (path, explicit), (_, data) in zip(items, blobs)
+            if data is not None
+        )
+        if use_pool(len(items), jobs):
+            rows = imap_chunked(_parse_edge_chunk, work, jobs)
+        else:
+            rows = (parse_edge(*item) for item in work)
+        
+        with self.conn:
+            if removed is None:
+                self.conn.execute("DELETE FROM edges")
+            else:
+                self.conn.executemany(
+                    "DELETE FROM edges WHERE path = ?", [(path,) for path in removed]
+                )
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO edges ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                (tuple(row[column] for column in COLUMNS) for row in rows if row is not None),
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("commit", head), ("format", str(INDEX_FORMAT_VERSION))],
+            )
+        
+        return len(items)
+    
+    def _select(self, column: str, value: str) -> list[dict]:
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM edges WHERE {column} = ? ORDER BY path", (value,)
+        )
+        return [dict(zip(COLUMNS, row)) for row in cursor]
+    
+    def defining(self, artifact_id: str) -> list[dict]:
+        """Rows of the artifacts with this id, in path order."""
+        return self._select("artifact_id", artifact_id)
+    
+    def children(self, artifact_id: str) -> list[dict]:
+        """Rows of the artifacts whose parent is this id, in path order."""
+        return self._select("parent_id", artifact_id)
+    
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+
+
+class ChangedTree:
+    """
+    The lineage of the target tree: the index with the changed files'
+    records laid over it.
+    
+    get() resolves an id to its defining record (the last definition in
+    path order wins, as in a full run), so it can stand in for the
+    artifact index verify_lineage's checks take.
+    """
+    
+    def __init__(
+        self,
+        index: GitLineageIndex,
+        targets: LintTargets,
+        overlay: dict[str, Optional[LineageRecord]]
+    ):
+        self.index = index
+        self.targets = targets
+        # Changed path -> its record in the target tree (None: not in the chain)
+        self.overlay = overlay
+        self._records: dict[str, LineageRecord] = {}
+        self._defining: dict[str, list[tuple[str, LineageRecord]]] = {}
+    
+    def _record(self, row: dict) -> LineageRecord:
+        record = self._records.get(row["path"])
+        if record is None:
+            record = edge_artifact(row, self.targets.display(row["path"]))
+            self._records[row["path"]] = record
+        return record
+    
+    def _merge(
+        self,
+        rows: list[dict],
+        matches: Iterable[tuple[str, LineageRecord]]
+    ) -> list[tuple[str, LineageRecord]]:
+        merged = [
+            (row["path"], self._record(row)) for row in rows if row["path"] not in self.overlay
+        ]
+        merged.extend(matches)
+        merged.sort(key=lambda pair: pair[0])
+        return merged
+    
+    def defining(self, artifact_id: str) -> list[tuple[str, LineageRecord]]:
+        """(path, record) of every artifact with this id, in path order."""
+        found = self._defining.get(artifact_id)
+        if found is None:
+            found = self._merge(self.index.defining(artifact_id), (
+                (path, record) for path, record in self.overlay.items()
+                if record is not None and record.id == artifact_id
+            ))
+            self._defining[artifact_id] = found
+        return found
+    
+    def children(self, artifact_id: str) -> list[tuple[str, LineageRecord]]:
+        """(path, record) of every artifact whose parent is this id."""
+        return self._merge(self.index.children(artifact_id), (
+            (path, record) for path, record in self.overlay.items()
+            if record is not None and record.parent_id == artifact_id
+        ))
+    
+    def get(self, artifact_id: str, default: object = None) -> object:
+        found = self.defining(artifact_id)
+        return found[-1][1] if found else default
+    
+    def __contains__(self, artifact_id: str) -> bool:
+        return bool(self.defining(artifact_id))
+
+
+def base_ids(targets: LintTargets, base: str, changed: list[tuple[str, str]]) -> set[str]:
+    """Ids the modified and deleted files defined in base."""
+    specs = [f"{base}:{path}" for status, path in changed if status != "A"]
+    ids = set()
+    for spec, data in iter_blobs(targets.root, specs):
+        path = spec.split(":", 1)[1]
+        explicit = targets.explicit(path)
+        row = parse_edge(path, bool(explicit), data) if data is not None else None
+        if row is not None and row["artifact_id"]:
+            ids.add(row["artifact_id"])
+    return ids
+
+
+def verify_changed_chain(tree: ChangedTree, seed_ids: set[str]) -> tuple[dict, int]:
+    """
+    Chain checks for the changed records and everything they can affect.
+    
+    Returns (verify_lineage result, number of artifacts checked).
+    """
+    affected = {
+        path: record for path, record in tree.overlay.items() if record is not None
+    }
+    
+    # Descendants of every touched id re-run their upstream and cycle
+    # checks; other definitions of a touched id re-run their duplicate check
+    for artifact_id in seed_ids:
+        affected.update(tree.defining(artifact_id))
+    stack = list(seed_ids)
+    seen = set()
+    while stack:
+        artifact_id = stack.pop()
+        if artifact_id in seen:
+            continue
+        seen.add(artifact_id)
+        for path, record in tree.children(artifact_id):
+            affected[path] = record
+            if record.id:
+                stack.append(record.id)
+    
+    paths = sorted(affected)
+    records = [affected[path] for path in paths]
+    
+    errors = []
+    for record in records:
+        if not record.is_log:
+            errors.extend(verify_upstream_reference(record, tree))
+    errors.extend(detect_cycles(records, tree))
+    for path, record in zip(paths, records):
+        if record.id:
+            first_path, first = tree.defining(record.id)[0]
+            if first_path != path:
+                errors.append(duplicate_error(record, first))
+    
+    result = {
+        "linter": "verify_lineage",
+        "passed": not errors,
+        "artifacts_checked": len(records),
+        "errors": errors,
+        "warnings": [],
+    }
+    return result, len(records)
+
+
+def lint_changes(
+    paths: list[Path],
+    recursive: bool = False,
+    since: Optional[str] = None,
+    registry: Optional[SchemaRegistry] = None,
+    jobs: int = 1,
+    skip_chain: bool = False,
+    index_path: Optional[Path] = None,
+    use_index_cache: bool = True
+) -> tuple[list[dict], Optional[dict], dict]:
+    """
+    Lint the files changed since REV (since), or the staged changes.
+    
+    Returns (validation results of the changed files, chain result or None
+    if skip_chain, stats). The index lives at index_path (default: per
+    repository and roots in .cheddar/cache); with use_index_cache False it
+    is built in memory and discarded. Raises GitError.
+    """
+    if registry is None:
+        registry = get_registry()
+    profiler = get_profiler()
+    
+    root = repo_root(paths[0])
+    targets = LintTargets(root, paths, recursive)
+    head = resolve_commit(root, "HEAD")
+    
+    # 1. What changed, and the changed files' content in the target tree
+    with profiler.stage("discover"):
+        if since is not None:
+            base = git(root, "merge-base", resolve_commit(root, since), head).decode().strip()
+            changed = diff_paths(root, base, head, targets.pathspecs)
+            target_prefix = f"{head}:"
+        else:
+            base = head
+            changed = diff_paths(root, base, None, targets.pathspecs)
+            target_prefix = ":"
+        changed = [(status, path) for status, path in changed if targets.explicit(path) is not None]
+    
+    present = [path for status, path in changed if status in PRESENT_STATUSES]
+    validation_results = []
+    overlay: dict[str, Optional[LineageRecord]] = {
+        path: None for status, path in changed if status not in PRESENT_STATUSES
+    }
+    
+    with profiler.stage("validate"):
+        blobs = iter_blobs(root, [f"{target_prefix}{path}" for path in present])
+        for path, (_, data) in zip(present, blobs):
+            display = targets.display(path)
+            entry = CorpusEntry(Path(display), None, None, bool(targets.explicit(path)))
+            if data is None:
+                entry.error = "Failed to load file: not found in git"
+            else:
+                with profiler.file("parse", display):
+                    try:
+                        entry.artifact = parse_yaml(data, display)
+                    except Exception as e:
+                        entry.error = f"Invalid YAML: {e}"
+            
+            if entry.error is not None:
+                validation_results.append(load_error_result(entry.path, entry.error))
+            else:
+                validation_results.append(
+                    validate_loaded_artifact(entry.artifact, entry.path, registry=registry)
+                )
+            overlay[path] = None
+            if entry.in_chain:
+                row = edge_fields(entry.artifact)
+                row["is_log"] = "documentation_log" in entry.artifact
+                overlay[path] = edge_artifact(row, display)
+    
+    stats = {
+        "mode": "since" if since is not None else "staged",
+        "base": base,
+        "files_changed": len(changed),
+        "files_validated": len(validation_results),
+        "artifacts_checked": 0,
+        "index_files_parsed": 0,
+    }
+    if skip_chain:
+        return validation_results, None, stats
+    
+    # 2. Chain checks against the lineage index of HEAD
+    index = GitLineageIndex(
+        (index_path or find_index_path(targets)) if use_index_cache else None
+    )
+    try:
+        with profiler.stage("index"):
+            stats["index_files_parsed"] = index.sync(targets, head, jobs)
+        with profiler.stage("chain"):
+            seed_ids = base_ids(targets, base, changed)
+            seed_ids.update(
+                record.id for record in overlay.values() if record is not None and record.id
+            )
+            tree = ChangedTree(index, targets, overlay)
+            chain_result, stats["artifacts_checked"] = verify_changed_chain(tree, seed_ids)
+    finally:
+        index.close()
+    
+    return validation_results, chain_result, stats
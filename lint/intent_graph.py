@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Cheddar Intent Graph Queries
+
+Intent graphs are derived views over the canonical artifact hierarchy (see
+docs/intent-graphs.md and ADR-001). IntentGraph indexes that hierarchy once
+so questions like "show me everything stinky under this mission" do not
+need the tree to be reloaded and walked by hand.
+
+Each top-level tree (a mission, or an artifact whose parent is missing) is
+numbered in preorder, nested-set style: an artifact at position p with
+subtree size s has exactly the positions p+1 .. p+s-1 as descendants. So:
+
+    - subtree queries are one slice of the preorder,
+    - "is A above B" is two integer comparisons,
+    - per-state position lists make "descendants in state X" a pair of
+      binary searches plus the matches,
+    - ancestor paths follow parent links (bounded by the hierarchy depth).
+
+Updates are incremental: a state change only edits the per-state lists,
+and adding, moving or removing an artifact re-numbers only the top-level
+trees it left and joined.
+
+Artifacts caught in a reference cycle (or below one) are not part of any
+tree and do not appear in query results.
+
+Usage:
+    python intent_graph.py <directory> --recursive --subtree <id>
+    python intent_graph.py <directory> --recursive --ancestors <id>
+    python intent_graph.py <directory> --recursive --state stinky
+    python intent_graph.py <directory> --recursive --stinky <id>
+
+Exit codes:
+    0 - Success
+    2 - Usage/configuration error (e.g. unknown artifact id)
+    3 - Internal error
+"""
+
+import argparse
+import json
+import sys
+from bisect import bisect_left, bisect_right, insort
+from pathlib import Path
+from typing import Optional
+
+from corpus import ArtifactCorpus
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+CHEDDAR_STATES = ("active", "resolved", "stinky")
+
+
+class IntentNode:
+    """The parts of an artifact the intent graph needs."""
+    
+    __slots__ = ("artifact_id", "level", "parent", "state", "title", "source")
+    
+    def __init__(self, artifact: dict):
+        self.artifact_id = artifact.get("id")
+        self.level = artifact.get("level")
+        self.parent = artifact.get("supports_upper_layer")
+        self.state = artifact.get("cheddar_state")
+        self.title = artifact.get("title")
+        self.source = artifact.get("_source_path")
+    
+    def to_dict(self) -> dict:
+        return {
+            "id": self.artifact_id,
+            "level": self.level,
+            "cheddar_state": self.state,
+            "title": self.title,
+            "file": self.source,
+        }
+
+
+class _Tree:
+    """Nested-set numbering of one top-level tree."""
+    
+    __slots__ = ("root", "order", "position", "size", "by_state")
+    
+    def __init__(self, root: str):
+        self.root = root
+        # Preorder ids; position[id] indexes order, size[i] is the subtree
+        # size of order[i] (itself included)
+        self.order: list[str] = []
+        self.position: dict[str, int] = {}
+        self.size: list[int] = []
+        # cheddar_state -> ascending preorder positions
+        self.by_state: dict[str, list[int]] = {}
+
+
+class IntentGraph:
+    """Interval-indexed view of the artifact hierarchy."""
+    
+    def __init__(self):
+        self.nodes: dict[str, IntentNode] = {}
+        self.children: dict[str, set[str]] = {}
+        self.trees: dict[str, _Tree] = {}
+        self.tree_of: dict[str, str] = {}
+    
+    @classmethod
+    def build(cls, artifacts: list[dict]) -> "IntentGraph":
+        """Index every artifact (later duplicates win, logs are skipped)."""
+        graph = cls()
+        for artifact in artifacts:
+            if "documentation_log" in artifact or not artifact.get("id"):
+                continue
+            graph._link(IntentNode(artifact))
+        for artifact_id in graph._top_level():
+            graph._number(artifact_id)
+        return graph
+    
+    # -- structure -----------------------------------------------------------
+    
+    def _link(self, node: IntentNode) -> None:
+        old = self.nodes.get(node.artifact_id)
+        if old is not None:
+            self._unlink(old)
+        self.nodes[node.artifact_id] = node
+        if node.parent:
+            self.children.setdefault(node.parent, set()).add(node.artifact_id)
+    
+    def _unlink(self, node: IntentNode) -> None:
+        siblings = self.children.get(node.parent)
+        if siblings is not None:
+            siblings.discard(node.artifact_id)
+            if not siblings:
+                del self.children[node.parent]
+    
+    def _is_top_level(self, artifact_id: str) -> bool:
+        return self.nodes[artifact_id].parent not in self.nodes
+    
+    def _top_level(self) -> list[str]:
+        return sorted(
+            artifact_id for artifact_id in self.nodes
+            if self._is_top_level(artifact_id)
+        )
+    
+    def _root_of(self, artifact_id: str) -> Optional[str]:
+        """Top-level ancestor of artifact_id, or None if it sits on a cycle."""
+        seen = set()
+        current = artifact_id
+        while True:
+            if current in seen:
+                return None
+            seen.add(current)
+            parent = self.nodes[current].parent
+            if parent not in self.nodes:
+                return current
+            current = parent
+    
+    def _number(self, root: str) -> None:
+        """(Re)build the nested-set numbering of the tree under root."""
+        old = self.trees.pop(root, None)
+        tree = _Tree(root)
+        
+        # Iterative preorder; children in id order for stable numbering
+        stack = [root]
+        while stack:
+            artifact_id = stack.pop()
+            tree.position[artifact_id] = len(tree.order)
+            tree.order.append(artifact_id)
+            stack.extend(sorted(self.children.get(artifact_id, ()), reverse=True))
+        
+        tree.size = [1] * len(tree.order)
+        for index in range(len(tree.order) - 1, 0, -1):
+            parent = self.nodes[tree.order[index]].parent
+            tree.size[tree.position[parent]] += tree.size[index]
+        
+        for index, artifact_id in enumerate(tree.order):
+            state = self.nodes[artifact_id].state
+            if state:
+                tree.by_state.setdefault(state, []).append(index)
+            self.tree_of[artifact_id] = root
+        
+        if old is not None:
+            for artifact_id in old.order:
+                if artifact_id not in tree.position and self.tree_of.get(artifact_id) == root:
+                    del self.tree_of[artifact_id]
+        
+        self.trees[root] = tree
+    
+    def _drop(self, root: str) -> None:
+        """Forget the tree under a root that is no longer top-level."""
+        tree = self.trees.pop(root, None)
+        if tree is None:
+            return
+        for artifact_id in tree.order:
+            if self.tree_of.get(artifact_id) == root:
+                del self.tree_of[artifact_id]
+    
+    # -- incremental updates -------------------------------------------------
+    
+    def upsert(self, artifact: dict) -> None:
+        """Add or replace one artifact, re-numbering only affected trees."""
+        if "documentation_log" in artifact or not artifact.get("id"):
+            return
+        self._apply({artifact["id"]: artifact})
+    
+    def remove(self, artifact_id: str) -> None:
+        """Remove one artifact; its children become top-level."""
+        self._apply({artifact_id: None})
+    
+    def refresh(self, artifacts: list[dict]) -> set[str]:
+        """
+        Bring the index in line with the current artifacts.
+        
+        Returns the ids that were added, removed or changed.
+        """
+        current = {}
+        for artifact in artifacts:
+            if "documentation_log" not in artifact and artifact.get("id"):
+                current[artifact["id"]] = artifact
+        
+        changes = {artifact_id: None for artifact_id in self.nodes if artifact_id not in current}
+        for artifact_id, artifact in current.items():
+            old = self.nodes.get(artifact_id)
+            node = IntentNode(artifact)
+            if old is None or any(
+                getattr(old, slot) != getattr(node, slot) for slot in IntentNode.__slots__
+            ):
+                changes[artifact_id] = artifact
+        
+        self._apply(changes)
+        return set(changes)
+    
+    def _apply(self, changes: dict[str, Optional[dict]]) -> None:
+        """
+        Replace (artifact) or remove (None) artifacts by id, then re-number
+        every tree they left or joined, once.
+        """
+        affected = set()
+        moved = []
+        for artifact_id, artifact in changes.items():
+            old = self.nodes.get(artifact_id)
+            if old is not None and artifact is not None:
+                node = IntentNode(artifact)
+                if node.parent == old.parent:
+                    # Same place in the tree: only the state lists change
+                    self._restate(old, node)
+                    continue
+            
+            # Trees the artifact leaves, and trees rooted at its children
+            # (which stop or start being top-level)
+            affected.add(self.tree_of.get(artifact_id))
+            affected.add(artifact_id)
+            affected.update(self.children.get(artifact_id, ()))
+            
+            old = self.nodes.pop(artifact_id, None)
+            if old is not None:
+                self._unlink(old)
+            if artifact is not None:
+                self._link(IntentNode(artifact))
+                moved.append(artifact_id)
+        
+        # Trees the artifacts join
+        for artifact_id in moved:
+            affected.add(self._root_of(artifact_id))
+        
+        self._renumber(affected)
+    
+    def _restate(self, old: IntentNode, node: IntentNode) -> None:
+        """Swap in a node whose parent is unchanged, keeping the numbering."""
+        self.nodes[node.artifact_id] = node
+        root = self.tree_of.get(node.artifact_id)
+        if root is None or old.state == node.state:
+            return
+        
+        tree = self.trees[root]
+        position = tree.position[node.artifact_id]
+        if old.state:
+            positions = tree.by_state[old.state]
+            del positions[bisect_left(positions, position)]
+            if not positions:
+                del tree.by_state[old.state]
+        if node.state:
+            insort(tree.by_state.setdefault(node.state, []), position)
+    
+    def _renumber(self, roots: set[Optional[str]]) -> None:
+        for root in roots:
+            if root is None:
+                continue
+            if root in self.nodes and self._is_top_level(root):
+                self._number(root)
+            else:
+                self._drop(root)
+    
+    # -- queries -------------------------------------------------------------
+    
+    def _locate(self, artifact_id: str) -> tuple[_Tree, int]:
+        root = self.tree_of.get(artifact_id)
+        if root is None:
+            raise KeyError(artifact_id)
+        tree = self.trees[root]
+        return tree, tree.position[artifact_id]
+    
+    def __contains__(self, artifact_id: str) -> bool:
+        return artifact_id in self.tree_of
+    
+    def subtree(self, artifact_id: str, include_self: bool = False) -> list[str]:
+        """Every id below artifact_id, in preorder."""
+        tree, position = self._locate(artifact_id)
+        start = position if include_self else position + 1
+        return tree.order[start:position + tree.size[position]]
+    
+    def ancestors(self, artifact_id: str) -> list[str]:
+        """Ids from the parent of artifact_id up to its top-level artifact."""
+        self._locate(artifact_id)
+        path = []
+        parent = self.nodes[artifact_id].parent
+        while parent in self.nodes:
+            path.append(parent)
+            parent = self.nodes[parent].parent
+        return path
+    
+    def is_ancestor(self, ancestor_id: str, artifact_id: str) -> bool:
+        """Whether ancestor_id is strictly above artifact_id."""
+        if self.tree_of.get(ancestor_id) != self.tree_of.get(artifact_id):
+            return False
+        tree, above = self._locate(ancestor_id)
+        below = tree.position[artifact_id]
+        return above < below < above + tree.size[above]
+    
+    def with_state(self, state: str) -> list[str]:
+        """Every indexed id whose cheddar_state is state, tree by tree."""
+        found = []
+        for root in sorted(self.trees):
+            tree = self.trees[root]
+            found.extend(tree.order[index] for index in tree.by_state.get(state, ()))
+        return found
+    
+    def descendants_with_state(self, artifact_id: str, state: str) -> list[str]:
+        """Ids below artifact_id whose cheddar_state is state, in preorder."""
+        tree, position = self._locate(artifact_id)
+        positions = tree.by_state.get(state, [])
+        low = bisect_right(positions, position)
+        high = bisect_left(positions, position + tree.size[position])
+        return [tree.order[index] for index in positions[low:high]]
+    
+    def stinky_descendants(self, artifact_id: str) -> list[str]:
+        """Stinky artifacts below artifact_id, i.e. what is blocking it."""
+        return self.descendants_with_state(artifact_id, "stinky")
+    
+    def describe(self, artifact_ids: list[str]) -> list[dict]:
+        """Node summaries for query output."""
+        return [self.nodes[artifact_id].to_dict() for artifact_id in artifact_ids]
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Query the Cheddar artifact hierarchy as an intent graph."
+    )
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="+",
+        help="Artifact files or directories",
+    )
+    parser.add_argument(
+        "--recursive", "-r",
+        action="store_true",
+        help="Recursively process directories",
+    )
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument(
+        "--subtree",
+        metavar="ID",
+        help="Everything below an artifact",
+    )
+    query.add_argument(
+        "--ancestors",
+        metavar="ID",
+        help="The path from an artifact up to its mission",
+    )
+    query.add_argument(
+        "--state",
+        choices=CHEDDAR_STATES,
+        help="Every artifact in a cheddar_state",
+    )
+    query.add_argument(
+        "--stinky",
+        metavar="ID",
+        help="Stinky artifacts below an artifact",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output results as JSON",
+    )
+    
+    args = parser.parse_args()
+    
+    for path in args.paths:
+        if not path.exists():
+            print(f"Error: Path not found: {path}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+    
+    try:
+        artifacts = ArtifactCorpus.load(args.paths, args.recursive).lineage_artifacts()
+        graph = IntentGraph.build(artifacts)
+        
+        try:
+            if args.subtree:
+                found = graph.subtree(args.subtree)
+            elif args.ancestors:
+                found = graph.ancestors(args.ancestors)
+            elif args.stinky:
+                found = graph.stinky_descendants(args.stinky)
+            else:
+                found = graph.with_state(args.state)
+        except KeyError as e:
+            print(f"Error: Unknown or cyclic artifact: {e.args[0]}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+        
+        nodes = graph.describe(found)
+        if args.json:
+            print(json.dumps(nodes, indent=2))
+        else:
+            for node in nodes:
+                state = f" [{node['cheddar_state']}]" if node["cheddar_state"] else ""
+                print(f"{node['id']} ({node['level']}){state}")
+            print(f"{len(nodes)} artifact(s)")
+        
+        return EXIT_SUCCESS
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
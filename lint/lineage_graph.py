@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Cheddar Lineage Graph
+
+Reusable in-memory graph of the artifact hierarchy, built in one pass over
+the parsed artifacts:
+
+    - index: artifact id -> defining artifact (the last definition wins,
+      matching verify_lineage.build_artifact_index)
+    - duplicates: every definition of ids defined more than once, so they
+      are reported instead of silently overwritten
+    - children: artifact id -> ids of the artifacts whose
+      supports_upper_layer names it
+
+Cycle detection is linear: each id is walked at most once and the outcome
+(which cycle, if any, its ancestor walk runs into) is memoised for every
+id on the walk, instead of re-walking the chain from every artifact.
+
+The graph accepts parsed artifact dicts or LineageRecords. A record keeps
+only the fields chain verification reads, so a large corpus can be
+verified without keeping every parsed document alive.
+
+Usage:
+    from lineage_graph import LineageGraph
+    
+    graph = LineageGraph(artifacts)
+    for artifact_id in graph.topological_order():
+        ...
+"""
+
+import os
+import sys
+from typing import Iterable, Optional
+
+# Marks ids on the walk in progress inside find_cycle_entries
+_ON_PATH = object()
+
+
+def _intern(value: object) -> object:
+    """Intern strings, so ids and hashes repeated across records are shared."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class LineageRecord:
+    """
+    The lineage fields of one artifact, without the rest of its document.
+    
+    Holds the id, level, parent id, own and upstream hash, and source path
+    of an artifact; verify_lineage's checks read nothing else. Strings are
+    interned: a child's parent id and upstream hash are the same objects as
+    its parent's id and hash, and files in one directory share its path.
+    
+    get() and `in` answer like the parsed artifact dict would, so records
+    can be passed wherever verify_lineage and LineageGraph take artifacts.
+    """
+    
+    __slots__ = (
+        "id", "level", "parent_id", "hash", "upstream_hash",
+        "directory", "name", "is_log", "hash_errors",
+    )
+    
+    def __init__(
+        self,
+        artifact_id: object,
+        level: object,
+        parent_id: object,
+        hash: object,
+        upstream_hash: object,
+        path: str,
+        is_log: bool = False
+    ):
+        self.id = _intern(artifact_id)
+        self.level = _intern(level)
+        self.parent_id = _intern(parent_id)
+        self.hash = _intern(hash)
+        self.upstream_hash = _intern(upstream_hash)
+        directory, self.name = os.path.split(path)
+        self.directory = sys.intern(directory)
+        self.is_log = is_log
+        # INV-004 errors found while the document was loaded, if any
+        self.hash_errors: Optional[list] = None
+    
+    @classmethod
+    def from_artifact(cls, artifact: dict, path: str) -> "LineageRecord":
+        """Extract the record of a parsed artifact; the dict is not kept."""
+        lineage = artifact.get("lineage") or {}
+        if not isinstance(lineage, dict):
+            lineage = {}
+        return cls(
+            artifact.get("id"),
+            artifact.get("level"),
+            artifact.get("supports_upper_layer"),
+            lineage.get("hash"),
+            lineage.get("upstream_hash"),
+            path,
+            "documentation_log" in artifact,
+        )
+    
+    @property
+    def path(self) -> str:
+        """The source file the record was read from."""
+        return os.path.join(self.directory, self.name)
+    
+    def get(self, key: str, default: object = None) -> object:
+        """Read a field by the artifact key it came from."""
+        if key == "id":
+            return self.id
+        if key == "supports_upper_layer":
+            return self.parent_id
+        if key == "level":
+            return self.level
+        if key == "lineage":
+            return {"hash": self.hash, "upstream_hash": self.upstream_hash}
+        if key == "_source_path":
+            return self.path
+        if key == "documentation_log" and self.is_log:
+            return True
+        return default
+    
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+    
+    def __repr__(self) -> str:
+        return f"LineageRecord({self.id!r}, {self.path!r})"
+
+
+def find_cycle_entries(
+    artifact_index: dict[str, dict],
+    start_ids: Iterable[str],
+    memo: Optional[dict[str, Optional[str]]] = None
+) -> dict[str, Optional[str]]:
+    """
+    Resolve which cycle each id's ancestor walk runs into.
+    
+    Walking up supports_upper_layer from an id either ends (at a mission, a
+    missing parent or an artifact without a reference) or runs into a loop.
+    For every id reached from start_ids, the returned mapping holds the
+    first id repeated on that walk, or None if the walk ends. Ids on a cycle
+    map to themselves.
+    
+    Pass the same memo across calls to reuse earlier walks. Total work is
+    linear in the number of ids visited.
+    """
+    entries = {} if memo is None else memo
+    
+    for start_id in start_ids:
+        if not start_id or start_id in entries:
+            continue
+        
+        # Walk up until a resolved id or the end of the chain; ids on the
+        # current walk are marked so a loop is recognised on first repeat
+        path = []
+        current_id = start_id
+        while current_id and current_id not in entries:
+            entries[current_id] = _ON_PATH
+            path.append(current_id)
+            current = artifact_index.get(current_id)
+            current_id = current.get("supports_upper_layer") if current else None
+        
+        if not current_id:
+            outcome = None
+        elif entries[current_id] is _ON_PATH:
+            # New cycle: its members repeat themselves first, everything
+            # leading into it repeats the id where the walk entered it
+            cycle_start = path.index(current_id)
+            for member in path[cycle_start:]:
+                entries[member] = member
+            outcome = current_id
+            del path[cycle_start:]
+        else:
+            outcome = entries[current_id]
+        
+        for artifact_id in path:
+            entries[artifact_id] = outcome
+    
+    return entries
+
+
+class LineageGraph:
+    """Parent/child adjacency, duplicates and cycles of a set of artifacts."""
+    
+    def __init__(self, artifacts: list[dict]):
+        self.artifacts = artifacts
+        self.index: dict[str, dict] = {}
+        self.children: dict[str, list[str]] = {}
+        # Every definition of ids defined more than once, in input order
+        self._duplicates: dict[str, list[dict]] = {}
+        
+        index = self.index
+        for artifact in artifacts:
+            artifact_id = artifact.get("id")
+            if not artifact_id:
+                continue
+            if artifact_id in index:
+                self._duplicates.setdefault(artifact_id, [index[artifact_id]]).append(artifact)
+            index[artifact_id] = artifact
+        
+        children = self.children
+        for artifact_id, artifact in index.items():
+            parent_id = artifact.get("supports_upper_layer")
+            if parent_id:
+                siblings = children.get(parent_id)
+                if siblings is None:
+                    children[parent_id] = [artifact_id]
+                else:
+                    siblings.append(artifact_id)
+        
+        self._cycle_entries: dict[str, Optional[str]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def __contains__(self, artifact_id: str) -> bool:
+        return artifact_id in self.index
+    
+    def parent_id(self, artifact_id: str) -> Optional[str]:
+        """The supports_upper_layer of the artifact defining artifact_id."""
+        artifact = self.index.get(artifact_id)
+        return artifact.get("supports_upper_layer") if artifact else None
+    
+    def duplicates(self) -> dict[str, list[dict]]:
+        """Ids defined by more than one artifact, with every definition."""
+        return dict(self._duplicates)
+    
+    def first_definition(self, artifact_id: str) -> Optional[dict]:
+        """The first artifact (in input order) defining artifact_id."""
+        definitions = self._duplicates.get(artifact_id)
+        return definitions[0] if definitions else self.index.get(artifact_id)
+    
+    def cycle_entry(self, artifact_id: str) -> Optional[str]:
+        """
+        First id repeated when walking up from artifact_id.
+        
+        None if the walk ends without looping. Walks are memoised, so
+        calling this for every id is linear overall.
+        """
+        if artifact_id not in self._cycle_entries:
+            find_cycle_entries(self.index, (artifact_id,), self._cycle_entries)
+        return self._cycle_entries.get(artifact_id)
+    
+    def cycle_entries(self) -> dict[str, Optional[str]]:
+        """cycle_entry for every id, resolved in one linear pass."""
+        return find_cycle_entries(self.index, self.index, self._cycle_entries)
+    
+    def cycles(self) -> list[list[str]]:
+        """Every reference cycle, each as its ids in walk order."""
+        self.cycle_entries()
+        cycles = []
+        seen = set()
+        for artifact_id, entry in self._cycle_entries.items():
+            if entry != artifact_id or artifact_id in seen:
+                continue
+            cycle = []
+            current_id = artifact_id
+            while current_id not in seen:
+                seen.add(current_id)
+                cycle.append(current_id)
+                current_id = self.parent_id(current_id)
+            cycles.append(cycle)
+        return cycles
+    
+    def roots(self) -> list[str]:
+        """Ids whose parent is absent (missions, orphans), in input order."""
+        index = self.index
+        return [
+            artifact_id for artifact_id, artifact in index.items()
+            if artifact.get("supports_upper_layer") not in index
+        ]
+    
+    def topological_order(self) -> list[str]:
+        """
+        Ids ordered so every parent precedes its children.
+        
+        Ids on a cycle, or below one, have no such order and are omitted.
+        """
+        order = self.roots()
+        children = self.children
+        for artifact_id in order:
+            below = children.get(artifact_id)
+            if below:
+                order.extend(below)
+        return order
+    
+    def descendants(self, artifact_id: str) -> list[str]:
+        """Every id below artifact_id (cycle-safe), breadth first."""
+        found = []
+        seen = {artifact_id}
+        frontier = [artifact_id]
+        while frontier:
+            next_frontier = []
+            for current_id in frontier:
+                for child_id in self.children.get(current_id, ()):
+                    if child_id not in seen:
+                        seen.add(child_id)
+                        found.append(child_id)
+                        next_frontier.append(child_id)
+            frontier = next_frontier
+        return found
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Cheddar Incremental Lint State
+
+Persistent SQLite record of the last lint run, used by
+`run_all.py --incremental` to re-check only what changed.
+
+For every file the state stores its size, mtime and content digest, its
+schema validation result, and its lineage edge (id, parent id, hash,
+upstream_hash) together with the INV-003/INV-005 reference errors found for
+it. On the next run:
+
+    1. Files whose size and mtime are unchanged are trusted as-is. Files
+       whose stat changed are re-hashed; only a changed content digest
+       marks them as changed.
+    2. Only changed files are parsed and schema-validated.
+    3. Upstream-reference checks are re-run for changed artifacts and for
+       every artifact whose parent id now resolves to a different
+       lineage.hash (or no longer resolves at all). All other artifacts
+       keep their stored errors.
+    4. Cycle and duplicate-id detection run over the stored lineage edges;
+       no documents are re-read for them.
+
+A change to any schema file, to semantic_rules.py or to the rules version
+invalidates the whole state. The state describes the tree of the last run; files not seen in the
+current run are dropped from it.
+
+Usage:
+    state = LintState(Path(".cheddar/lint-state.sqlite"))
+    validation_results, chain_result, stats = state.run(paths, recursive=True)
+"""
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+from corpus import ArtifactCorpus
+from lineage_graph import LineageRecord
+from loader import ParseCache, content_digest, read_file
+from schema_registry import SchemaRegistry, get_registry
+from semantic_rules import rules_fingerprint
+from validate_artifact import validate_corpus
+from verify_lineage import detect_cycles, detect_duplicates, verify_upstream_reference
+
+# Bump whenever validation or chain rules change, so stored results are
+# not reused across incompatible lint versions (edits to semantic_rules.py
+# are picked up by its rules_fingerprint)
+RULES_VERSION = 2
+
+STATE_FILE_NAME = "lint-state.sqlite"
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT,
+    result TEXT NOT NULL,
+    in_chain INTEGER NOT NULL,
+    is_log INTEGER NOT NULL,
+    artifact_id TEXT,
+    level TEXT,
+    parent_id TEXT,
+    hash TEXT,
+    upstream_hash TEXT,
+    chain_errors TEXT
+);
+CREATE INDEX IF NOT EXISTS artifacts_parent_id ON artifacts (parent_id);
+"""
+
+COLUMNS = (
+    "path", "size", "mtime_ns", "digest", "result", "in_chain", "is_log",
+    "artifact_id", "level", "parent_id", "hash", "upstream_hash", "chain_errors",
+)
+
+
+def _text(value: object) -> Optional[str]:
+    """Coerce a lineage field to the TEXT stored in the state."""
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+def edge_fields(artifact: dict) -> dict:
+    """Extract the lineage edge of a parsed artifact."""
+    lineage = artifact.get("lineage") or {}
+    if not isinstance(lineage, dict):
+        lineage = {}
+    return {
+        "artifact_id": _text(artifact.get("id")),
+        "level": _text(artifact.get("level")),
+        "parent_id": _text(artifact.get("supports_upper_layer")),
+        "hash": _text(lineage.get("hash")),
+        "upstream_hash": _text(lineage.get("upstream_hash")),
+    }
+
+
+def edge_artifact(row: dict, source: str) -> LineageRecord:
+    """Rebuild the lineage record verify_lineage needs from a row."""
+    return LineageRecord(
+        row["artifact_id"],
+        row["level"],
+        row["parent_id"],
+        row["hash"],
+        row["upstream_hash"],
+        source,
+        bool(row["is_log"]),
+    )
+
+
+class LintState:
+    """SQLite-backed results of the previous lint run."""
+    
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA_SQL)
+    
+    def close(self) -> None:
+        self.conn.close()
+    
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _load_rows(self) -> dict[str, dict]:
+        cursor = self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM artifacts")
+        return {row[0]: dict(zip(COLUMNS, row)) for row in cursor}
+    
+    def run(
+        self,
+        paths: list[Path],
+        recursive: bool = False,
+        registry: Optional[SchemaRegistry] = None,
+        jobs: int = 1,
+        parse_cache: Optional[ParseCache] = None,
+        skip_chain: bool = False
+    ) -> tuple[list[dict], Optional[dict], dict]:
+        """
+        Lint paths incrementally and update the state.
+        
+        Returns (validation results, chain result or None if skip_chain,
+        stats) where the results cover every discovered file, exactly as a
+        full run_all_checks would report them.
+        """
+        if registry is None:
+            registry = get_registry()
+        
+        fingerprint = f"{RULES_VERSION}:{rules_fingerprint()}:{registry.fingerprint()}"
+        previous = self._load_rows()
+        reset = self._get_meta("fingerprint") != fingerprint
+        if reset:
+            previous = {}
+        
+        discovered = ArtifactCorpus.discover(paths, recursive)
+        
+        # 1. Find changed files: stat first, digest only when stat differs
+        rows: dict[str, dict] = {}
+        order: list[tuple[str, Path]] = []
+        changed: list[tuple[Path, bool]] = []
+        dirty_keys: set[str] = set()
+        stats_by_key: dict[str, tuple[int, int]] = {}
+        
+        for file_path, explicit in discovered:
+            key = os.path.abspath(file_path)
+            order.append((key, file_path))
+            old = previous.get(key)
+            
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                changed.append((file_path, explicit))
+                continue
+            
+            if old is not None and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                rows[key] = old
+                continue
+            
+            if old is not None and old["digest"] is not None:
+                try:
+                    data, mtime_ns = read_file(file_path)
+                except OSError:
+                    changed.append((file_path, explicit))
+                    continue
+                if content_digest(data) == old["digest"]:
+                    rows[key] = dict(old, size=len(data), mtime_ns=mtime_ns)
+                    dirty_keys.add(key)
+                    continue
+            
+            stats_by_key[key] = (st.st_size, st.st_mtime_ns)
+            changed.append((file_path, explicit))
+        
+        # 2. Parse and validate only the changed files
+        corpus = ArtifactCorpus.from_files(changed, jobs, parse_cache)
+        validated = validate_corpus(corpus, registry, jobs)
+        
+        for entry, result in zip(corpus, validated):
+            key = os.path.abspath(entry.path)
+            size, mtime_ns = stats_by_key.get(key, (0, 0))
+            row = {
+                "path": key,
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "digest": entry.digest,
+                "result": json.dumps(result),
+                "in_chain": int(entry.in_chain),
+                "is_log": 0,
+                "artifact_id": None,
+                "level": None,
+                "parent_id": None,
+                "hash": None,
+                "upstream_hash": None,
+                "chain_errors": None,
+            }
+            if entry.in_chain:
+                row["is_log"] = int("documentation_log" in entry.artifact)
+                row.update(edge_fields(entry.artifact))
+            rows[key] = row
+        
+        changed_keys = {os.path.abspath(entry.path) for entry in corpus}
+        dirty_keys |= changed_keys
+        
+        # 3. Reassemble validation results for the whole tree
+        validation_results = []
+        for key, file_path in order:
+            result = json.loads(rows[key]["result"])
+            result["file"] = str(file_path)
+            validation_results.append(result)
+        
+        chain_result = None
+        reverified = 0
+        if not skip_chain:
+            chain_result, reverified = self._verify_chain(
+                order, rows, previous, changed_keys, dirty_keys
+            )
+        
+        removed_keys = previous.keys() - rows.keys()
+        self._save(rows, dirty_keys, removed_keys, reset, fingerprint)
+        
+        stats = {
+            "files_total": len(order),
+            "files_revalidated": len(changed_keys),
+            "artifacts_reverified": reverified,
+        }
+        return validation_results, chain_result, stats
+    
+    @staticmethod
+    def _edges_by_id(rows: dict[str, dict]) -> dict[str, list]:
+        """Map each artifact id to the sorted (path, hash) pairs defining it."""
+        edges: dict[str, list] = {}
+        for key, row in rows.items():
+            if row["in_chain"] and row["artifact_id"]:
+                edges.setdefault(row["artifact_id"], []).append((key, row["hash"]))
+        for pairs in edges.values():
+            pairs.sort()
+        return edges
+    
+    def _verify_chain(
+        self,
+        order: list[tuple[str, Path]],
+        rows: dict[str, dict],
+        previous: dict[str, dict],
+        changed_keys: set[str],
+        dirty_keys: set[str]
+    ) -> tuple[dict, int]:
+        """
+        Re-run upstream checks only where an input changed.
+        
+        Keys of rows whose stored errors were refreshed are added to
+        dirty_keys.
+        """
+        chain_keys = [key for key, _ in order if rows[key]["in_chain"]]
+        sources = {key: str(file_path) for key, file_path in order}
+        
+        artifacts = []
+        artifact_index = {}
+        for key in chain_keys:
+            artifact = edge_artifact(rows[key], sources[key])
+            artifacts.append((key, artifact))
+            if artifact.id:
+                artifact_index[artifact.id] = artifact
+        
+        # Ids whose defining files or hashes differ from the previous run;
+        # children of these ids must have their upstream check re-run
+        previous_edges = self._edges_by_id(previous)
+        current_edges = self._edges_by_id({key: rows[key] for key in chain_keys})
+        changed_ids = {
+            artifact_id
+            for artifact_id in previous_edges.keys() | current_edges.keys()
+            if previous_edges.get(artifact_id) != current_edges.get(artifact_id)
+        }
+        
+        result = {
+            "linter": "verify_lineage",
+            "passed": True,
+            "artifacts_checked": len(artifacts),
+            "errors": [],
+            "warnings": [],
+        }
+        
+        reverified = 0
+        for key, artifact in artifacts:
+            row = rows[key]
+            if row["is_log"]:
+                continue
+            
+            stale = (
+                key in changed_keys
+                or row["chain_errors"] is None
+                or row["parent_id"] in changed_ids
+            )
+            if stale:
+                errors = verify_upstream_reference(artifact, artifact_index)
+                row["chain_errors"] = json.dumps(errors)
+                dirty_keys.add(key)
+                reverified += 1
+            else:
+                errors = json.loads(row["chain_errors"])
+                for error in errors:
+                    error["file"] = sources[key]
+            
+            result["errors"].extend(errors)
+        
+        chain_artifacts = [artifact for _, artifact in artifacts]
+        result["errors"].extend(detect_cycles(chain_artifacts, artifact_index))
+        result["errors"].extend(detect_duplicates(chain_artifacts))
+        
+        if result["errors"]:
+            result["passed"] = False
+        
+        return result, reverified
+    
+    def _save(
+        self,
+        rows: dict[str, dict],
+        dirty_keys: set[str],
+        removed_keys: set[str],
+        reset: bool,
+        fingerprint: str
+    ) -> None:
+        """Write back only the rows that changed in this run."""
+        with self.conn:
+            if reset:
+                self.conn.execute("DELETE FROM artifacts")
+            self.conn.executemany(
+                "DELETE FROM artifacts WHERE path = ?",
+                [(key,) for key in removed_keys],
+            )
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO artifacts ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                [tuple(rows[key][column] for column in COLUMNS) for key in dirty_keys],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)",
+                (fingerprint,),
+            )
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Cheddar Artifact Loader
+
+Single YAML loading path for every lint tool.
+
+- Uses libyaml's CSafeLoader when PyYAML was built with it, falling back to
+  the pure-Python SafeLoader otherwise. Both accept the same safe subset.
+- ParseCache keeps parsed documents on disk (marshal format) so an
+  unchanged tree is never re-parsed. Entries are keyed by path and record
+  size, mtime and the SHA-256 of the file content; a cached document is only
+  reused when the current content digest matches, so invalidation is exact.
+
+Usage:
+    from loader import load_yaml_file
+    
+    artifact = load_yaml_file(Path("mission.yaml"))
+"""
+
+import hashlib
+import io
+import marshal
+import os
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+    LIBYAML = True
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+    LIBYAML = False
+
+# Bump when the on-disk cache layout changes
+CACHE_FORMAT_VERSION = 1
+
+PARSE_CACHE_NAME = "parsed-artifacts.marshal"
+
+
+def content_digest(data: bytes) -> str:
+    """SHA-256 hex digest of raw file content."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def parse_yaml(data: bytes, name: str = "<bytes>") -> object:
+    """
+    Parse UTF-8 YAML content with the fastest available safe loader.
+    
+    name is used in error marks, as when parsing an open file.
+    """
+    stream = io.StringIO(data.decode("utf-8"))
+    stream.name = name
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def read_file(path: Path) -> tuple[bytes, int]:
+    """Read a file's raw content; returns (data, mtime_ns)."""
+    with open(path, "rb") as f:
+        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        return f.read(), mtime_ns
+
+
+def load_yaml_file(path: Path) -> object:
+    """Load a YAML file with the fastest available safe loader."""
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed YAML documents.
+    
+    The whole cache is a single marshal file read on first use and written
+    back by save() when anything changed. Documents that marshal cannot
+    represent (e.g. unquoted YAML dates) are simply not cached. Entries of
+    files that no longer exist are dropped on save, so the cache does not
+    grow with deleted and renamed files.
+    """
+    
+    def __init__(self, cache_dir: Path):
+        self.cache_path = Path(cache_dir) / PARSE_CACHE_NAME
+        self.hits = 0
+        self.misses = 0
+        self._entries: Optional[dict] = None
+        self._dirty = False
+    
+    def _ensure_loaded(self) -> None:
+        if self._entries is not None:
+            return
+        
+        self._entries = {}
+        try:
+            with open(self.cache_path, "rb") as f:
+                payload = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        
+        if (
+            payload.get("version") == CACHE_FORMAT_VERSION
+            and payload.get("libyaml") == LIBYAML
+            and payload.get("pyyaml") == yaml.__version__
+        ):
+            self._entries = payload["entries"]
+    
+    def lookup(self, path: Path, size: int, digest: str) -> tuple[bool, object]:
+        """
+        Return (True, document) if path was cached with this exact content.
+        
+        size is compared first so a changed file is rejected cheaply.
+        """
+        self._ensure_loaded()
+        entry = self._entries.get(os.path.abspath(path))
+        if entry is not None and entry[0] == size and entry[2] == digest:
+            self.hits += 1
+            return True, entry[3]
+        
+        self.misses += 1
+        return False, None
+    
+    def store(
+        self,
+        path: Path,
+        size: int,
+        mtime_ns: int,
+        digest: str,
+        document: object
+    ) -> None:
+        """Record the parsed document for path's current content."""
+        self._ensure_loaded()
+        try:
+            marshal.dumps(document)
+        except ValueError:
+            self._entries.pop(os.path.abspath(path), None)
+            return
+        
+        self._entries[os.path.abspath(path)] = (size, mtime_ns, digest, document)
+        self._dirty = True
+    
+    def save(self) -> None:
+        """Write the cache back to disk if it changed."""
+        if not self._dirty:
+            return
+        
+        self._entries = {
+            path: entry for path, entry in self._entries.items() if os.path.exists(path)
+        }
+        payload = {
+            "version": CACHE_FORMAT_VERSION,
+            "libyaml": LIBYAML,
+            "pyyaml": yaml.__version__,
+            "entries": self._entries,
+        }
+        
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp_path, "wb") as f:
+                marshal.dump(payload, f)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+        except OSError:
+            # The cache is an optimisation; an unwritable cache dir is not an error
+            pass
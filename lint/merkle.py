@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Cheddar Merkle Roll-up Hashes
+
+Aggregates lineage hashes up the artifact hierarchy. Every artifact gets a
+subtree digest computed from its own lineage.hash and the subtree digests of
+its children (artifacts whose supports_upper_layer names it); the whole tree
+gets one root digest over the top-level subtrees (missions, plus any
+artifact whose parent is missing).
+
+With that:
+    - "has anything under mission X changed?" is one digest comparison,
+    - two checkouts are compared by descending only into differing subtrees,
+    - consumers can cache per-subtree results keyed by subtree digest.
+
+The index is saved as JSON (by default .cheddar/cache/merkle-index.json)
+and refreshed incrementally on the next run: only the changed artifacts and
+their ancestors are re-digested.
+
+Documentation logs are not part of the hierarchy and are not included.
+Artifacts caught in a reference cycle are unreachable from any top-level
+artifact and get no digest (verify_lineage reports the cycle).
+
+Usage:
+    python merkle.py <directory> [--recursive]          # Root and mission digests
+    python merkle.py <directory> --subtree <id>         # One subtree digest
+    python merkle.py <directory> --index merkle.json    # Use a specific index file
+    python merkle.py <directory> --compare other.json   # Diff against a saved index
+
+Exit codes:
+    0 - Success (and no differences with --compare)
+    1 - Differences found (--compare)
+    2 - Usage/configuration error
+    3 - Internal error
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+from corpus import ArtifactCorpus
+from schema_registry import find_cache_dir
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_DIFFERENCES = 1
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+# Bump when the digest construction or saved format changes
+MERKLE_VERSION = 1
+
+DIGEST_PREFIX = b"cheddar-merkle-v1"
+
+MERKLE_INDEX_NAME = "merkle-index.json"
+
+
+class MerkleNode:
+    """One artifact in the roll-up tree."""
+    
+    __slots__ = ("artifact_id", "level", "hash", "parent", "digest")
+    
+    def __init__(
+        self,
+        artifact_id: str,
+        level: Optional[str],
+        hash_value: Optional[str],
+        parent: Optional[str]
+    ):
+        self.artifact_id = artifact_id
+        self.level = level
+        self.hash = hash_value
+        self.parent = parent
+        self.digest: Optional[str] = None
+
+
+def _node_fields(artifact: dict) -> tuple[Optional[str], Optional[str], Optional[str]]:
+    """(level, lineage.hash, parent id) of an artifact."""
+    lineage = artifact.get("lineage") or {}
+    if not isinstance(lineage, dict):
+        lineage = {}
+    return artifact.get("level"), lineage.get("hash"), artifact.get("supports_upper_layer")
+
+
+class MerkleIndex:
+    """Subtree digests for every artifact plus one root digest."""
+    
+    def __init__(self):
+        self.nodes: dict[str, MerkleNode] = {}
+        self.children: dict[str, set[str]] = {}
+        self.root: Optional[str] = None
+    
+    # -- construction ------------------------------------------------------
+    
+    @classmethod
+    def build(cls, artifacts: list[dict]) -> "MerkleIndex":
+        """Build the index from parsed artifacts (later duplicates win)."""
+        index = cls()
+        for artifact in artifacts:
+            if "documentation_log" in artifact:
+                continue
+            artifact_id = artifact.get("id")
+            if not artifact_id:
+                continue
+            index._link(MerkleNode(artifact_id, *_node_fields(artifact)))
+        
+        for artifact_id in index.top_level():
+            index._digest_subtree(artifact_id)
+        index._update_root()
+        return index
+    
+    def _link(self, node: MerkleNode) -> None:
+        old = self.nodes.get(node.artifact_id)
+        if old is not None:
+            self._unlink_parent(old)
+        self.nodes[node.artifact_id] = node
+        if node.parent:
+            self.children.setdefault(node.parent, set()).add(node.artifact_id)
+    
+    def _unlink_parent(self, node: MerkleNode) -> None:
+        siblings = self.children.get(node.parent)
+        if siblings is not None:
+            siblings.discard(node.artifact_id)
+            if not siblings:
+                del self.children[node.parent]
+    
+    def top_level(self) -> list[str]:
+        """Ids whose parent is absent from the index, sorted."""
+        return sorted(
+            artifact_id for artifact_id, node in self.nodes.items()
+            if not node.parent or node.parent not in self.nodes
+        )
+    
+    # -- digests -----------------------------------------------------------
+    
+    def _compute(self, node: MerkleNode) -> Optional[str]:
+        """Digest of one node from its hash and its children's digests."""
+        hasher = hashlib.sha256(DIGEST_PREFIX)
+        hasher.update(b"\0" + node.artifact_id.encode("utf-8"))
+        hasher.update(b"\0" + (node.hash or "").encode("utf-8"))
+        for child_id in sorted(self.children.get(node.artifact_id, ())):
+            child_digest = self.nodes[child_id].digest
+            if child_digest is None:
+                return None
+            hasher.update(b"\0" + child_digest.encode("ascii"))
+        return f"sha256:{hasher.hexdigest()}"
+    
+    def _digest_subtree(self, artifact_id: str) -> None:
+        """Post-order (iterative) digest of every node under artifact_id."""
+        stack = [(artifact_id, False)]
+        on_path = set()
+        while stack:
+            current, expanded = stack.pop()
+            node = self.nodes[current]
+            if expanded:
+                on_path.discard(current)
+                node.digest = self._compute(node)
+                continue
+            if current in on_path:
+                continue
+            on_path.add(current)
+            stack.append((current, True))
+            for child_id in self.children.get(current, ()):
+                if child_id not in on_path:
+                    stack.append((child_id, False))
+    
+    def _update_root(self) -> None:
+        hasher = hashlib.sha256(DIGEST_PREFIX + b"\0root")
+        for artifact_id in self.top_level():
+            digest = self.nodes[artifact_id].digest or ""
+            hasher.update(b"\0" + artifact_id.encode("utf-8") + b"=" + digest.encode("ascii"))
+        self.root = f"sha256:{hasher.hexdigest()}"
+    
+    def _ancestor_path(self, artifact_id: str) -> Optional[list[str]]:
+        """
+        Ids from artifact_id up to its top-level ancestor.
+        
+        None if the parent chain loops, i.e. the node is unreachable.
+        """
+        path = []
+        seen = set()
+        current = artifact_id
+        while current in self.nodes:
+            if current in seen:
+                return None
+            seen.add(current)
+            path.append(current)
+            current = self.nodes[current].parent
+        return path
+    
+    def _clear_subtree(self, artifact_id: str) -> None:
+        """Drop the digests of an unreachable subtree."""
+        stack = [artifact_id]
+        seen = set()
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            self.nodes[current].digest = None
+            stack.extend(self.children.get(current, ()))
+    
+    def _rehash_upwards(self, artifact_ids: set[str]) -> None:
+        """Recompute digests of the given nodes and all their ancestors."""
+        # Deepest nodes first so parents see fresh child digests
+        pending = {}
+        for artifact_id in artifact_ids:
+            path = self._ancestor_path(artifact_id)
+            if path is None:
+                continue
+            for depth, node_id in enumerate(reversed(path)):
+                pending[node_id] = depth
+        
+        for node_id in sorted(pending, key=pending.get, reverse=True):
+            node = self.nodes[node_id]
+            node.digest = self._compute(node)
+    
+    def subtree_digest(self, artifact_id: str) -> Optional[str]:
+        """Subtree digest of an artifact, or None if unknown or cyclic."""
+        node = self.nodes.get(artifact_id)
+        return node.digest if node else None
+    
+    # -- incremental updates -----------------------------------------------
+    
+    def refresh(self, artifacts: list[dict]) -> set[str]:
+        """
+        Bring the index in line with the current artifacts.
+        
+        Only artifacts whose hash or parent changed (and their ancestors)
+        are re-digested. Returns the ids that were added, removed or changed.
+        """
+        current = {}
+        for artifact in artifacts:
+            if "documentation_log" in artifact:
+                continue
+            artifact_id = artifact.get("id")
+            if artifact_id:
+                current[artifact_id] = _node_fields(artifact)
+        
+        touched = set()
+        dirty = set()
+        # Nodes whose position in the tree changed; their whole subtree may
+        # have become reachable or unreachable
+        moved = set()
+        for artifact_id in list(self.nodes):
+            if artifact_id not in current:
+                node = self.nodes.pop(artifact_id)
+                self._unlink_parent(node)
+                touched.add(artifact_id)
+                dirty.add(node.parent)
+                moved.update(self.children.get(artifact_id, ()))
+        
+        for artifact_id, (level, hash_value, parent) in current.items():
+            old = self.nodes.get(artifact_id)
+            if old is not None and old.parent == parent:
+                if (old.level, old.hash) != (level, hash_value):
+                    old.level, old.hash = level, hash_value
+                    touched.add(artifact_id)
+                    dirty.add(artifact_id)
+                continue
+            if old is not None:
+                dirty.add(old.parent)
+            self._link(MerkleNode(artifact_id, level, hash_value, parent))
+            touched.add(artifact_id)
+            moved.add(artifact_id)
+        
+        for artifact_id in moved:
+            if artifact_id not in self.nodes:
+                continue
+            if self._ancestor_path(artifact_id) is None:
+                self._clear_subtree(artifact_id)
+            else:
+                self._digest_subtree(artifact_id)
+        
+        dirty.discard(None)
+        self._rehash_upwards(dirty | moved)
+        self._update_root()
+        return touched
+    
+    # -- comparison --------------------------------------------------------
+    
+    def diff(self, other: "MerkleIndex") -> dict:
+        """
+        Compare with another index, descending only into differing subtrees.
+        
+        Returns {"added": [...], "removed": [...], "changed": [...]} with ids
+        present only in self, only in other, or present in both with a
+        different lineage.hash or parent.
+        """
+        added, removed, changed = set(), set(), set()
+        if self.root == other.root:
+            return {"added": [], "removed": [], "changed": []}
+        
+        stack = list(set(self.top_level()) | set(other.top_level()))
+        seen = set()
+        while stack:
+            artifact_id = stack.pop()
+            if artifact_id in seen:
+                continue
+            seen.add(artifact_id)
+            
+            mine = self.nodes.get(artifact_id)
+            theirs = other.nodes.get(artifact_id)
+            unchanged = mine is not None and theirs is not None and mine.digest == theirs.digest
+            if unchanged and mine.digest:
+                continue
+            
+            if theirs is None:
+                added.add(artifact_id)
+            elif mine is None:
+                removed.add(artifact_id)
+            elif (mine.hash, mine.parent) != (theirs.hash, theirs.parent):
+                changed.add(artifact_id)
+            
+            stack.extend(self.children.get(artifact_id, ()))
+            stack.extend(other.children.get(artifact_id, ()))
+        
+        return {
+            "added": sorted(added),
+            "removed": sorted(removed),
+            "changed": sorted(changed),
+        }
+    
+    # -- persistence -------------------------------------------------------
+    
+    def to_dict(self) -> dict:
+        return {
+            "version": MERKLE_VERSION,
+            "root": self.root,
+            "nodes": {
+                artifact_id: [node.level, node.hash, node.parent, node.digest]
+                for artifact_id, node in sorted(self.nodes.items())
+            },
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "MerkleIndex":
+        if data.get("version") != MERKLE_VERSION:
+            raise ValueError(f"Unsupported Merkle index version: {data.get('version')}")
+        index = cls()
+        for artifact_id, (level, hash_value, parent, digest) in data["nodes"].items():
+            node = MerkleNode(artifact_id, level, hash_value, parent)
+            node.digest = digest
+            index._link(node)
+        index.root = data["root"]
+        return index
+    
+    def save(self, path: Path) -> None:
+        """Write the index as JSON (atomically)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: Path) -> "MerkleIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Compute Merkle roll-up digests over the Cheddar artifact hierarchy."
+    )
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="+",
+        help="Artifact files or directories",
+    )
+    parser.add_argument(
+        "--recursive", "-r",
+        action="store_true",
+        help="Recursively process directories",
+    )
+    parser.add_argument(
+        "--subtree",
+        metavar="ID",
+        help="Print the subtree digest of one artifact",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        help=f"Saved index to refresh incrementally and write back "
+             f"(default: <cache dir>/{MERKLE_INDEX_NAME})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Build the index from scratch and do not save it",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        help="Saved index to compare against (e.g. from another checkout)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output results as JSON",
+    )
+    
+    args = parser.parse_args()
+    
+    for path in args.paths:
+        if not path.exists():
+            print(f"Error: Path not found: {path}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+    
+    index_path = None
+    if not args.no_cache:
+        index_path = args.index or find_cache_dir() / MERKLE_INDEX_NAME
+    
+    try:
+        artifacts = ArtifactCorpus.load(args.paths, args.recursive).lineage_artifacts()
+        
+        touched = None
+        index = None
+        if index_path is not None and index_path.exists():
+            try:
+                index = MerkleIndex.load(index_path)
+            except (OSError, ValueError, KeyError, TypeError):
+                # A stale or corrupt index is rebuilt from scratch
+                index = None
+        if index is not None:
+            touched = index.refresh(artifacts)
+        else:
+            index = MerkleIndex.build(artifacts)
+        if index_path is not None:
+            index.save(index_path)
+        
+        if args.subtree:
+            digest = index.subtree_digest(args.subtree)
+            if digest is None:
+                print(f"Error: Unknown or cyclic artifact: {args.subtree}", file=sys.stderr)
+                return EXIT_USAGE_ERROR
+            print(json.dumps({"id": args.subtree, "digest": digest}) if args.json else digest)
+            return EXIT_SUCCESS
+        
+        if args.compare:
+            differences = index.diff(MerkleIndex.load(args.compare))
+            found = any(differences.values())
+            if args.json:
+                print(json.dumps(differences, indent=2))
+            elif not found:
+                print(f"✓ Identical (root {index.root})")
+            else:
+                for kind in ("added", "removed", "changed"):
+                    for artifact_id in differences[kind]:
+                        print(f"  {kind}: {artifact_id}")
+            return EXIT_DIFFERENCES if found else EXIT_SUCCESS
+        
+        top_level = {
+            artifact_id: index.subtree_digest(artifact_id)
+            for artifact_id in index.top_level()
+        }
+        if args.json:
+            result = {"root": index.root, "subtrees": top_level}
+            if touched is not None:
+                result["refreshed"] = sorted(touched)
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"Root: {index.root}")
+            for artifact_id, digest in top_level.items():
+                print(f"  {artifact_id}: {digest}")
+            if touched is not None:
+                print(f"Refreshed {len(touched)} artifact(s)")
+        
+        return EXIT_SUCCESS
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
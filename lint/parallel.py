@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Cheddar Lint Parallel Execution
+
+Spreads per-file lint work across a process pool.
+
+Items are split into contiguous chunks so each task amortises IPC overhead,
+and results are returned in input order regardless of which worker finished
+first. Workers run an initializer once at start-up (e.g. to compile schemas)
+instead of once per task.
+
+imap_chunked is the streaming form: it yields results as their chunks
+complete and keeps only a bounded window of chunks in flight, so memory
+does not grow with the number of items.
+
+Usage:
+    from parallel import map_chunked, use_pool
+    
+    if use_pool(len(paths), jobs):
+        results = map_chunked(check_chunk, paths, jobs, initializer=init_worker)
+"""
+
+import os
+from collections import deque
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from profiler import get_profiler, run_profiled_chunk
+
+# Below this many items a pool costs more than it saves
+PARALLEL_MIN_ITEMS = 64
+
+# Aim for several chunks per worker so slow files do not stall one worker
+CHUNKS_PER_WORKER = 4
+
+MAX_CHUNK_SIZE = 512
+
+# imap_chunked sends fixed-size chunks, keeping at most this many per
+# worker submitted at once
+STREAM_CHUNK_SIZE = 64
+WINDOW_PER_WORKER = 2
+
+
+def default_jobs() -> int:
+    """Number of worker processes to use when --jobs is not given."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def use_pool(count: int, jobs: Optional[int]) -> bool:
+    """Whether count items are worth spreading over jobs processes."""
+    if jobs is None:
+        jobs = default_jobs()
+    return jobs > 1 and count >= PARALLEL_MIN_ITEMS
+
+
+def chunk(items: Sequence, size: int) -> list[Sequence]:
+    """Split items into contiguous chunks of at most size elements."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def chunk_size_for(count: int, jobs: int) -> int:
+    """Pick a chunk size giving each worker several chunks."""
+    size = -(-count // (jobs * CHUNKS_PER_WORKER))
+    return max(1, min(size, MAX_CHUNK_SIZE))
+
+
+def map_chunked(
+    func: Callable[[Sequence], list],
+    items: Iterable,
+    jobs: Optional[int] = None,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: tuple = (),
+) -> list[Any]:
+    """
+    Apply func to chunks of items in a process pool.
+    
+    func receives a chunk (a list of items) and must return one result per
+    item; it and initargs must be picklable. Each worker calls initializer
+    once before its first chunk. Returns the flattened results in input order.
+    
+    When profiling is on, workers profile their chunks and the spans are
+    merged into the caller's profiler.
+    """
+    items = list(items)
+    if not items:
+        return []
+    if jobs is None:
+        jobs = default_jobs()
+    
+    jobs = max(1, min(jobs, len(items)))
+    chunks = chunk(items, chunk_size_for(len(items), jobs))
+    
+    results = []
+    for chunk_results in _run_chunks(func, chunks, jobs, initializer, initargs, len(chunks)):
+        results.extend(chunk_results)
+    
+    return results
+
+
+def imap_chunked(
+    func: Callable[[Sequence], list],
+    items: Iterable,
+    jobs: Optional[int] = None,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: tuple = (),
+) -> Iterator[Any]:
+    """
+    Like map_chunked, but yield results in input order as they complete.
+    
+    items may be any iterable, e.g. a generator walking a directory tree;
+    it is consumed only as fast as workers take chunks of STREAM_CHUNK_SIZE
+    items, and at most WINDOW_PER_WORKER chunks per worker are in flight.
+    Neither the items nor the results are ever held all at once.
+    """
+    if jobs is None:
+        jobs = default_jobs()
+    
+    items = iter(items)
+    chunks = iter(lambda: list(islice(items, STREAM_CHUNK_SIZE)), [])
+    
+    window = jobs * WINDOW_PER_WORKER
+    for chunk_results in _run_chunks(func, chunks, jobs, initializer, initargs, window):
+        yield from chunk_results
+
+
+def _run_chunks(
+    func: Callable[[Sequence], list],
+    chunks: Iterable[Sequence],
+    jobs: int,
+    initializer: Optional[Callable[..., None]],
+    initargs: tuple,
+    window: int,
+) -> Iterator[list]:
+    """Run func over chunks in a pool, keeping at most window in flight."""
+    # Imported here: concurrent.futures and multiprocessing are slow to
+    # import, and most short runs never start a pool
+    from concurrent.futures import ProcessPoolExecutor
+    
+    profiler = get_profiler()
+    if profiler.enabled:
+        func = partial(run_profiled_chunk, func, profiler.memory)
+    
+    chunks = iter(chunks)
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=initializer,
+        initargs=initargs,
+    ) as executor:
+        # Futures are consumed in submission order, keeping output deterministic
+        pending = deque()
+        for chunk_items in chunks:
+            pending.append(executor.submit(func, chunk_items))
+            if len(pending) >= window:
+                break
+        
+        while pending:
+            chunk_results = pending.popleft().result()
+            chunk_items = next(chunks, None)
+            if chunk_items is not None:
+                pending.append(executor.submit(func, chunk_items))
+            if profiler.enabled:
+                chunk_results, events = chunk_results
+                profiler.merge(events)
+            yield chunk_results
@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+Cheddar Governance Policy Engine
+
+Decides whether an actor may take an action on an artifact type, from the
+rules of governance/policy.yaml and its modules (governance/policies/*.yaml).
+Enforces: INV-021 (AI MUST NOT deploy to production without explicit human
+signature), INV-022 (AI MUST NOT bypass governance policy)
+
+Every policy file has the shape of policy.yaml (governance/README.md). Two
+sections make decisions:
+
+    policy:
+      ai_constraints:
+        autonomous_actions:          # AI may do these without approval
+          - "append_documentation_logs"
+          - action: "suggest_tests"  # Or only on some artifact types
+            artifact_types: ["automation_brief"]
+        prohibited_actions:          # AI may never do these
+          - "deploy_to_production"
+      signatures:                    # Who may sign or approve each type
+        mission_definition:
+          required_roles: ["board_of_directors"]
+
+The files are compiled into one decision table keyed by (actor kind,
+action, artifact type), with "*" standing for any artifact type. A query
+is answered by at most two table lookups, so it takes microseconds and
+never reads the policy files:
+
+    - AI actions: a prohibited action is denied, an autonomous one is
+      allowed, and anything else requires human approval. Deny overrides
+      allow: an action prohibited for every type stays denied on a type
+      where it is listed as autonomous. deploy_to_production is always
+      denied to AI (INV-021), whatever the policy says.
+    - Human actions: sign and approve on a type with a signatures rule are
+      allowed only to the listed roles; everything else is allowed.
+      Counting approvals (min_approvals) is left to the deployment gate.
+
+Every decision names the rule that made it and the file the rule came
+from, e.g. ai_constraints.prohibited_actions.modify_lineage in
+policies/ai_constraints.yaml. Decisions are memoised per query. The
+engine re-checks the policy files' mtimes at most once a second and
+recompiles when one changed, was added or was removed; a file that fails
+to compile leaves the last good policy in force. Without a policy.yaml,
+only the built-in rules apply.
+
+Usage:
+    python policy_engine.py check --actor ai --action modify_lineage --type cheddar_track
+    python policy_engine.py check --actor human --action sign --type mission_definition --role ceo
+    python policy_engine.py check --ndjson < queries.ndjson   # One decision per line
+    python policy_engine.py table --json                      # The compiled decision table
+
+Exit codes:
+    0 - Action allowed (always 0 with --ndjson and for table)
+    1 - Action denied or requires approval
+    2 - Usage/configuration error (invalid policy file)
+    3 - Internal error
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional, TextIO, Union
+
+import yaml
+
+from loader import load_yaml_file
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_NOT_ALLOWED = 1
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+ALLOW = "allow"
+DENY = "deny"
+REQUIRE_APPROVAL = "require_approval"
+
+ACTOR_KINDS = ("ai", "human")
+
+# Artifact type of rules that apply to every type
+ANY_TYPE = "*"
+
+# Actions governed by the signatures section
+SIGNING_ACTIONS = ("sign", "approve")
+
+POLICY_MODULE_DIR = "policies"
+
+# Decisions remembered per compiled policy before the memo starts over
+MEMO_SIZE = 65536
+
+# Seconds between checks of the policy files for changes
+DEFAULT_RELOAD_INTERVAL = 1.0
+
+
+class PolicyError(Exception):
+    """A policy file cannot be read or compiled."""
+
+
+class Decision:
+    """The outcome of one query and the rule that produced it."""
+    
+    __slots__ = ("decision", "rule", "source")
+    
+    def __init__(self, decision: str, rule: str, source: str):
+        self.decision = decision
+        self.rule = rule
+        self.source = source
+    
+    @property
+    def allowed(self) -> bool:
+        return self.decision == ALLOW
+    
+    def to_dict(self) -> dict:
+        return {"decision": self.decision, "rule": self.rule, "source": self.source}
+
+
+class RoleGate:
+    """A signatures rule: sign/approve on one type, allowed to some roles only."""
+    
+    __slots__ = ("roles", "allow", "deny")
+    
+    def __init__(self, roles: Iterable[str], rule: str, source: str):
+        self.roles = frozenset(roles)
+        self.allow = Decision(ALLOW, rule, source)
+        self.deny = Decision(DENY, rule, source)
+    
+    def decide(self, role: Optional[str]) -> Decision:
+        return self.allow if role in self.roles else self.deny
+
+
+BUILTIN_SOURCE = "built-in"
+
+# Rules that hold whatever the policy files say
+BUILTIN_RULES = {
+    ("ai", "deploy_to_production", ANY_TYPE): Decision(DENY, "INV-021", BUILTIN_SOURCE),
+}
+
+# What is left when no rule matches
+DEFAULT_DECISIONS = {
+    "ai": Decision(REQUIRE_APPROVAL, "default.ai", BUILTIN_SOURCE),
+    "human": Decision(ALLOW, "default.human", BUILTIN_SOURCE),
+}
+
+
+def find_policy_file() -> Path:
+    """Locate the default governance policy (governance/policy.yaml)."""
+    return Path(__file__).parent.parent / "governance" / "policy.yaml"
+
+
+def policy_files(policy_path: Path) -> list[Path]:
+    """The main policy file, if it exists, then its modules in name order."""
+    files = [policy_path] if policy_path.is_file() else []
+    module_dir = policy_path.parent / POLICY_MODULE_DIR
+    if module_dir.is_dir():
+        files.extend(sorted(
+            path for path in module_dir.iterdir()
+            if path.suffix in (".yaml", ".yml") and path.is_file()
+        ))
+    return files
+
+
+def policy_fingerprint(policy_path: Path) -> tuple:
+    """(path, mtime, size) of every policy file; changes when any file does."""
+    fingerprint = []
+    for path in policy_files(policy_path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        fingerprint.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(fingerprint)
+
+
+def _string_list(value: object, where: str) -> list[str]:
+    """value as a list of strings; raises PolicyError."""
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise PolicyError(f"{where} must be a list of strings")
+    return value
+
+
+def _action_rules(entries: object, where: str) -> list[tuple[str, list[str]]]:
+    """
+    Parse an autonomous_actions or prohibited_actions list.
+    
+    Returns (action, artifact types) pairs; ["*"] when an entry names no types.
+    """
+    if entries is None:
+        return []
+    if not isinstance(entries, list):
+        raise PolicyError(f"{where} must be a list")
+    
+    rules = []
+    for entry in entries:
+        if isinstance(entry, str):
+            rules.append((entry, [ANY_TYPE]))
+        elif isinstance(entry, dict) and isinstance(entry.get("action"), str):
+            types = _string_list(
+                entry.get("artifact_types"), f"{where}.{entry['action']}.artifact_types"
+            )
+            rules.append((entry["action"], types or [ANY_TYPE]))
+        else:
+            raise PolicyError(
+                f"{where} entries must be action names or {{action, artifact_types}}: {entry!r}"
+            )
+    return rules
+
+
+class CompiledPolicy:
+    """
+    The decision table of a set of policy files.
+    
+    Immutable once compiled; hot reload swaps in a new instance, together
+    with its memo.
+    """
+    
+    def __init__(
+        self,
+        table: dict[tuple[str, str, str], Union[Decision, RoleGate]],
+        sources: list[str]
+    ):
+        self.table = table
+        self.sources = sources
+        self.memo: dict[tuple, Decision] = {}
+    
+    @classmethod
+    def compile(cls, files: list[Path], base_dir: Optional[Path] = None) -> "CompiledPolicy":
+        """
+        Compile policy files into one table; raises PolicyError.
+        
+        Rule sources are named relative to base_dir (the main policy's
+        directory).
+        """
+        denies: dict[tuple[str, str, str], Decision] = {}
+        allows: dict[tuple[str, str, str], Decision] = {}
+        gates: dict[tuple[str, str, str], RoleGate] = {}
+        sources = []
+        
+        for path in files:
+            source = os.path.relpath(path, base_dir) if base_dir is not None else str(path)
+            sources.append(source)
+            try:
+                document = load_yaml_file(path)
+            except OSError as e:
+                raise PolicyError(f"Cannot read policy {path}: {e}") from None
+            except yaml.YAMLError as e:
+                raise PolicyError(f"Invalid policy {path}: {e}") from None
+            
+            policy = document.get("policy") if isinstance(document, dict) else None
+            if policy is None:
+                continue
+            if not isinstance(policy, dict):
+                raise PolicyError(f"{source}: policy must be a mapping")
+            
+            constraints = policy.get("ai_constraints") or {}
+            if not isinstance(constraints, dict):
+                raise PolicyError(f"{source}: ai_constraints must be a mapping")
+            for section, decision, rules in (
+                ("prohibited_actions", DENY, denies),
+                ("autonomous_actions", ALLOW, allows),
+            ):
+                where = f"ai_constraints.{section}"
+                for action, types in _action_rules(constraints.get(section), f"{source}: {where}"):
+                    for artifact_type in types:
+                        # The first file to state a rule is reported as its source
+                        rules.setdefault(
+                            ("ai", action, artifact_type),
+                            Decision(decision, f"{where}.{action}", source),
+                        )
+            
+            signatures = policy.get("signatures") or {}
+            if not isinstance(signatures, dict):
+                raise PolicyError(f"{source}: signatures must be a mapping")
+            for artifact_type, rule in signatures.items():
+                where = f"signatures.{artifact_type}"
+                if not isinstance(rule, dict):
+                    raise PolicyError(f"{source}: {where} must be a mapping")
+                roles = _string_list(
+                    rule.get("required_roles"), f"{source}: {where}.required_roles"
+                )
+                for action in SIGNING_ACTIONS:
+                    key = ("human", action, artifact_type)
+                    if key in gates:
+                        raise PolicyError(
+                            f"{source}: {where} is already defined in {gates[key].allow.source}"
+                        )
+                    gates[key] = RoleGate(roles, f"{where}.required_roles", source)
+        
+        # Deny overrides allow: at the same key, and from the any-type rule
+        # of the action down to every type-specific allow
+        table: dict[tuple[str, str, str], Union[Decision, RoleGate]] = dict(gates)
+        for key, decision in allows.items():
+            table[key] = denies.get(key) or denies.get((key[0], key[1], ANY_TYPE)) or decision
+        table.update(denies)
+        for key, decision in BUILTIN_RULES.items():
+            table[key] = decision
+            for other in list(table):
+                if other[:2] == key[:2]:
+                    table[other] = decision
+        
+        return cls(table, sources)
+    
+    def lookup(
+        self,
+        actor: str,
+        action: str,
+        artifact_type: str = ANY_TYPE,
+        role: Optional[str] = None
+    ) -> Decision:
+        """Decide one query from the table (no memo)."""
+        entry = self.table.get((actor, action, artifact_type))
+        if entry is None:
+            entry = self.table.get((actor, action, ANY_TYPE))
+            if entry is None:
+                return DEFAULT_DECISIONS[actor]
+        if type(entry) is RoleGate:
+            return entry.decide(role)
+        return entry
+    
+    def rows(self) -> list[dict]:
+        """The table as sorted rows, for display."""
+        rows = []
+        for (actor, action, artifact_type), entry in sorted(self.table.items()):
+            row = {"actor": actor, "action": action, "artifact_type": artifact_type}
+            if isinstance(entry, RoleGate):
+                row.update(entry.allow.to_dict(), decision="roles", roles=sorted(entry.roles))
+            else:
+                row.update(entry.to_dict())
+            rows.append(row)
+        return rows
+
+
+class PolicyEngine:
+    """
+    Answers policy queries from a compiled policy kept current with its files.
+    
+    Safe to share between threads: a reload builds a new CompiledPolicy
+    and swaps it in with one assignment.
+    """
+    
+    def __init__(
+        self,
+        policy_path: Optional[Path] = None,
+        reload_interval: Optional[float] = DEFAULT_RELOAD_INTERVAL
+    ):
+        """
+        Compile the policy at policy_path (default: governance/policy.yaml)
+        and its modules; raises PolicyError. With reload_interval None the
+        files are never checked again.
+        """
+        self.policy_path = Path(policy_path) if policy_path is not None else find_policy_file()
+        self.reload_interval = reload_interval
+        self.reloads = 0
+        self.reload_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._fingerprint = policy_fingerprint(self.policy_path)
+        self._policy = self._compile()
+        self._next_check = time.monotonic() + (reload_interval or 0.0)
+    
+    def _compile(self) -> CompiledPolicy:
+        return CompiledPolicy.compile(policy_files(self.policy_path), self.policy_path.parent)
+    
+    @property
+    def policy(self) -> CompiledPolicy:
+        return self._policy
+    
+    def reload_if_changed(self) -> bool:
+        """
+        Recompile if a policy file changed; returns whether the policy was replaced.
+        
+        A policy that fails to compile is not swapped in: the previous one
+        stays in force and the error is kept in reload_error until a later
+        version compiles.
+        """
+        with self._lock:
+            self._next_check = time.monotonic() + (self.reload_interval or 0.0)
+            fingerprint = policy_fingerprint(self.policy_path)
+            if fingerprint == self._fingerprint:
+                return False
+            self._fingerprint = fingerprint
+            try:
+                policy = self._compile()
+            except PolicyError as e:
+                self.reload_error = str(e)
+                return False
+            self._policy = policy
+            self.reload_error = None
+            self.reloads += 1
+            return True
+    
+    def decide(
+        self,
+        actor: str,
+        action: str,
+        artifact_type: str = ANY_TYPE,
+        role: Optional[str] = None
+    ) -> Decision:
+        """
+        Decide whether actor ("ai" or "human", acting as role) may take
+        action on artifact_type; raises ValueError for an unknown actor.
+        """
+        if self.reload_interval is not None and time.monotonic() >= self._next_check:
+            self.reload_if_changed()
+        
+        policy = self._policy
+        key = (actor, action, artifact_type, role)
+        decision = policy.memo.get(key)
+        if decision is None:
+            if actor not in DEFAULT_DECISIONS:
+                raise ValueError(f"Unknown actor kind: {actor}")
+            decision = policy.lookup(actor, action, artifact_type, role)
+            if len(policy.memo) >= MEMO_SIZE:
+                policy.memo.clear()
+            policy.memo[key] = decision
+        return decision
+
+
+def decide_stream(engine: PolicyEngine, lines: Iterable[str], out: TextIO) -> int:
+    """
+    Answer NDJSON queries ({"actor", "action", "artifact_type", "role"}),
+    writing one line per query as soon as it is decided.
+    
+    A malformed query gets an {"error": ...} line. Returns the number of
+    queries answered.
+    """
+    answered = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            query = json.loads(line)
+            if not isinstance(query, dict) or not isinstance(query.get("action"), str):
+                raise ValueError("query must be an object with an action")
+            decision = engine.decide(
+                query.get("actor"),
+                query["action"],
+                query.get("artifact_type") or ANY_TYPE,
+                query.get("role"),
+            )
+        except (ValueError, TypeError) as e:
+            out.write(json.dumps({"error": str(e)}) + "\n")
+        else:
+            out.write(json.dumps({**query, **decision.to_dict()}) + "\n")
+            answered += 1
+        out.flush()
+    return answered
+
+
+def print_decision(query: dict, decision: Decision, output_json: bool = False) -> int:
+    """
+    Print one decision.
+    
+    Returns appropriate exit code.
+    """
+    if output_json:
+        print(json.dumps({**query, **decision.to_dict()}, indent=2))
+    else:
+        symbol = "✓" if decision.allowed else "✗"
+        print(
+            f"{symbol} {decision.decision}: "
+            f"{query['actor']} {query['action']} on {query['artifact_type']}"
+        )
+        print(f"  Rule: {decision.rule} ({decision.source})")
+    
+    return EXIT_SUCCESS if decision.allowed else EXIT_NOT_ALLOWED
+
+
+def print_table(policy: CompiledPolicy, output_json: bool = False) -> None:
+    """Print the compiled decision table."""
+    rows = policy.rows()
+    if output_json:
+        print(json.dumps({"sources": policy.sources, "rules": rows}, indent=2))
+        return
+    
+    print(f"Policy files: {', '.join(policy.sources) or '(none; built-in rules only)'}")
+    for row in rows:
+        decision = row["decision"]
+        if decision == "roles":
+            decision = "roles " + ",".join(row["roles"])
+        print(
+            f"  {row['actor']:<6} {row['action']:<28} {row['artifact_type']:<20} "
+            f"{decision:<18} {row['rule']}"
+        )
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Check actions against the Cheddar governance policy (INV-021, INV-022)."
+    )
+    parser.add_argument(
+        "--policy",
+        type=Path,
+        help="Main policy file; modules are read from policies/ beside it "
+        "(default: governance/policy.yaml)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    check = commands.add_parser("check", help="Decide one query, or a stream of NDJSON queries")
+    check.add_argument("--actor", choices=ACTOR_KINDS, help="Who acts")
+    check.add_argument("--action", help="Action, e.g. modify_lineage or sign")
+    check.add_argument(
+        "--type", dest="artifact_type", default=ANY_TYPE, help="Artifact type acted on"
+    )
+    check.add_argument("--role", help="Role a human acts as (for sign and approve)")
+    output = check.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="Output the decision as JSON")
+    output.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Read one JSON query per line from stdin and write one decision per line",
+    )
+    
+    table = commands.add_parser("table", help="Print the compiled decision table")
+    table.add_argument("--json", action="store_true", help="Output the table as JSON")
+    
+    args = parser.parse_args()
+    
+    if args.command == "check" and not args.ndjson and (args.actor is None or args.action is None):
+        print("Error: check needs --actor and --action, or --ndjson", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    if args.policy is not None and not args.policy.is_file():
+        print(f"Error: Policy not found: {args.policy}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    try:
+        engine = PolicyEngine(
+            args.policy,
+            reload_interval=DEFAULT_RELOAD_INTERVAL if getattr(args, "ndjson", False) else None,
+        )
+        
+        if args.command == "table":
+            print_table(engine.policy, args.json)
+            return EXIT_SUCCESS
+        
+        if args.ndjson:
+            decide_stream(engine, sys.stdin, sys.stdout)
+            return EXIT_SUCCESS
+        
+        query = {
+            "actor": args.actor,
+            "action": args.action,
+            "artifact_type": args.artifact_type,
+            "role": args.role,
+        }
+        decision = engine.decide(args.actor, args.action, args.artifact_type, args.role)
+        return print_decision(query, decision, args.json)
+    
+    except PolicyError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Cheddar Lint Profiling
+
+Per-stage and per-file timings for lint runs (`--profile` on run_all.py,
+validate_artifact.py, compute_hash.py and verify_lineage.py).
+
+Code marks its work with spans:
+
+    profiler = get_profiler()
+    with profiler.stage("parse"):
+        for path in paths:
+            with profiler.file("parse", path):
+                ...
+
+Stages are the coarse steps of a run (discover, parse, validate, hash,
+chain). File spans time one kind of work on one file (parse, validate,
+semantic, hash), and may nest inside each other. When profiling is off,
+get_profiler() returns a null profiler whose spans are one shared no-op
+context manager, so instrumented code pays only a method call per span.
+
+Allocation counts:
+    - every stage records the net change in allocated memory blocks
+      (sys.getallocatedblocks), which is cheap at stage granularity,
+    - with --profile-memory, tracemalloc also records the bytes allocated
+      and the peak traced memory of every stage and file span. This
+      slows the run down, so timings from such a run are inflated.
+
+Pool workers (parallel.map_chunked) profile their chunks too and send
+their spans back with the results. Timestamps come from the system-wide
+monotonic clock, so worker spans line up with the parent's in the trace.
+
+A profiled run writes two files into the profile directory:
+    <tool>.profile.json   Summary: stages, totals per span kind, slowest files
+    <tool>.trace.json     Chrome trace-event file (chrome://tracing, Perfetto)
+
+Usage:
+    python run_all.py artifacts/ -r --profile               # .cheddar/profile/
+    python run_all.py artifacts/ -r --profile out/ --profile-top 20
+    python validate_artifact.py artifacts/ -r --profile --profile-memory
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from schema_registry import find_cache_dir
+
+DEFAULT_TOP_FILES = 10
+
+# Span kinds that always run inside another file span of the same file
+NESTED_KINDS = frozenset({"semantic"})
+
+# Event tuple fields
+KIND, NAME, FILE, START, DURATION, PID, BLOCKS, ALLOCATED, PEAK = range(9)
+
+
+def find_profile_dir() -> Path:
+    """Locate the default profile output directory (.cheddar/profile)."""
+    return find_cache_dir().parent / "profile"
+
+
+class _NullSpan:
+    """Shared no-op span used when profiling is off."""
+    
+    __slots__ = ()
+    
+    def __enter__(self) -> None:
+        return None
+    
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullProfiler:
+    """Profiler used when profiling is off; every span is a no-op."""
+    
+    enabled = False
+    
+    def stage(self, name: str) -> _NullSpan:
+        return _NULL_SPAN
+    
+    def file(self, kind: str, path: object) -> _NullSpan:
+        return _NULL_SPAN
+
+
+class _Span:
+    """One timed span; appended to its profiler's events when it ends."""
+    
+    __slots__ = ("profiler", "kind", "name", "file", "start", "blocks", "traced")
+    
+    def __init__(self, profiler: "Profiler", kind: str, name: str, file: Optional[str]):
+        self.profiler = profiler
+        self.kind = kind
+        self.name = name
+        self.file = file
+    
+    def __enter__(self) -> None:
+        profiler = self.profiler
+        self.blocks = sys.getallocatedblocks() if self.file is None else None
+        if profiler.memory:
+            self.traced = profiler.tracemalloc.get_traced_memory()[0]
+            profiler.peaks.append(self.traced)
+            profiler.tracemalloc.reset_peak()
+        self.start = time.perf_counter_ns()
+    
+    def __exit__(self, *exc_info: object) -> None:
+        end = time.perf_counter_ns()
+        profiler = self.profiler
+        blocks = sys.getallocatedblocks() - self.blocks if self.blocks is not None else None
+        allocated = peak = None
+        if profiler.memory:
+            current, peak = profiler.tracemalloc.get_traced_memory()
+            allocated = current - self.traced
+            # Restore the enclosing span's view of the peak
+            profiler.peaks.pop()
+            if profiler.peaks:
+                profiler.peaks[-1] = max(profiler.peaks[-1], peak)
+            peak -= self.traced
+        profiler.events.append((
+            self.kind, self.name, self.file, self.start, end - self.start,
+            profiler.pid, blocks, allocated, peak,
+        ))
+
+
+class Profiler:
+    """Collects stage and file spans for one process."""
+    
+    enabled = True
+    
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.events: list[tuple] = []
+        self.peaks: list[int] = []
+        self.pid = os.getpid()
+        self.started = time.perf_counter_ns()
+        # tracemalloc pulls in linecache, tokenize and pickle; only
+        # --profile-memory needs it
+        self.tracemalloc = None
+        if memory:
+            import tracemalloc
+            self.tracemalloc = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+    
+    def stage(self, name: str) -> _Span:
+        """Span for one stage of the run."""
+        return _Span(self, "stage", name, None)
+    
+    def file(self, kind: str, path: object) -> _Span:
+        """Span for one kind of work on one file."""
+        return _Span(self, "file", kind, str(path))
+    
+    def merge(self, events: list[tuple]) -> None:
+        """Add spans recorded by a pool worker."""
+        self.events.extend(events)
+    
+    def summary(self, tool: str, top: int = DEFAULT_TOP_FILES) -> dict:
+        """Stages, per-kind file span totals and the slowest files."""
+        wall_ns = time.perf_counter_ns() - self.started
+        stages = []
+        kinds: dict[str, dict] = {}
+        files: dict[str, dict] = {}
+        
+        for event in self.events:
+            if event[KIND] == "stage":
+                stage = {"name": event[NAME], "seconds": event[DURATION] / 1e9}
+                if event[BLOCKS] is not None:
+                    stage["allocated_blocks"] = event[BLOCKS]
+                if event[ALLOCATED] is not None:
+                    stage["allocated_bytes"] = event[ALLOCATED]
+                    stage["peak_bytes"] = event[PEAK]
+                stages.append(stage)
+                continue
+            
+            totals = kinds.setdefault(event[NAME], {"files": 0, "seconds": 0.0, "max_seconds": 0.0})
+            seconds = event[DURATION] / 1e9
+            totals["files"] += 1
+            totals["seconds"] += seconds
+            totals["max_seconds"] = max(totals["max_seconds"], seconds)
+            
+            per_file = files.setdefault(event[FILE], {"file": event[FILE], "spans": {}})
+            spans = per_file["spans"]
+            spans[event[NAME]] = spans.get(event[NAME], 0.0) + seconds
+            if event[ALLOCATED] is not None and event[NAME] not in NESTED_KINDS:
+                per_file["allocated_bytes"] = per_file.get("allocated_bytes", 0) + event[ALLOCATED]
+                per_file["peak_bytes"] = max(per_file.get("peak_bytes", 0), event[PEAK])
+        
+        for totals in kinds.values():
+            totals["mean_seconds"] = totals["seconds"] / totals["files"]
+        
+        # A file's time is the sum of its spans, less nested ones (e.g.
+        # semantic inside validate) that would otherwise count twice
+        for per_file in files.values():
+            per_file["seconds"] = sum(
+                seconds for kind, seconds in per_file["spans"].items() if kind not in NESTED_KINDS
+            )
+        
+        slowest = sorted(files.values(), key=lambda f: f["seconds"], reverse=True)[:top]
+        
+        return {
+            "tool": tool,
+            "wall_seconds": wall_ns / 1e9,
+            "memory_traced": self.memory,
+            "stages": stages,
+            "file_spans": kinds,
+            "files_profiled": len(files),
+            "slowest_files": slowest,
+        }
+    
+    def trace_events(self) -> list[dict]:
+        """The spans as Chrome trace-event complete ("X") events."""
+        origin = min((event[START] for event in self.events), default=self.started)
+        origin = min(origin, self.started)
+        trace = []
+        for event in self.events:
+            args = {}
+            if event[FILE] is not None:
+                args["file"] = event[FILE]
+            if event[BLOCKS] is not None:
+                args["allocated_blocks"] = event[BLOCKS]
+            if event[ALLOCATED] is not None:
+                args["allocated_bytes"] = event[ALLOCATED]
+                args["peak_bytes"] = event[PEAK]
+            trace.append({
+                "name": event[NAME],
+                "cat": event[KIND],
+                "ph": "X",
+                "ts": (event[START] - origin) / 1000,
+                "dur": event[DURATION] / 1000,
+                "pid": event[PID],
+                "tid": event[PID],
+                "args": args,
+            })
+        return trace
+    
+    def write(self, tool: str, directory: Path, top: int = DEFAULT_TOP_FILES) -> dict:
+        """Write <tool>.profile.json and <tool>.trace.json; returns the summary."""
+        directory.mkdir(parents=True, exist_ok=True)
+        summary = self.summary(tool, top)
+        with open(directory / f"{tool}.profile.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        with open(directory / f"{tool}.trace.json", "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+        return summary
+
+_current: "Profiler | NullProfiler" = NullProfiler()
+
+
+def get_profiler() -> "Profiler | NullProfiler":
+    """The active profiler (a NullProfiler unless profiling is on)."""
+    return _current
+
+
+def set_profiler(profiler: Optional[Profiler]) -> None:
+    """Make profiler active; None turns profiling off."""
+    global _current
+    _current = profiler if profiler is not None else NullProfiler()
+
+
+def run_profiled_chunk(func: object, memory: bool, chunk: list) -> tuple[list, list]:
+    """Pool task wrapper: run func on a chunk and return its spans too."""
+    profiler = Profiler(memory=memory)
+    set_profiler(profiler)
+    try:
+        return func(chunk), profiler.events
+    finally:
+        set_profiler(None)
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --profile, --profile-top and --profile-memory to a tool's parser."""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=find_profile_dir(),
+        type=Path,
+        metavar="DIR",
+        help="Record per-stage and per-file timings into DIR (default: .cheddar/profile)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=DEFAULT_TOP_FILES,
+        metavar="N",
+        help=f"With --profile, list the N slowest files (default: {DEFAULT_TOP_FILES})",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile, also trace allocations per stage and file (slower)",
+    )
+
+
+def start_profiling(args: argparse.Namespace) -> Optional[Profiler]:
+    """Activate a profiler if the parsed arguments ask for one."""
+    if args.profile is None:
+        return None
+    profiler = Profiler(memory=args.profile_memory)
+    set_profiler(profiler)
+    return profiler
+
+
+def finish_profiling(
+    profiler: Optional[Profiler],
+    tool: str,
+    args: argparse.Namespace
+) -> None:
+    """Write the profile of a run and print its stages and slowest files to stderr."""
+    if profiler is None:
+        return
+    set_profiler(None)
+    summary = profiler.write(tool, args.profile, args.profile_top)
+    
+    out = sys.stderr
+    print(f"Profile ({summary['wall_seconds']:.3f}s wall):", file=out)
+    for stage in summary["stages"]:
+        memory = ""
+        if "allocated_blocks" in stage:
+            memory = f"  {stage['allocated_blocks']:+d} blocks"
+        if "allocated_bytes" in stage:
+            memory += (
+                f", {stage['allocated_bytes'] / 1024:+.0f} KiB, "
+                f"peak {stage['peak_bytes'] / 1024:.0f} KiB"
+            )
+        print(f"  {stage['name']:<10} {stage['seconds']:9.3f}s{memory}", file=out)
+    for kind, totals in summary["file_spans"].items():
+        print(
+            f"  per-file {kind:<10} {totals['seconds']:9.3f}s total, "
+            f"{totals['mean_seconds'] * 1000:.3f} ms mean over {totals['files']} file(s)",
+            file=out,
+        )
+    if summary["slowest_files"]:
+        print(f"  Slowest {len(summary['slowest_files'])} file(s):", file=out)
+        for entry in summary["slowest_files"]:
+            print(f"    {entry['seconds'] * 1000:9.3f} ms  {entry['file']}", file=out)
+    print(f"  Written to {args.profile}/{tool}.profile.json and {tool}.trace.json", file=out)
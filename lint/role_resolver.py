@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Cheddar Role Resolver
+
+Answers "may this role sign or approve this artifact type?" from the role
+catalog (roles/catalog/*.yaml, format in roles/README.md):
+
+    role:
+      id: "vp_of_engineering"
+      signing_authority:
+        - artifact_type: "flow_initiative"
+          permission: "create"
+      delegation:
+        - to_role: "engineering_manager"
+          artifact_types: ["cheddar_track", "automation_brief"]
+      constraints:
+        max_delegation_depth: 2
+
+A role holds its own signing_authority. Through delegation it also passes
+on its authority, direct or delegated, over the listed artifact types (every
+type if artifact_types is omitted). Chains reach at most
+max_delegation_depth roles below the role whose authority they carry; a
+role without the constraint delegates without limit.
+
+The catalog is loaded once and the transitive delegation closure is
+precomputed into an index from (artifact type, permission) to the roles
+authorised for it, so an authority check is one dictionary lookup and one
+set membership test. For each role, the resolver keeps what the role
+grants through its chains, and which roles those chains pass through.
+When a role file changes, it recomputes only the grants of that role and
+of the roles whose chains pass through it, and rebuilds only the index
+entries those grants touch.
+
+Usage:
+    python role_resolver.py check --role engineering_manager --type automation_brief
+    python role_resolver.py check --role qa_lead --type automation_brief --permission approve
+    python role_resolver.py who --type mission_definition --json
+    python role_resolver.py --catalog path/to/catalog who --type flow_initiative
+
+Exit codes:
+    0 - Role authorised (always 0 for who)
+    1 - Role not authorised
+    2 - Usage/configuration error (invalid role file)
+    3 - Internal error
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Optional
+
+import yaml
+
+from loader import load_yaml_file
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_NOT_AUTHORISED = 1
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+# Permission of index entries that hold every role with any permission
+ANY_PERMISSION = "*"
+
+EMPTY: frozenset = frozenset()
+
+
+class RoleCatalogError(Exception):
+    """A role file cannot be read or is not a valid role definition."""
+
+
+def find_catalog_dir() -> Path:
+    """Locate the default role catalog (roles/catalog at repo root)."""
+    return Path(__file__).parent.parent / "roles" / "catalog"
+
+
+def catalog_files(catalog_dir: Path) -> list[Path]:
+    """Role files of a catalog directory, in name order."""
+    if not catalog_dir.is_dir():
+        return []
+    return sorted(
+        path for path in catalog_dir.iterdir()
+        if path.suffix in (".yaml", ".yml") and path.is_file()
+    )
+
+
+def _file_stat(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class Role:
+    """One role definition: its own authority and whom it delegates to."""
+    
+    __slots__ = ("id", "path", "authority", "delegations", "max_depth")
+    
+    def __init__(self, role: dict, path: str):
+        where = f"{path}: role"
+        if not isinstance(role.get("id"), str) or not role["id"]:
+            raise RoleCatalogError(f"{where} has no id")
+        self.id = role["id"]
+        self.path = path
+        
+        # (artifact type, permission) pairs
+        self.authority: list[tuple[str, str]] = []
+        for entry in _mapping_list(role.get("signing_authority"), f"{where}.signing_authority"):
+            if not (
+                isinstance(entry.get("artifact_type"), str)
+                and isinstance(entry.get("permission"), str)
+            ):
+                raise RoleCatalogError(
+                    f"{where}.signing_authority entries need artifact_type and permission"
+                )
+            self.authority.append((entry["artifact_type"], entry["permission"]))
+        
+        # (delegate, artifact types or None for every type) pairs
+        self.delegations: list[tuple[str, Optional[frozenset]]] = []
+        for entry in _mapping_list(role.get("delegation"), f"{where}.delegation"):
+            if not isinstance(entry.get("to_role"), str):
+                raise RoleCatalogError(f"{where}.delegation entries need to_role")
+            types = entry.get("artifact_types")
+            if types is not None and (
+                not isinstance(types, list) or not all(isinstance(t, str) for t in types)
+            ):
+                raise RoleCatalogError(
+                    f"{where}.delegation.artifact_types must be a list of strings"
+                )
+            self.delegations.append((entry["to_role"], None if types is None else frozenset(types)))
+        
+        constraints = role.get("constraints") or {}
+        if not isinstance(constraints, dict):
+            raise RoleCatalogError(f"{where}.constraints must be a mapping")
+        self.max_depth = constraints.get("max_delegation_depth")
+        if self.max_depth is not None and (
+            type(self.max_depth) is not int or self.max_depth < 0
+        ):
+            raise RoleCatalogError(
+                f"{where}.constraints.max_delegation_depth must be a non-negative integer"
+            )
+    
+    @classmethod
+    def load(cls, path: Path) -> "Role":
+        """Parse one role file; raises RoleCatalogError."""
+        try:
+            document = load_yaml_file(path)
+        except OSError as e:
+            raise RoleCatalogError(f"Cannot read role file {path}: {e}") from None
+        except yaml.YAMLError as e:
+            raise RoleCatalogError(f"Invalid role file {path}: {e}") from None
+        role = document.get("role") if isinstance(document, dict) else None
+        if not isinstance(role, dict):
+            raise RoleCatalogError(f"{path}: must hold a 'role' mapping")
+        return cls(role, str(path))
+
+
+def _mapping_list(value: object, where: str) -> list[dict]:
+    """value as a list of mappings; raises RoleCatalogError."""
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+        raise RoleCatalogError(f"{where} must be a list of mappings")
+    return value
+
+
+class RoleResolver:
+    """
+    Authority index over a role catalog, kept current one file at a time.
+    
+    Index keys are (artifact type, permission), plus (artifact type, "*")
+    for any permission. Each entry maps an authorised role to its shortest
+    delegation chain, from the role that holds the authority to it.
+    """
+    
+    def __init__(self, catalog_dir: Optional[Path] = None):
+        """Load every role file of catalog_dir (default: roles/catalog); raises RoleCatalogError."""
+        self.catalog_dir = Path(catalog_dir) if catalog_dir is not None else find_catalog_dir()
+        self.roles: dict[str, Role] = {}
+        self._files: dict[str, tuple[Optional[str], Optional[tuple[int, int]]]] = {}
+        # Origin role -> {index key: {role: chain}} it grants through its chains
+        self._grants: dict[str, dict[tuple[str, str], dict[str, tuple[str, ...]]]] = {}
+        # Origin role -> role ids its chains reached (known or not), and back
+        self._reached: dict[str, set[str]] = {}
+        self._reached_by: dict[str, set[str]] = {}
+        # Index key -> origins granting it
+        self._key_origins: dict[tuple[str, str], set[str]] = {}
+        self._index: dict[tuple[str, str], dict[str, tuple[str, ...]]] = {}
+        self._sets: dict[tuple[str, str], frozenset] = {}
+        self.origins_recomputed = 0
+        
+        roles = {}
+        for path in catalog_files(self.catalog_dir):
+            role = Role.load(path)
+            if role.id in roles:
+                raise RoleCatalogError(
+                    f"{path}: role {role.id} is already defined in {roles[role.id].path}"
+                )
+            roles[role.id] = role
+            self._files[str(path)] = (role.id, _file_stat(path))
+        self.roles = roles
+        self._update(set(roles))
+    
+    def authorised(self, role: str, artifact_type: str, permission: str = ANY_PERMISSION) -> bool:
+        """Whether role holds permission ("*": any permission) over artifact_type."""
+        return role in self._sets.get((artifact_type, permission), EMPTY)
+    
+    def authorised_roles(self, artifact_type: str, permission: str = ANY_PERMISSION) -> frozenset:
+        """Every role holding permission over artifact_type."""
+        return self._sets.get((artifact_type, permission), EMPTY)
+    
+    def chain(
+        self,
+        role: str,
+        artifact_type: str,
+        permission: str = ANY_PERMISSION
+    ) -> Optional[tuple[str, ...]]:
+        """The shortest chain granting role the authority (origin first), or None."""
+        return self._index.get((artifact_type, permission), {}).get(role)
+    
+    def problems(self) -> list[str]:
+        """Delegations to roles that are not in the catalog."""
+        return [
+            f"Role {role.id} delegates to unknown role {target}"
+            for role in self.roles.values()
+            for target, _ in role.delegations
+            if target not in self.roles
+        ]
+    
+    def _expand(self, origin: Role) -> tuple[dict, set[str]]:
+        """
+        Walk the delegation chains of one role's authority.
+        
+        Returns its grants ({index key: {role: chain}}) and every role id
+        the walk reached.
+        """
+        by_type: dict[str, list[str]] = {}
+        for artifact_type, permission in origin.authority:
+            by_type.setdefault(artifact_type, []).append(permission)
+        
+        grants: dict[tuple[str, str], dict[str, tuple[str, ...]]] = {}
+        reached = {origin.id}
+        for artifact_type, permissions in by_type.items():
+            # Breadth first, so each role gets its shortest chain
+            chains = {origin.id: (origin.id,)}
+            queue = deque([origin.id])
+            while queue:
+                current = queue.popleft()
+                chain = chains[current]
+                role = self.roles.get(current)
+                if role is None or (origin.max_depth is not None and len(chain) > origin.max_depth):
+                    continue
+                for target, types in role.delegations:
+                    if types is not None and artifact_type not in types:
+                        continue
+                    reached.add(target)
+                    if target not in chains:
+                        chains[target] = chain + (target,)
+                        queue.append(target)
+            
+            granted = {role_id: chain for role_id, chain in chains.items() if role_id in self.roles}
+            for permission in permissions + [ANY_PERMISSION]:
+                grants.setdefault((artifact_type, permission), {}).update(granted)
+        return grants, reached
+    
+    def _update(self, changed: set[str]) -> None:
+        """Recompute the grants of origins affected by changed role ids, and their index entries."""
+        affected = set(changed)
+        for role_id in changed:
+            affected |= self._reached_by.get(role_id, set())
+        
+        touched: set[tuple[str, str]] = set()
+        for origin in affected:
+            old_grants = self._grants.pop(origin, {})
+            for role_id in self._reached.pop(origin, ()):
+                self._reached_by[role_id].discard(origin)
+            for key in old_grants:
+                self._key_origins[key].discard(origin)
+            touched.update(old_grants)
+            
+            role = self.roles.get(origin)
+            if role is None:
+                continue
+            grants, reached = self._expand(role)
+            self.origins_recomputed += 1
+            self._grants[origin] = grants
+            self._reached[origin] = reached
+            for role_id in reached:
+                self._reached_by.setdefault(role_id, set()).add(origin)
+            for key in grants:
+                self._key_origins.setdefault(key, set()).add(origin)
+            touched.update(grants)
+        
+        for key in touched:
+            merged: dict[str, tuple[str, ...]] = {}
+            for origin in self._key_origins.get(key, ()):
+                for role_id, chain in self._grants[origin][key].items():
+                    if role_id not in merged or len(chain) < len(merged[role_id]):
+                        merged[role_id] = chain
+            if merged:
+                self._index[key] = merged
+                self._sets[key] = frozenset(merged)
+            else:
+                self._index.pop(key, None)
+                self._sets.pop(key, None)
+                self._key_origins.pop(key, None)
+    
+    def refresh(self, paths: Optional[Iterable[Path]] = None) -> list[str]:
+        """
+        Pick up role files added, changed or removed since the last load.
+        
+        With paths (e.g. from a file watcher), only those catalog files are
+        looked at; otherwise the whole catalog directory is listed. Returns
+        the ids of the roles that changed. Raises RoleCatalogError for an
+        invalid file, leaving the index as it was.
+        """
+        if paths is None:
+            current = {str(path): _file_stat(path) for path in catalog_files(self.catalog_dir)}
+            candidates = current.keys() | self._files.keys()
+        else:
+            candidates = {
+                str(self.catalog_dir / Path(path).name)
+                for path in paths if Path(path).suffix in (".yaml", ".yml")
+            }
+            current = {}
+            for path in candidates:
+                stat = _file_stat(Path(path))
+                if stat is not None:
+                    current[path] = stat
+        changed_paths = [
+            path for path in candidates
+            if (path in current or path in self._files)
+            and (path not in self._files or current.get(path) != self._files[path][1])
+        ]
+        if not changed_paths:
+            return []
+        
+        # Parse everything first, so a bad file changes nothing
+        loaded: dict[str, Optional[Role]] = {
+            path: Role.load(Path(path)) if path in current else None for path in changed_paths
+        }
+        
+        roles = dict(self.roles)
+        changed_ids = set()
+        for path in changed_paths:
+            old_id = self._files.get(path, (None, None))[0]
+            if old_id is not None:
+                roles.pop(old_id, None)
+                changed_ids.add(old_id)
+        for path, role in loaded.items():
+            if role is None:
+                continue
+            if role.id in roles:
+                raise RoleCatalogError(
+                    f"{path}: role {role.id} is already defined in {roles[role.id].path}"
+                )
+            roles[role.id] = role
+            changed_ids.add(role.id)
+        
+        self.roles = roles
+        for path, role in loaded.items():
+            if role is None:
+                del self._files[path]
+            else:
+                self._files[path] = (role.id, current[path])
+        self._update(changed_ids)
+        return sorted(changed_ids)
+
+
+def print_check(
+    resolver: RoleResolver,
+    role: str,
+    artifact_type: str,
+    permission: str,
+    output_json: bool = False
+) -> int:
+    """
+    Print whether role is authorised.
+    
+    Returns appropriate exit code.
+    """
+    chain = resolver.chain(role, artifact_type, permission)
+    if output_json:
+        print(json.dumps({
+            "role": role,
+            "artifact_type": artifact_type,
+            "permission": permission,
+            "authorised": chain is not None,
+            "chain": list(chain) if chain else None,
+        }, indent=2))
+    else:
+        action = "hold authority over" if permission == ANY_PERMISSION else permission
+        if chain is None:
+            print(f"✗ {role} may not {action} {artifact_type}")
+        else:
+            via = f" (delegated: {' → '.join(chain)})" if len(chain) > 1 else ""
+            print(f"✓ {role} may {action} {artifact_type}{via}")
+    
+    return EXIT_SUCCESS if chain is not None else EXIT_NOT_AUTHORISED
+
+
+def print_roles(roles: Iterable[str], output_json: bool = False) -> None:
+    """Print the roles authorised for a type."""
+    roles = sorted(roles)
+    if output_json:
+        print(json.dumps(roles, indent=2))
+    else:
+        for role in roles:
+            print(role)
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Resolve signing authority from the Cheddar role catalog."
+    )
+    parser.add_argument(
+        "--catalog",
+        type=Path,
+        default=find_catalog_dir(),
+        help="Role catalog directory (default: roles/catalog)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    check = commands.add_parser("check", help="Whether a role holds authority over a type")
+    check.add_argument("--role", required=True, help="Role id")
+    who = commands.add_parser("who", help="Every role holding authority over a type")
+    for command in (check, who):
+        command.add_argument("--type", dest="artifact_type", required=True, help="Artifact type")
+        command.add_argument(
+            "--permission",
+            default=ANY_PERMISSION,
+            help="Permission, e.g. approve (default: any)",
+        )
+        command.add_argument("--json", action="store_true", help="Output results as JSON")
+    
+    args = parser.parse_args()
+    
+    if not args.catalog.is_dir():
+        print(f"Error: Role catalog not found: {args.catalog}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    try:
+        resolver = RoleResolver(args.catalog)
+        for problem in resolver.problems():
+            print(f"⚠ {problem}", file=sys.stderr)
+        
+        if args.command == "who":
+            print_roles(resolver.authorised_roles(args.artifact_type, args.permission), args.json)
+            return EXIT_SUCCESS
+        return print_check(resolver, args.role, args.artifact_type, args.permission, args.json)
+    
+    except RoleCatalogError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,11 +7,16 @@ Orchestrates all Cheddar lint checks.
 Runs:
     1. validate_artifact.py - Schema validation
     2. verify_lineage.py - Chain integrity
+    3. verify_signature.py - Signatures of signed_by claims (with --signatures)
 
 Usage:
     python run_all.py <directory>
     python run_all.py <directory> --recursive
     python run_all.py --examples  # Validate schema examples
+    python run_all.py <directory> -r --profile  # Per-stage/per-file timings (see profiler.py)
+    python run_all.py <directory> -r --ndjson   # Stream results as JSON lines
+    python run_all.py <directory> -r --staged   # Only what the next commit changes
+    python run_all.py <directory> -r --signatures   # Also verify signatures
 
 Exit codes:
     0 - All checks passed
@@ -23,12 +28,28 @@ Exit codes:
 import argparse
 import json
 import sys
+from itertools import chain, islice
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional, TextIO
 
 # Import lint modules
-from validate_artifact import validate_directory, validate_file
-from verify_lineage import load_artifacts, verify_chain
+from corpus import ArtifactCorpus, CorpusEntry, parse_file
+from lineage_graph import LineageRecord
+from lint_state import STATE_FILE_NAME, LintState
+from loader import ParseCache
+from parallel import PARALLEL_MIN_ITEMS, default_jobs, imap_chunked, use_pool
+from profiler import add_profile_arguments, finish_profiling, get_profiler, start_profiling
+from schema_registry import SchemaRegistry, find_cache_dir, get_registry
+from validate_artifact import (
+    close_stdout_quietly,
+    init_worker,
+    load_error_result,
+    validate_corpus,
+    validate_loaded_artifact,
+    worker_registry,
+    write_ndjson,
+)
+from verify_lineage import verify_chain
 
 # Exit codes
 EXIT_SUCCESS = 0
@@ -52,13 +73,48 @@ def find_examples_dir() -> Path:
 def run_all_checks(
     paths: list[Path],
     recursive: bool = False,
-    skip_chain: bool = False
+    skip_chain: bool = False,
+    registry: Optional[SchemaRegistry] = None,
+    jobs: int = 1,
+    parse_cache: Optional[ParseCache] = None,
+    state: Optional[LintState] = None,
+    since: Optional[str] = None,
+    staged: bool = False,
+    index_cache: bool = True,
+    keyring: Optional[Path] = None,
+    signature_cache_dir: Optional[Path] = None,
+    role_catalog: Optional[Path] = None
 ) -> dict:
     """
     Run all lint checks on the specified paths.
     
+    Every file is discovered and parsed exactly once into an
+    ArtifactCorpus, which schema validation, semantic rules and chain
+    verification all consume; parse errors are reported once, under
+    validation. Validators come from one schema registry (the process-wide
+    default registry if None). With jobs > 1, parsing and schema validation
+    run in a process pool. Files unchanged since they were stored in
+    parse_cache are not parsed again.
+    
+    With a LintState, only files changed since the state's last run are
+    re-checked (see lint_state); the report still covers every file.
+    
+    With since (a git revision) or staged, only the files changed since
+    that revision, or staged for the next commit, are validated, and only
+    the chain links running through them are verified (see git_changes).
+    The lineage index of HEAD is kept on disk unless index_cache is False.
+    
+    With a keyring (full runs only), the signatures of signed_by claims
+    are verified against it, using the verified-signature cache in
+    signature_cache_dir (in memory if None), and signing authority
+    against the role catalog in role_catalog, if given.
+    
     Returns combined result dict.
     """
+    if registry is None:
+        registry = get_registry()
+    
+    signature_result = None
     combined = {
         "passed": True,
         "checks": {},
@@ -68,14 +124,33 @@ def run_all_checks(
         },
     }
     
-    # 1. Schema validation
-    validation_results = []
-    for path in paths:
-        if path.is_file():
-            validation_results.append(validate_file(path))
-        elif path.is_dir():
-            validation_results.extend(validate_directory(path, recursive))
+    if since is not None or staged:
+        # Imported lazily: only changed-set runs need git
+        from git_changes import lint_changes
+        validation_results, chain_result, stats = lint_changes(
+            paths, recursive, since, registry, jobs, skip_chain, use_index_cache=index_cache
+        )
+        combined["changed"] = stats
+    elif state is not None:
+        validation_results, chain_result, stats = state.run(
+            paths, recursive, registry, jobs, parse_cache, skip_chain
+        )
+        combined["incremental"] = stats
+    else:
+        corpus = ArtifactCorpus.load(paths, recursive, jobs, parse_cache)
+        validation_results = validate_corpus(corpus, registry, jobs)
+        chain_result = None
+        if not skip_chain:
+            records = corpus.lineage_records()
+            chain_result = verify_chain(records, skip_hash_verify=True)
+        if keyring is not None:
+            # Imported lazily: only signature runs need the keyring and cache
+            from verify_signature import verify_signatures
+            signature_result = verify_signatures(
+                corpus, keyring, signature_cache_dir, jobs, role_catalog
+            )
     
+    # 1. Schema validation
     validation_errors = sum(len(r["errors"]) for r in validation_results)
     validation_passed = all(r["passed"] for r in validation_results)
     
@@ -91,11 +166,8 @@ def run_all_checks(
     
     combined["summary"]["total_errors"] += validation_errors
     
-    # 2. Lineage chain verification (only if validation passed or forced)
-    if not skip_chain:
-        artifacts = load_artifacts(paths, recursive)
-        chain_result = verify_chain(artifacts, skip_hash_verify=True)
-        
+    # 2. Lineage chain verification (unless skipped)
+    if chain_result is not None:
         combined["checks"]["verify_lineage"] = {
             "passed": chain_result["passed"],
             "artifacts_checked": chain_result["artifacts_checked"],
@@ -108,9 +180,147 @@ def run_all_checks(
         
         combined["summary"]["total_errors"] += len(chain_result["errors"])
     
+    # 3. Signature verification (only when a keyring is given)
+    if signature_result is not None:
+        combined["checks"]["verify_signature"] = {
+            "passed": signature_result["passed"],
+            "artifacts_checked": signature_result["artifacts_checked"],
+            "cache_hits": signature_result["cache_hits"],
+            "errors": len(signature_result["errors"]),
+            "results": signature_result,
+        }
+        
+        if not signature_result["passed"]:
+            combined["passed"] = False
+        
+        combined["summary"]["total_errors"] += len(signature_result["errors"])
+    
     return combined
 
 
+def check_file(
+    path: Path,
+    explicit: bool,
+    registry: SchemaRegistry
+) -> tuple[dict, Optional[LineageRecord]]:
+    """
+    Parse and validate one file for a streaming run.
+    
+    Returns the validation result and, if the file belongs in the chain
+    (see CorpusEntry.in_chain), its LineageRecord; the parsed document
+    itself is dropped.
+    """
+    artifact, error, digest = parse_file(path)
+    if error is not None:
+        return load_error_result(path, error), None
+    
+    result = validate_loaded_artifact(artifact, path, registry=registry)
+    if not CorpusEntry(path, artifact, None, explicit, digest).in_chain:
+        return result, None
+    
+    return result, LineageRecord.from_artifact(artifact, str(path))
+
+
+def _check_chunk(items: list[tuple[Path, bool]]) -> list[tuple[dict, Optional[LineageRecord]]]:
+    """Pool task: check a chunk of (file, explicit) pairs."""
+    registry = worker_registry()
+    return [check_file(path, explicit, registry) for path, explicit in items]
+
+
+def iter_all_checks(
+    paths: list[Path],
+    recursive: bool = False,
+    skip_chain: bool = False,
+    registry: Optional[SchemaRegistry] = None,
+    jobs: int = 1
+) -> Iterator[dict]:
+    """
+    Run all lint checks, yielding NDJSON records as results become available.
+    
+    Yields one {"type": "result", ...} record per file as soon as it has
+    been validated, then one {"type": "chain_error", ...} record per chain
+    error, then a final {"type": "summary", ...} record. Unlike
+    run_all_checks, no parsed document or per-file result outlives its
+    record: chain verification runs on the LineageRecords kept by
+    check_file, so memory grows only by one compact record per artifact.
+    Files are discovered lazily (ArtifactCorpus.iter_discover) and the
+    parse cache is not used, as it holds every document.
+    """
+    if registry is None:
+        registry = get_registry()
+    
+    # Peek far enough to tell whether a pool is worth starting
+    discovered = ArtifactCorpus.iter_discover(paths, recursive)
+    head = list(islice(discovered, PARALLEL_MIN_ITEMS))
+    
+    summary = {
+        "type": "summary",
+        "passed": True,
+        "files_checked": 0,
+        "validation_errors": 0,
+        "total_warnings": 0,
+    }
+    records = []
+    
+    # Discovery is lazy, so the validate stage includes walking the tree
+    with get_profiler().stage("validate"):
+        if use_pool(len(head), jobs):
+            checked = imap_chunked(
+                _check_chunk,
+                chain(head, discovered),
+                jobs,
+                initializer=init_worker,
+                initargs=(registry.schema_dir,),
+            )
+        else:
+            checked = (
+                check_file(path, explicit, registry)
+                for path, explicit in chain(head, discovered)
+            )
+        
+        for result, record in checked:
+            summary["files_checked"] += 1
+            summary["validation_errors"] += len(result["errors"])
+            summary["total_warnings"] += len(result.get("warnings", []))
+            if not result["passed"]:
+                summary["passed"] = False
+            if record is not None and not skip_chain:
+                records.append(record)
+            yield {"type": "result", **result}
+    
+    summary["total_errors"] = summary["validation_errors"]
+    if not skip_chain:
+        chain_result = verify_chain(records, skip_hash_verify=True)
+        del records
+        summary["artifacts_checked"] = chain_result["artifacts_checked"]
+        summary["chain_errors"] = len(chain_result["errors"])
+        summary["total_errors"] += summary["chain_errors"]
+        if not chain_result["passed"]:
+            summary["passed"] = False
+        for error in chain_result["errors"]:
+            yield {"type": "chain_error", "linter": "verify_lineage", **error}
+    
+    yield summary
+
+
+def print_ndjson(records: Iterable[dict], out: Optional[TextIO] = None) -> int:
+    """
+    Write the records of iter_all_checks as NDJSON, one line each as it arrives.
+    
+    Returns appropriate exit code.
+    """
+    if out is None:
+        out = sys.stdout
+    
+    passed = True
+    for record in records:
+        write_ndjson(record, out)
+        if record["type"] == "summary":
+            passed = record["passed"]
+    
+    return EXIT_SUCCESS if passed else EXIT_VALIDATION_ERROR
+
+
 def print_summary(result: dict, output_json: bool = False) -> int:
     """
     Print combined lint results.
@@ -159,11 +369,44 @@ def print_summary(result: dict, output_json: bool = False) -> int:
                 print(f"  {inv}{error['artifact']}: {error['message']}")
         print()
     
+    # Signature verification results
+    if "verify_signature" in result["checks"]:
+        check = result["checks"]["verify_signature"]
+        status = "✓ PASSED" if check["passed"] else "✗ FAILED"
+        print(f"Signature Verification: {status}")
+        print(
+            f"  Signed artifacts checked: {check['artifacts_checked']} "
+            f"({check['cache_hits']} from cache)"
+        )
+        print(f"  Errors: {check['errors']}")
+        
+        if not check["passed"]:
+            print()
+            for error in check["results"]["errors"]:
+                print(f"  [{error['invariant']}] {error['artifact']}: {error['message']}")
+        print()
+    
     # Summary
     print("-" * 60)
     overall = "✓ ALL CHECKS PASSED" if result["passed"] else "✗ CHECKS FAILED"
     print(f"Overall: {overall}")
     print(f"Total errors: {result['summary']['total_errors']}")
+    if "incremental" in result:
+        stats = result["incremental"]
+        print(
+            f"Incremental: {stats['files_revalidated']}/{stats['files_total']} files "
+            f"re-validated, {stats['artifacts_reverified']} chain links re-verified"
+        )
+    if "changed" in result:
+        stats = result["changed"]
+        if stats["mode"] == "staged":
+            scope = "staged changes"
+        else:
+            scope = f"changes since {stats['base'][:12]}"
+        print(
+            f"Changed set ({scope}): {stats['files_changed']} file(s) changed, "
+            f"{stats['artifacts_checked']} artifact(s) chain-checked"
+        )
     print()
     
     return EXIT_SUCCESS if result["passed"] else EXIT_VALIDATION_ERROR
@@ -195,14 +438,85 @@ def main() -> int:
         action="store_true",
         help="Skip lineage chain verification",
     )
-    parser.add_argument(
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
         "--json",
         action="store_true",
         help="Output results as JSON",
     )
+    output.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Stream one JSON line per file result and chain error, then a summary line",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the on-disk caches (.cheddar/cache)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-lint affected artifacts on every save",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        help="With --watch, poll the tree at this interval (seconds) instead of using inotify",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-check files changed since the last incremental run",
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        help=f"Incremental state database (default: .cheddar/cache/{STATE_FILE_NAME})",
+    )
+    changes = parser.add_mutually_exclusive_group()
+    changes.add_argument(
+        "--since",
+        metavar="REV",
+        help="Only check files changed between the merge base of REV and HEAD, "
+        "and the artifacts whose chain runs through them",
+    )
+    changes.add_argument(
+        "--staged",
+        action="store_true",
+        help="Only check files staged for the next commit, and the artifacts "
+        "whose chain runs through them",
+    )
+    parser.add_argument(
+        "--signatures",
+        action="store_true",
+        help="Also verify the signatures of signed_by claims (INV-023; needs cryptography)",
+    )
+    parser.add_argument(
+        "--keyring",
+        type=Path,
+        help="With --signatures, the keyring to verify against (default: roles/keyring.yaml)",
+    )
+    parser.add_argument(
+        "--roles",
+        type=Path,
+        help="With --signatures, the role catalog for signing authority "
+        "(default: roles/catalog, if it exists)",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=default_jobs(),
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
+    if args.jobs < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
     # Determine paths to check
     if args.examples:
         try:
@@ -223,14 +537,97 @@ def main() -> int:
             print(f"Error: Path not found: {path}", file=sys.stderr)
             return EXIT_USAGE_ERROR
     
+    if args.ndjson and (args.watch or args.incremental):
+        print("Error: --ndjson cannot be combined with --watch or --incremental", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    git_mode = args.since is not None or args.staged
+    if git_mode and (args.watch or args.incremental or args.ndjson):
+        print(
+            "Error: --since/--staged cannot be combined with --watch, --incremental or --ndjson",
+            file=sys.stderr,
+        )
+        return EXIT_USAGE_ERROR
+    
+    if (args.keyring is not None or args.roles is not None) and not args.signatures:
+        print("Error: --keyring and --roles require --signatures", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    if args.signatures and (git_mode or args.watch or args.incremental or args.ndjson):
+        print(
+            "Error: --signatures cannot be combined with --since, --staged, --watch, "
+            "--incremental or --ndjson",
+            file=sys.stderr,
+        )
+        return EXIT_USAGE_ERROR
+    
+    # Failures caused by the request rather than by lint (e.g. an unknown
+    # --since revision, no git repository or an invalid keyring)
+    usage_errors: tuple = ()
+    if git_mode:
+        from git_changes import GitError
+        usage_errors = (GitError,)
+    keyring = role_catalog = None
+    if args.signatures:
+        from verify_signature import SignatureConfigError, default_catalog_dir, find_keyring_path
+        usage_errors = (SignatureConfigError,)
+        keyring = args.keyring or find_keyring_path()
+        role_catalog = args.roles or default_catalog_dir()
+    
+    if args.watch:
+        # Imported lazily: only watch mode needs inotify/ctypes
+        from watch import watch
+        return watch(
+            paths,
+            recursive=args.recursive,
+            registry=SchemaRegistry(),
+            output_json=args.json,
+            poll_interval=args.poll_interval,
+        )
+    
+    state = None
+    if args.incremental:
+        state = LintState(args.state or find_cache_dir() / STATE_FILE_NAME)
+    
     try:
+        profiler = start_profiling(args)
+        cache_dir = None if args.no_cache else find_cache_dir()
+        if args.ndjson:
+            exit_code = print_ndjson(iter_all_checks(
+                paths,
+                recursive=args.recursive,
+                skip_chain=args.skip_chain,
+                registry=SchemaRegistry(),
+                jobs=args.jobs,
+            ))
+            finish_profiling(profiler, "run_all", args)
+            return exit_code
+        
         result = run_all_checks(
             paths,
             recursive=args.recursive,
             skip_chain=args.skip_chain,
+            registry=SchemaRegistry(),
+            jobs=args.jobs,
+            parse_cache=ParseCache(cache_dir) if cache_dir else None,
+            state=state,
+            since=args.since,
+            staged=args.staged,
+            index_cache=cache_dir is not None,
+            keyring=keyring,
+            signature_cache_dir=cache_dir,
+            role_catalog=role_catalog,
         )
+        finish_profiling(profiler, "run_all", args)
         return print_summary(result, args.json)
-        
+    
+    except BrokenPipeError:
+        close_stdout_quietly()
+        return EXIT_SUCCESS
+    
+    except usage_errors as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
     except Exception as e:
         print(f"Internal error: {e}", file=sys.stderr)
         import traceback
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Cheddar Schema Registry
+
+Loads every schemas/*.schema.json once per process and keeps one compiled
+Draft7Validator per schema, so validating thousands of artifacts does not
+re-read, re-parse and re-compile the same schema for every file.
+
+Cross-file $refs (e.g. into common.schema.json) are resolved against a single
+reference registry built from all schemas at load time.
+
+There is no on-disk cache: reading, parsing and compiling every schema
+takes about 2 ms, far less than importing jsonschema itself, and validator
+objects cannot be persisted anyway. The SHA-256 of every schema file is
+kept so other caches can be keyed by fingerprint().
+
+jsonschema (and referencing) are imported on the first compile, not at
+import time: tools that only need find_cache_dir, or that never validate,
+should not pay for them at start-up.
+
+Usage:
+    from schema_registry import get_registry
+    
+    registry = get_registry()
+    validator = registry.get_validator("mission_definition.schema.json")
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from jsonschema import Draft7Validator
+
+SCHEMA_GLOB = "*.schema.json"
+
+
+def _referencing() -> Optional[ModuleType]:
+    """The referencing package, or None before jsonschema 4.18."""
+    try:
+        import referencing
+    except ImportError:  # jsonschema < 4.18 has no referencing package
+        return None
+    return referencing
+
+
+def find_schema_dir() -> Path:
+    """Locate the schemas directory relative to this script."""
+    script_dir = Path(__file__).parent
+    repo_root = script_dir.parent
+    schema_dir = repo_root / "schemas"
+    
+    if not schema_dir.exists():
+        raise FileNotFoundError(f"Schema directory not found: {schema_dir}")
+    
+    return schema_dir
+
+
+def find_cache_dir() -> Path:
+    """Locate the default lint cache directory (.cheddar/cache at repo root)."""
+    return Path(__file__).parent.parent / ".cheddar" / "cache"
+
+
+class SchemaRegistry:
+    """
+    Process-wide store of parsed schemas and compiled validators.
+    
+    Schemas are loaded lazily on first access. Validators are compiled once
+    per schema name (or per explicit schema path) and reused afterwards.
+    """
+    
+    def __init__(self, schema_dir: Optional[Path] = None):
+        self.schema_dir = schema_dir if schema_dir is not None else find_schema_dir()
+        self._schemas: dict[str, dict] = {}
+        self._digests: dict[str, str] = {}
+        self._validators: dict[str, "Draft7Validator"] = {}
+        self._ref_registry = None
+        self._loaded = False
+    
+    @property
+    def schemas(self) -> dict[str, dict]:
+        """Parsed schema documents keyed by file name."""
+        self._ensure_loaded()
+        return self._schemas
+    
+    def get_schema(self, schema_name: str) -> dict:
+        """Return the parsed schema document for a schema file name."""
+        self._ensure_loaded()
+        if schema_name not in self._schemas:
+            raise FileNotFoundError(
+                f"Schema not found: {self.schema_dir / schema_name}"
+            )
+        return self._schemas[schema_name]
+    
+    def get_validator(self, schema_name: str) -> "Draft7Validator":
+        """Return the compiled validator for a schema file name."""
+        validator = self._validators.get(schema_name)
+        if validator is None:
+            validator = self._compile(self.get_schema(schema_name))
+            self._validators[schema_name] = validator
+        return validator
+    
+    def compile_all(self) -> None:
+        """Eagerly compile a validator for every schema in the registry."""
+        for schema_name in self.schemas:
+            self.get_validator(schema_name)
+    
+    def get_validator_for_path(self, schema_path: Path) -> "Draft7Validator":
+        """
+        Return the compiled validator for an explicit schema file.
+        
+        Schemas inside the registry's schema directory share the registry's
+        validators; any other file is loaded and compiled once per path.
+        """
+        self._ensure_loaded()
+        resolved = Path(schema_path).resolve()
+        if resolved.parent == self.schema_dir.resolve() and resolved.name in self._schemas:
+            return self.get_validator(resolved.name)
+        
+        key = str(resolved)
+        validator = self._validators.get(key)
+        if validator is None:
+            with open(resolved, "r", encoding="utf-8") as f:
+                validator = self._compile(json.load(f))
+            self._validators[key] = validator
+        return validator
+    
+    def _compile(self, schema: dict) -> "Draft7Validator":
+        """Build a validator that resolves $refs through the shared registry."""
+        from jsonschema import Draft7Validator
+        
+        if _referencing() is not None:
+            if self._ref_registry is None:
+                self._ref_registry = self._build_ref_registry(self._schemas)
+            return Draft7Validator(schema, registry=self._ref_registry)
+        
+        from jsonschema import RefResolver
+        store = {s["$id"]: s for s in self._schemas.values() if "$id" in s}
+        return Draft7Validator(schema, resolver=RefResolver.from_schema(schema, store=store))
+    
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+    
+    def load(self) -> None:
+        """Load all schema files."""
+        raw: dict[str, bytes] = {}
+        for schema_path in sorted(self.schema_dir.glob(SCHEMA_GLOB)):
+            raw[schema_path.name] = schema_path.read_bytes()
+        
+        self._digests = {
+            name: hashlib.sha256(content).hexdigest() for name, content in raw.items()
+        }
+        self._schemas = {name: json.loads(content) for name, content in raw.items()}
+        self._validators = {}
+        # Built on the first compile, so loading alone never imports jsonschema
+        self._ref_registry = None
+        self._loaded = True
+    
+    def _build_ref_registry(self, schemas: dict[str, dict]):
+        """Register every schema under its $id and resolve sub-resources once."""
+        referencing = _referencing()
+        resources = [
+            (schema["$id"], referencing.Resource.from_contents(schema))
+            for schema in schemas.values()
+            if "$id" in schema
+        ]
+        return referencing.Registry().with_resources(resources).crawl()
+    
+    def fingerprint(self) -> str:
+        """Combined digest of every schema file name and content hash."""
+        self._ensure_loaded()
+        combined = hashlib.sha256()
+        for name, digest in sorted(self._digests.items()):
+            combined.update(f"{name}:{digest}\n".encode("utf-8"))
+        return combined.hexdigest()
+
+
+_default_registry: Optional[SchemaRegistry] = None
+
+
+def get_registry() -> SchemaRegistry:
+    """Return the process-wide default registry."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = SchemaRegistry()
+    return _default_registry
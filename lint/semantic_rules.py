@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Cheddar Semantic Rules
+
+Declares each artifact invariant that validate_artifact.py reports once,
+with its id. A declaration has two parts:
+
+    - the schema fields it governs, from which schema validation errors
+      are mapped to it,
+    - optionally, semantic checks beyond JSON Schema.
+
+Error mapping is exact. Each schema object is walked once to list every field
+path and the keywords declared on it (including "required" on the parent).
+The table holds an invariant for each (field path, keyword) pair that one
+of the declarations governs. A validation error is looked up by its
+absolute path (array indices as "*") and failing keyword, so "valid_until"
+or "tests.0.id" never match the rule for a top-level "id".
+
+Semantic checks run over a batch of artifacts at a time. The artifacts
+are first reduced to columns: ids, levels, upstream references and
+upstream hashes. Each check makes one pass over the columns it needs; the
+id check is a compiled regex mapped over the id column. validate_corpus
+and the pool workers evaluate a whole chunk of artifacts per batch;
+validate_artifact evaluates a batch of one.
+
+rules_fingerprint() digests this module, so incremental lint state is
+discarded whenever the rules change.
+
+Usage:
+    from semantic_rules import evaluate, map_errors
+    
+    errors = evaluate(artifacts)  # Row -> error list, failing rows only
+    for invariant, error in map_errors(validator.iter_errors(artifact), validator.schema):
+        print(invariant, error.message)
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from itertools import compress
+from typing import Callable, Iterable, Iterator, Optional
+
+from jsonschema import ValidationError
+
+# Keyword binding of a field rule that applies whatever keyword failed
+ANY_KEYWORD = None
+
+# Path component standing for every array index
+ANY_INDEX = "*"
+
+# Schema keywords that nest or annotate fields rather than constrain them
+STRUCTURAL_KEYWORDS = frozenset({"properties", "items", "definitions", "description", "examples"})
+
+# The version suffix INV-002 requires at the end of every id
+VERSION_SUFFIX = re.compile(r"_v[0-9]+\Z")
+
+
+class ArtifactColumns:
+    """The fields the semantic checks read, one list per field, one row per artifact."""
+    
+    __slots__ = ("ids", "levels", "upstream_refs", "upstream_hashes")
+    
+    def __init__(self, artifacts: list[dict]):
+        get = dict.get
+        self.ids = [get(artifact, "id", "") for artifact in artifacts]
+        self.levels = levels = [get(artifact, "level", "") for artifact in artifacts]
+        self.upstream_refs = [get(artifact, "supports_upper_layer") for artifact in artifacts]
+        # Only missions' upstream hashes are checked; other rows hold None
+        self.upstream_hashes = [None] * len(artifacts)
+        for row in compress(range(len(levels)), [level == "mission" for level in levels]):
+            self.upstream_hashes[row] = _upstream_hash(artifacts[row])
+
+
+def _upstream_hash(artifact: dict) -> object:
+    lineage = artifact.get("lineage", {})
+    return lineage.get("upstream_hash") if isinstance(lineage, dict) else None
+
+
+# A check yields (row, field, message) for every failing artifact
+Check = Callable[[ArtifactColumns], Iterator[tuple[int, str, str]]]
+
+
+def check_id_version(columns: ArtifactColumns) -> Iterator[tuple[int, str, str]]:
+    """Ids must end in a version suffix."""
+    ids = columns.ids
+    texts = [i if i.__class__ is str else "" for i in ids]
+    unversioned = [match is None for match in map(VERSION_SUFFIX.search, texts)]
+    for row in compress(range(len(ids)), unversioned):
+        artifact_id = ids[row]
+        if artifact_id:
+            yield row, "id", f"ID '{artifact_id}' missing version suffix (expected '_v<number>')"
+
+
+def check_upstream_reference(columns: ArtifactColumns) -> Iterator[tuple[int, str, str]]:
+    """Non-mission artifacts must reference their upstream artifact."""
+    missing = [
+        not ref and level and level != "mission"
+        for level, ref in zip(columns.levels, columns.upstream_refs)
+    ]
+    for row in compress(range(len(missing)), missing):
+        yield row, "supports_upper_layer", "Non-mission artifact must reference upstream artifact"
+
+
+def check_mission_upstream_hash(columns: ArtifactColumns) -> Iterator[tuple[int, str, str]]:
+    """Missions have no upstream, so their upstream_hash must be null."""
+    rooted = [upstream is not None for upstream in columns.upstream_hashes]
+    for row in compress(range(len(rooted)), rooted):
+        yield row, "lineage.upstream_hash", "Mission artifact upstream_hash must be null"
+
+
+class Invariant:
+    """One invariant: the schema fields it governs and its semantic checks."""
+    
+    __slots__ = ("id", "fields", "checks")
+    
+    def __init__(
+        self,
+        invariant_id: str,
+        fields: dict[str, Optional[tuple[str, ...]]],
+        checks: tuple[Check, ...] = ()
+    ):
+        self.id = invariant_id
+        # Field path -> the keywords it governs there (ANY_KEYWORD: all)
+        self.fields = fields
+        self.checks = checks
+
+
+INVARIANTS = (
+    Invariant("INV-001", {"id": ANY_KEYWORD}),
+    Invariant("INV-002", {"id": ("pattern",)}, (check_id_version,)),
+    Invariant(
+        "INV-003",
+        {"supports_upper_layer": ANY_KEYWORD},
+        (check_upstream_reference, check_mission_upstream_hash),
+    ),
+    Invariant("INV-020", {"owner": ANY_KEYWORD, "principal_worker": ANY_KEYWORD}),
+    Invariant("INV-040", {"cheddar_state": ANY_KEYWORD}),
+)
+
+
+def evaluate(artifacts: list[dict]) -> dict[int, list[dict]]:
+    """
+    Run every semantic check over a batch of artifacts.
+    
+    Returns row -> error list for the artifacts that fail a check; errors
+    follow the order of INVARIANTS and then of each invariant's checks.
+    """
+    errors: dict[int, list[dict]] = {}
+    if not artifacts:
+        return errors
+    
+    columns = ArtifactColumns(artifacts)
+    for invariant in INVARIANTS:
+        for check in invariant.checks:
+            for row, field, message in check(columns):
+                errors.setdefault(row, []).append({
+                    "invariant": invariant.id,
+                    "field": field,
+                    "message": message,
+                })
+    return errors
+
+
+def _schema_fields(schema: dict) -> Iterator[tuple[str, str]]:
+    """
+    Every (field path, keyword) a schema declares.
+    
+    Follows local $refs ("#/definitions/..."); paths join property names
+    with "." and array items are ANY_INDEX.
+    """
+    def resolve(node: dict, seen: tuple) -> tuple[dict, tuple]:
+        ref = node.get("$ref")
+        if not isinstance(ref, str) or not ref.startswith("#/") or ref in seen:
+            return node, seen
+        target = schema
+        for part in ref[2:].split("/"):
+            target = target.get(part, {}) if isinstance(target, dict) else {}
+        return resolve(target, seen + (ref,)) if isinstance(target, dict) else (node, seen)
+    
+    def walk(node: object, path: tuple, seen: tuple) -> Iterator[tuple[str, str]]:
+        if not isinstance(node, dict):
+            return
+        node, seen = resolve(node, seen)
+        dotted = ".".join(path)
+        for keyword in node:
+            if path and keyword not in STRUCTURAL_KEYWORDS:
+                yield dotted, keyword
+        for name in node.get("required", ()):
+            yield ".".join(path + (name,)), "required"
+        for name, child in (node.get("properties") or {}).items():
+            yield from walk(child, path + (name,), seen)
+        if isinstance(node.get("items"), dict):
+            yield from walk(node["items"], path + (ANY_INDEX,), seen)
+        for keyword in ("oneOf", "anyOf", "allOf"):
+            for branch in node.get(keyword, ()):
+                yield from walk(branch, path, seen)
+    
+    yield from walk(schema, (), ())
+
+
+def build_invariant_table(schema: dict) -> dict[tuple[str, str], str]:
+    """
+    (field path, keyword) -> invariant, for the fields of one schema that
+    an invariant governs. Keyword-specific rules win over ANY_KEYWORD ones.
+    """
+    table: dict[tuple[str, str], str] = {}
+    fields = set(_schema_fields(schema))
+    for specific in (True, False):
+        for invariant in INVARIANTS:
+            for field, keywords in invariant.fields.items():
+                if (keywords is not ANY_KEYWORD) != specific:
+                    continue
+                for path, keyword in fields:
+                    if path == field and (keywords is ANY_KEYWORD or keyword in keywords):
+                        table.setdefault((path, keyword), invariant.id)
+    return table
+
+
+# Schemas whose tables are kept, most recently used last
+TABLE_CACHE_SIZE = 64
+
+# id(schema) -> (schema, table). Keyed by object, not $id: a reloaded or
+# explicit schema reusing an $id is a new object with its own table.
+# Holding the schema keeps its id from being reused while it is cached.
+_tables: OrderedDict[int, tuple[dict, dict[tuple[str, str], str]]] = OrderedDict()
+
+
+def invariant_table(schema: dict) -> dict[tuple[str, str], str]:
+    """The invariant table of a schema object, built on first use."""
+    key = id(schema)
+    entry = _tables.get(key)
+    if entry is not None:
+        _tables.move_to_end(key)
+        return entry[1]
+    table = build_invariant_table(schema)
+    _tables[key] = (schema, table)
+    if len(_tables) > TABLE_CACHE_SIZE:
+        _tables.popitem(last=False)
+    return table
+
+
+def error_field(error: ValidationError) -> tuple[str, str]:
+    """
+    The (field path, keyword) a validation error is about.
+    
+    A "required" error is reported on the object missing the property;
+    it is attributed to the missing property's own path.
+    """
+    path = [ANY_INDEX if isinstance(part, int) else str(part) for part in error.absolute_path]
+    if error.validator == "required" and isinstance(error.instance, dict):
+        for name in error.validator_value:
+            if name not in error.instance and error.message == f"{name!r} is a required property":
+                path.append(name)
+                break
+    return ".".join(path), str(error.validator)
+
+
+# Digest of this module's source, computed on first use
+_fingerprint: Optional[str] = None
+
+
+def rules_fingerprint() -> str:
+    """
+    Digest of this module's source.
+    
+    Any edit to a declaration, check or the error mapping changes it, so
+    stored results (see lint_state) are never reused across rule changes.
+    """
+    global _fingerprint
+    if _fingerprint is None:
+        with open(__file__, "rb") as f:
+            _fingerprint = hashlib.sha256(f.read()).hexdigest()
+    return _fingerprint
+
+
+def map_errors(
+    errors: Iterable[ValidationError],
+    schema: dict
+) -> Iterator[tuple[Optional[str], ValidationError]]:
+    """Pair each validation error with the invariant it violates, or None."""
+    table = invariant_table(schema)
+    for error in errors:
+        yield table.get(error_field(error)), error
@@ -0,0 +1,686 @@
+#!/usr/bin/env python3
+"""
+Cheddar Validation Server
+
+Resident validation service for editor plugins and pre-commit hooks. A
+hook that runs `cheddar validate` pays interpreter start-up, schema
+compilation and corpus parsing on every call; the server pays them once
+and keeps them warm:
+
+    - compiled schemas (one SchemaRegistry for the server's lifetime),
+    - the parsed corpus and lineage index (a watch.LintSession over the
+      served tree, kept current by the same inotify/polling watcher as
+      `run_all.py --watch`),
+    - recently checked documents, keyed by path and content digest, so
+      re-sending an unchanged buffer or file is a dictionary lookup.
+
+Requests are JSON over HTTP/1.1 (keep-alive), on a Unix socket by default
+or on a localhost TCP port:
+
+    POST /validate       {"path": ..., "content": ...}  validate_artifact result
+    POST /hash           {"path": ..., "content": ..., "mode": "compute"|"verify"}
+    POST /verify-chain   {"path": ..., "content": ...}  chain errors of one file,
+                         or {} for every chain error in the served tree
+    POST /batch          {"requests": [{"op": "validate", "path": ...}, ...]}
+    GET  /metrics        latency, cache hit rate and files-per-second counters
+
+"content" is optional: when given it is checked in place of the file on
+disk (an unsaved editor buffer), and the chain check treats it as the
+file's new version against the rest of the tree. Paths are resolved
+against the server's working directory, so clients should send absolute
+paths. /hash never writes files.
+
+POST bodies must be sent as Content-Type: application/json. On a TCP port,
+which any local process or web page (through DNS rebinding) can reach, the
+server also refuses Host headers other than 127.0.0.1:PORT and
+localhost:PORT, and paths that a lint run over the served tree would not
+check.
+
+Usage:
+    python serve.py artifacts/ -r                        # .cheddar/serve.sock
+    python serve.py artifacts/ -r --port 8765            # http://127.0.0.1:8765
+    curl --unix-socket .cheddar/serve.sock -H 'Content-Type: application/json' \\
+        -d '{"path": "'"$PWD"'/artifacts/brief.yaml"}' http://localhost/validate
+
+Exit codes:
+    0 - Server stopped (SIGINT or SIGTERM)
+    2 - Usage/configuration error (e.g. address already in use)
+    3 - Internal error
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import ChainMap, OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+from compute_hash import compute_hash, format_output, get_existing_hash
+from corpus import CorpusEntry
+from loader import content_digest, parse_yaml, read_file
+from schema_registry import SchemaRegistry, find_cache_dir
+from validate_artifact import load_error_result, validate_loaded_artifact
+from verify_lineage import detect_cycles, duplicate_error, verify_upstream_reference
+from watch import LintSession, is_lint_target, make_watcher
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+SOCKET_NAME = "serve.sock"
+
+# Checked documents kept beyond the served tree (buffers, outside files,
+# older versions of tree files)
+DOCUMENT_CACHE_SIZE = 1024
+
+# Latency percentiles are computed over this many recent requests per endpoint
+LATENCY_WINDOW = 1000
+
+# Largest request body accepted
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+FILE_OPS = ("validate", "hash", "verify-chain")
+
+HASH_MODES = ("compute", "verify")
+
+
+class RequestError(Exception):
+    """A malformed request; reported to the client as HTTP 400."""
+
+
+class ForbiddenError(RequestError):
+    """A request for something the server does not serve; HTTP 403."""
+
+
+def find_socket_path() -> Path:
+    """Default Unix socket path (.cheddar/serve.sock)."""
+    return find_cache_dir().parent / SOCKET_NAME
+
+
+class _Document:
+    """One version of one file: its parsed content and the results checked so far."""
+    
+    __slots__ = ("path", "artifact", "error", "result", "hash")
+    
+    def __init__(
+        self,
+        path: str,
+        artifact: object,
+        error: Optional[str],
+        result: Optional[dict] = None
+    ):
+        self.path = path
+        self.artifact = artifact
+        self.error = error
+        self.result = result
+        self.hash = None
+
+
+class ServeMetrics:
+    """Request latency, document cache and throughput counters."""
+    
+    def __init__(self):
+        self.started = time.monotonic()
+        self.endpoints: dict[str, dict] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.files = 0
+        self.busy_seconds = 0.0
+        self.reloads = 0
+        self._lock = threading.Lock()
+    
+    def record_request(self, endpoint: str, seconds: float, files: int, failed: bool) -> None:
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {
+                    "requests": 0,
+                    "errors": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "recent": deque(maxlen=LATENCY_WINDOW),
+                }
+            stats["requests"] += 1
+            stats["errors"] += failed
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["recent"].append(seconds)
+            self.files += files
+            self.busy_seconds += seconds
+    
+    def record_lookup(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+    
+    def record_reload(self) -> None:
+        with self._lock:
+            self.reloads += 1
+    
+    def snapshot(self) -> dict:
+        """
+        Current counters.
+        
+        files_per_second is measured over the time spent handling
+        requests, so it reflects throughput under load rather than idle
+        time between requests.
+        """
+        with self._lock:
+            endpoints = {}
+            for name, stats in sorted(self.endpoints.items()):
+                recent = sorted(stats["recent"])
+                endpoints[name] = {
+                    "requests": stats["requests"],
+                    "errors": stats["errors"],
+                    "mean_ms": stats["total_seconds"] / stats["requests"] * 1000,
+                    "p50_ms": _percentile(recent, 0.50) * 1000,
+                    "p95_ms": _percentile(recent, 0.95) * 1000,
+                    "max_ms": stats["max_seconds"] * 1000,
+                }
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                "uptime_seconds": time.monotonic() - self.started,
+                "endpoints": endpoints,
+                "cache": {
+                    "hits": self.cache_hits,
+                    "misses": self.cache_misses,
+                    "hit_rate": self.cache_hits / lookups if lookups else None,
+                },
+                "files_checked": self.files,
+                "busy_seconds": self.busy_seconds,
+                "files_per_second": self.files / self.busy_seconds if self.busy_seconds else None,
+                "reloads": self.reloads,
+            }
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of a sorted list (0.0 if empty)."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ValidationService:
+    """
+    The warm state behind the server, and the checks it answers.
+    
+    Requests and tree reloads are serialised by one lock: checks are
+    CPU-bound, so threads would not run them faster, but request handling
+    and socket I/O still overlap. A confined service only reads files a
+    lint run over its roots would check.
+    """
+    
+    def __init__(
+        self,
+        roots: list[Path],
+        recursive: bool = False,
+        registry: Optional[SchemaRegistry] = None,
+        confined: bool = False
+    ):
+        self.session = LintSession(roots, recursive, registry)
+        # Symlinks resolved, so a link in the tree cannot point a request outside it
+        self.confined_roots = (
+            [Path(os.path.realpath(root)) for root in roots] if confined else None
+        )
+        self.metrics = ServeMetrics()
+        self.lock = threading.Lock()
+        self._documents: OrderedDict[tuple[str, str], _Document] = OrderedDict()
+    
+    def load(self) -> int:
+        """Parse and check the served tree; returns the number of files."""
+        with self.lock:
+            self.session.load()
+            return len(self.session.entries)
+    
+    def reload(self, changed: set[Path]) -> None:
+        """Bring the session up to date after files in the tree changed."""
+        with self.lock:
+            self.session.update(changed)
+        self.metrics.record_reload()
+    
+    def handle(self, op: str, request: dict) -> dict:
+        """Answer one file request ("validate", "hash" or "verify-chain")."""
+        if not isinstance(request, dict):
+            raise RequestError("Request must be a JSON object")
+        if op not in FILE_OPS:
+            raise RequestError(f"Unknown operation: {op}")
+        
+        with self.lock:
+            if op == "verify-chain" and "path" not in request and "content" not in request:
+                return self._tree_chain_errors()
+            path, document = self._document(request)
+            if op == "validate":
+                return self._validate(document)
+            if op == "hash":
+                mode = request.get("mode", "compute")
+                if mode not in HASH_MODES:
+                    raise RequestError(f"Unknown hash mode: {mode}")
+                return self._hash(document, mode)
+            return self._chain_errors(path, document)
+    
+    def _document(self, request: dict) -> tuple[str, _Document]:
+        """
+        Load the document a request refers to.
+        
+        A version already parsed, by the session or an earlier request, is
+        reused; only new content is parsed.
+        """
+        path = request.get("path")
+        content = request.get("content")
+        if path is None and content is None:
+            raise RequestError("Request needs a path or content")
+        if path is not None and not isinstance(path, str):
+            raise RequestError("path must be a string")
+        if content is not None and not isinstance(content, str):
+            raise RequestError("content must be a string")
+        if path is not None and self.confined_roots is not None and not is_lint_target(
+            Path(os.path.realpath(path)), self.confined_roots, self.session.recursive
+        ):
+            raise ForbiddenError(f"Path is outside the served tree: {path}")
+        
+        name = path if path is not None else "<buffer>"
+        key = os.path.abspath(path) if path is not None else name
+        
+        if content is not None:
+            data = content.encode("utf-8")
+        else:
+            try:
+                data, _ = read_file(Path(key))
+            except OSError as e:
+                return key, _Document(name, None, f"Failed to load file: {e}")
+        digest = content_digest(data)
+        
+        document = self._documents.get((key, digest))
+        if document is not None:
+            self._documents.move_to_end((key, digest))
+            self.metrics.record_lookup(hit=True)
+            return key, document
+        
+        entry = self.session.entries.get(key)
+        if entry is not None and entry.digest == digest:
+            document = _Document(name, entry.artifact, entry.error, self.session.results[key])
+            self.metrics.record_lookup(hit=True)
+        else:
+            try:
+                document = _Document(name, parse_yaml(data, name), None)
+            except yaml.YAMLError as e:
+                document = _Document(name, None, f"Invalid YAML: {e}")
+            except Exception as e:
+                document = _Document(name, None, f"Failed to load file: {e}")
+            self.metrics.record_lookup(hit=False)
+        
+        self._documents[(key, digest)] = document
+        if len(self._documents) > DOCUMENT_CACHE_SIZE:
+            self._documents.popitem(last=False)
+        return key, document
+    
+    def _validate(self, document: _Document) -> dict:
+        if document.result is None:
+            if document.error is not None:
+                document.result = load_error_result(Path(document.path), document.error)
+            else:
+                document.result = validate_loaded_artifact(
+                    document.artifact, Path(document.path), registry=self.session.registry
+                )
+        return document.result
+    
+    def _hash(self, document: _Document, mode: str) -> dict:
+        if document.error is not None:
+            return {"file": document.path, "action": mode, "error": document.error}
+        if not isinstance(document.artifact, dict):
+            return {"file": document.path, "action": mode, "error": "Not a YAML mapping"}
+        if document.hash is None:
+            document.hash = compute_hash(document.artifact)
+        return format_output(
+            Path(document.path), document.hash, get_existing_hash(document.artifact), mode
+        )
+    
+    def _chain_errors(self, key: str, document: _Document) -> dict:
+        """
+        Chain errors of one file, as if its content were the given version.
+        
+        The version is checked against the rest of the served tree without
+        changing it, so an unsaved buffer sees the errors its save would
+        cause. Chain results depend on the rest of the tree and are never
+        cached.
+        """
+        if document.error is not None:
+            return {
+                "file": document.path,
+                "passed": False,
+                "chain_errors": [],
+                "error": document.error,
+            }
+        
+        entry = CorpusEntry(Path(document.path), document.artifact, None, explicit=False)
+        if not entry.is_artifact:
+            return {"file": document.path, "passed": True, "chain_errors": []}
+        
+        artifact = dict(document.artifact)
+        artifact["_source_path"] = document.path
+        artifact_id = artifact.get("id")
+        session = self.session
+        
+        errors = []
+        if "documentation_log" not in artifact:
+            errors.extend(verify_upstream_reference(artifact, session.index))
+        # The index sees this version in place of the one on disk
+        index = ChainMap({artifact_id: artifact}, session.index) if artifact_id else session.index
+        errors.extend(detect_cycles([artifact], index))
+        
+        # As in a full run, the first definition in path order is the original
+        others = session.ids.get(artifact_id, set()) - {key}
+        if others and min(others) < key:
+            errors.append(duplicate_error(artifact, session.artifacts[min(others)]))
+        
+        return {"file": document.path, "passed": not errors, "chain_errors": errors}
+    
+    def _tree_chain_errors(self) -> dict:
+        """Every chain error in the served tree, as of the last reload."""
+        session = self.session
+        errors = []
+        for key in sorted(session.artifacts):
+            errors.extend(session.upstream_errors.get(key, []))
+            errors.extend(session.cycle_errors.get(key, []))
+            errors.extend(session.duplicate_errors.get(key, []))
+        return {
+            "passed": not errors,
+            "artifacts_checked": len(session.artifacts),
+            "chain_errors": errors,
+        }
+    
+    def batch(self, request: dict) -> tuple[dict, int]:
+        """
+        Answer many file requests at once; returns (response, file count).
+        
+        Each item is a file request with an "op" field. A malformed item
+        gets an {"error": ...} response without failing the others.
+        """
+        items = request.get("requests") if isinstance(request, dict) else None
+        if not isinstance(items, list):
+            raise RequestError("Batch request needs a \"requests\" list")
+        
+        results = []
+        for item in items:
+            try:
+                op = item.get("op") if isinstance(item, dict) else None
+                results.append(self.handle(op, item))
+            except RequestError as e:
+                # Including ForbiddenError: one refused path does not fail the batch
+                results.append({"error": str(e)})
+        return {"results": results}, len(items)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    JSON request handler; the service is the server's .service attribute.
+    
+    The server's .allowed_hosts, if not None, are the only Host headers
+    answered.
+    """
+    
+    protocol_version = "HTTP/1.1"
+    
+    def _host_allowed(self) -> bool:
+        allowed = self.server.allowed_hosts
+        if allowed is None or self.headers.get("Host") in allowed:
+            return True
+        self._respond(403, {"error": "Host not allowed"})
+        return False
+    
+    def do_GET(self) -> None:
+        if not self._host_allowed():
+            return
+        if self.path == "/metrics":
+            metrics = self.server.service.metrics.snapshot()
+            metrics["corpus_files"] = len(self.server.service.session.entries)
+            self._respond(200, metrics)
+        else:
+            self._respond(404, {"error": f"Unknown endpoint: {self.path}"})
+    
+    def do_POST(self) -> None:
+        if not self._host_allowed():
+            return
+        service = self.server.service
+        endpoint = self.path.strip("/")
+        start = time.perf_counter()
+        files = 0
+        status = 200
+        try:
+            request = self._read_json()
+            if endpoint == "batch":
+                response, files = service.batch(request)
+            elif endpoint in FILE_OPS:
+                response = service.handle(endpoint, request)
+                # The tree-wide chain report reads stored results; it checks no file
+                files = 1 if "file" in response else 0
+            else:
+                status, response = 404, {"error": f"Unknown endpoint: /{endpoint}"}
+        except ForbiddenError as e:
+            status, response = 403, {"error": str(e)}
+        except RequestError as e:
+            status, response = 400, {"error": str(e)}
+        except Exception as e:
+            status, response = 500, {"error": f"Internal error: {e}"}
+        
+        if status != 404:
+            service.metrics.record_request(
+                endpoint, time.perf_counter() - start, files, failed=status != 200
+            )
+        self._respond(status, response)
+    
+    def _read_json(self) -> object:
+        # Browsers send form content types cross-origin without a preflight
+        if self.headers.get_content_type() != "application/json":
+            raise RequestError("Content-Type must be application/json")
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise RequestError("Invalid Content-Length") from None
+        if length > MAX_REQUEST_BYTES:
+            raise RequestError(f"Request body larger than {MAX_REQUEST_BYTES} bytes")
+        body = self.rfile.read(length) if length else b"{}"
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise RequestError(f"Invalid JSON: {e}") from None
+    
+    def _respond(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format: str, *args: object) -> None:
+        # Editors poll the server constantly; per-request logs are noise
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP over a Unix socket (http.server only binds TCP)."""
+    
+    daemon_threads = True
+    
+    def server_bind(self) -> None:
+        # Only the owner may connect; the socket answers for their files
+        old_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
+    
+    def get_request(self) -> tuple:
+        # BaseHTTPRequestHandler expects a (host, port)-like client address
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def claim_socket_path(path: Path) -> None:
+    """
+    Remove a stale socket left by a server that died; raises OSError if a
+    server is still listening on path.
+    """
+    if not path.exists():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except (ConnectionRefusedError, FileNotFoundError):
+        path.unlink(missing_ok=True)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"A server is already listening on {path}")
+
+
+def make_server(service: ValidationService, socket_path: Optional[Path], port: Optional[int]):
+    """
+    Bind the server to a Unix socket, or to 127.0.0.1:port if port is given.
+    
+    On a port, only requests addressed to 127.0.0.1:PORT or localhost:PORT
+    are answered.
+    """
+    if port is not None:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        server.daemon_threads = True
+        bound = server.server_address[1]
+        server.allowed_hosts = {f"127.0.0.1:{bound}", f"localhost:{bound}"}
+    else:
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        claim_socket_path(socket_path)
+        server = UnixHTTPServer(str(socket_path), _Handler)
+        server.allowed_hosts = None
+    server.service = service
+    return server
+
+
+def watch_tree(service: ValidationService, poll_interval: Optional[float]) -> None:
+    """Reload the service on every change to the served tree (runs forever)."""
+    session = service.session
+    watcher = make_watcher(session.roots, session.recursive, poll_interval)
+    try:
+        while True:
+            service.reload(watcher.wait())
+    finally:
+        watcher.close()
+
+
+def _interrupt(signum: int, frame: object) -> None:
+    raise KeyboardInterrupt
+
+
+def serve(
+    roots: list[Path],
+    recursive: bool = False,
+    registry: Optional[SchemaRegistry] = None,
+    socket_path: Optional[Path] = None,
+    port: Optional[int] = None,
+    poll_interval: Optional[float] = None
+) -> int:
+    """Load the tree and serve requests until interrupted."""
+    service = ValidationService(roots, recursive, registry, confined=port is not None)
+    
+    start = time.perf_counter()
+    files = service.load()
+    elapsed = time.perf_counter() - start
+    
+    server = make_server(service, socket_path, port)
+    if port is not None:
+        address = f"http://127.0.0.1:{server.server_address[1]}"
+    else:
+        address = f"unix:{socket_path}"
+    print(f"Serving {files} file(s) on {address} (loaded in {elapsed:.2f}s)", file=sys.stderr)
+    
+    threading.Thread(target=watch_tree, args=(service, poll_interval), daemon=True).start()
+    # Stopped by a service manager as by Ctrl-C, so the socket is removed
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        return EXIT_SUCCESS
+    finally:
+        server.server_close()
+        if port is None:
+            socket_path.unlink(missing_ok=True)
+    return EXIT_SUCCESS
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Serve Cheddar validation to editors and hooks over a local socket."
+    )
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="+",
+        help="Artifact files or directories to keep loaded",
+    )
+    parser.add_argument(
+        "--recursive", "-r",
+        action="store_true",
+        help="Recursively process directories",
+    )
+    address = parser.add_mutually_exclusive_group()
+    address.add_argument(
+        "--socket",
+        type=Path,
+        help=f"Unix socket to listen on (default: .cheddar/{SOCKET_NAME})",
+    )
+    address.add_argument(
+        "--port",
+        type=int,
+        help="Listen on 127.0.0.1:PORT instead of a Unix socket (0 picks a free port)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        help="Poll the tree at this interval (seconds) instead of using inotify",
+    )
+    
+    args = parser.parse_args()
+    
+    for path in args.paths:
+        if not path.exists():
+            print(f"Error: Path not found: {path}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+    
+    if args.port is None and not hasattr(socket, "AF_UNIX"):
+        print("Error: Unix sockets are not available here; use --port", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    try:
+        return serve(
+            args.paths,
+            recursive=args.recursive,
+            registry=SchemaRegistry(),
+            socket_path=None if args.port is not None else args.socket or find_socket_path(),
+            port=args.port,
+            poll_interval=args.poll_interval,
+        )
+    
+    except OSError as e:
+        print(f"Error: Cannot listen: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,14 @@ Cheddar Artifact Validator
 Validates Cheddar artifacts against JSON Schema definitions.
 Enforces: INV-001, INV-002, INV-003, INV-020, INV-040
 
+Schema errors are attributed to invariants, and semantic rules beyond
+JSON Schema are checked, by the declarations in semantic_rules.py.
+Directories and corpora are checked a chunk of artifacts at a time.
+
 Usage:
     python validate_artifact.py <artifact.yaml> [--schema <schema.json>]
     python validate_artifact.py <directory> [--recursive]
+    python validate_artifact.py <directory> -r --ndjson  # Stream one JSON line per file
 
 Exit codes:
     0 - All validations passed
@@ -18,12 +23,21 @@ Exit codes:
 
 import argparse
 import json
+import os
 import sys
+from itertools import chain, islice
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional, TextIO
 
 import yaml
-from jsonschema import Draft7Validator, ValidationError
+from jsonschema import Draft7Validator
+
+from corpus import ArtifactCorpus, find_artifact_files, iter_artifact_files
+from loader import load_yaml_file
+from parallel import PARALLEL_MIN_ITEMS, chunk, default_jobs, imap_chunked, map_chunked, use_pool
+from profiler import add_profile_arguments, finish_profiling, get_profiler, start_profiling
+from schema_registry import SchemaRegistry, get_registry
+from semantic_rules import evaluate, map_errors
 
 # Exit codes
 EXIT_SUCCESS = 0
@@ -43,17 +57,8 @@ LEVEL_TO_SCHEMA = {
 # Special case for documentation logs (detected by structure, not level)
 DOCUMENTATION_LOG_SCHEMA = "documentation_log.schema.json"
 
-
-def find_schema_dir() -> Path:
-    """Locate the schemas directory relative to this script."""
-    script_dir = Path(__file__).parent
-    repo_root = script_dir.parent
-    schema_dir = repo_root / "schemas"
-    
-    if not schema_dir.exists():
-        raise FileNotFoundError(f"Schema directory not found: {schema_dir}")
-    
-    return schema_dir
+# Files parsed before their semantic rules run together when validating paths
+SEMANTIC_BATCH_SIZE = 1024
 
 
 def load_schema(schema_path: Path) -> dict:
@@ -64,8 +69,7 @@ def load_schema(schema_path: Path) -> dict:
 
 def load_artifact(artifact_path: Path) -> dict:
     """Load a YAML artifact file."""
-    with open(artifact_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return load_yaml_file(artifact_path)
 
 
 def detect_artifact_type(artifact: dict) -> Optional[str]:
@@ -88,12 +92,19 @@ def detect_artifact_type(artifact: dict) -> Optional[str]:
 
 def validate_artifact(
     artifact: dict,
-    schema: dict,
-    artifact_path: str
+    schema: Optional[dict],
+    artifact_path: str,
+    validator: Optional[Draft7Validator] = None,
+    check_semantics: bool = True
 ) -> dict:
     """
     Validate an artifact against a schema.
     
+    Pass a precompiled validator (see schema_registry) to avoid compiling
+    the schema again; schema is then ignored. With check_semantics False,
+    only the schema is checked: callers validating many artifacts run the
+    semantic rules over all of them at once (see validate_loaded_batch).
+    
     Returns a result dict with:
         - linter: str
         - file: str
@@ -109,138 +120,171 @@ def validate_artifact(
         "warnings": [],
     }
     
-    validator = Draft7Validator(schema)
-    errors = list(validator.iter_errors(artifact))
+    if validator is None:
+        validator = Draft7Validator(schema)
     
-    if errors:
+    # Map to invariants where applicable (see semantic_rules.INVARIANTS)
+    for invariant, error in map_errors(validator.iter_errors(artifact), validator.schema):
         result["passed"] = False
-        for error in errors:
-            path = ".".join(str(p) for p in error.absolute_path) or "(root)"
-            
-            # Map to invariants where applicable
-            invariant = map_error_to_invariant(error, path)
-            
-            result["errors"].append({
-                "invariant": invariant,
-                "field": path,
-                "message": error.message,
-            })
+        result["errors"].append({
+            "invariant": invariant,
+            "field": ".".join(str(p) for p in error.absolute_path) or "(root)",
+            "message": error.message,
+        })
     
     # Additional semantic checks beyond JSON Schema
-    semantic_errors = check_semantic_rules(artifact)
-    if semantic_errors:
-        result["passed"] = False
-        result["errors"].extend(semantic_errors)
+    if check_semantics:
+        with get_profiler().file("semantic", artifact_path):
+            semantic_errors = check_semantic_rules(artifact)
+        if semantic_errors:
+            result["passed"] = False
+            result["errors"].extend(semantic_errors)
     
     return result
 
 
-def map_error_to_invariant(error: ValidationError, path: str) -> Optional[str]:
-    """Map a validation error to the relevant Cheddar invariant."""
-    # INV-001: Every artifact MUST have a stable, unique id
-    if path == "id" or "id" in path:
-        return "INV-001"
-    
-    # INV-002: Every artifact MUST include a version
-    if "_v" in str(error.instance) if error.instance else False:
-        return "INV-002"
-    
-    # INV-003: Every non-mission artifact MUST reference exactly one upstream
-    if "supports_upper_layer" in path:
-        return "INV-003"
-    
-    # INV-020: Every automation MUST have an identified human owner
-    if path == "owner" or "owner" in path:
-        return "INV-020"
-    
-    # INV-040: cheddar_state MUST be valid
-    if "cheddar_state" in path:
-        return "INV-040"
-    
-    return None
-
-
 def check_semantic_rules(artifact: dict) -> list:
     """
     Check semantic rules beyond JSON Schema validation.
     
     Returns list of error dicts.
     """
-    errors = []
-    
-    # INV-001: ID must follow naming convention
-    artifact_id = artifact.get("id", "")
-    if artifact_id and "_v" not in artifact_id:
-        errors.append({
-            "invariant": "INV-002",
-            "field": "id",
-            "message": f"ID '{artifact_id}' missing version suffix (expected '_v<number>')",
-        })
-    
-    # INV-003: Non-mission artifacts must have upstream reference
-    level = artifact.get("level", "")
-    if level and level != "mission":
-        if not artifact.get("supports_upper_layer"):
-            errors.append({
-                "invariant": "INV-003",
-                "field": "supports_upper_layer",
-                "message": "Non-mission artifact must reference upstream artifact",
-            })
-    
-    # Mission artifacts must have null upstream_hash
-    if level == "mission":
-        lineage = artifact.get("lineage", {})
-        if lineage.get("upstream_hash") is not None:
-            errors.append({
-                "invariant": "INV-003",
-                "field": "lineage.upstream_hash",
-                "message": "Mission artifact upstream_hash must be null",
-            })
-    
-    return errors
+    return evaluate([artifact]).get(0, [])
+
+
+def load_error_result(artifact_path: Path, message: str) -> dict:
+    """Build the result dict for a file that could not be loaded."""
+    return {
+        "linter": "validate_artifact",
+        "file": str(artifact_path),
+        "passed": False,
+        "errors": [{
+            "invariant": None,
+            "field": "(file)",
+            "message": message,
+        }],
+        "warnings": [],
+    }
 
 
 def validate_file(
     artifact_path: Path,
-    schema_path: Optional[Path] = None
+    schema_path: Optional[Path] = None,
+    registry: Optional[SchemaRegistry] = None
 ) -> dict:
     """
     Validate a single artifact file.
     
     If schema_path is None, auto-detect from artifact content.
+    Compiled validators come from registry (the process-wide default
+    registry if None).
     """
+    artifact, error_result = _load_for_validation(artifact_path)
+    if error_result is not None:
+        return error_result
+    
+    return validate_loaded_artifact(artifact, artifact_path, schema_path, registry)
+
+
+def _load_for_validation(artifact_path: Path) -> tuple[object, Optional[dict]]:
+    """Parse a file; returns (artifact, None) or (None, its load-error result)."""
     try:
-        artifact = load_artifact(artifact_path)
+        with get_profiler().file("parse", artifact_path):
+            return load_artifact(artifact_path), None
     except yaml.YAMLError as e:
-        return {
-            "linter": "validate_artifact",
-            "file": str(artifact_path),
-            "passed": False,
-            "errors": [{
-                "invariant": None,
-                "field": "(file)",
-                "message": f"Invalid YAML: {e}",
-            }],
-            "warnings": [],
-        }
+        return None, load_error_result(artifact_path, f"Invalid YAML: {e}")
     except Exception as e:
-        return {
-            "linter": "validate_artifact",
-            "file": str(artifact_path),
-            "passed": False,
-            "errors": [{
-                "invariant": None,
-                "field": "(file)",
-                "message": f"Failed to load file: {e}",
-            }],
-            "warnings": [],
-        }
+        return None, load_error_result(artifact_path, f"Failed to load file: {e}")
+
+
+def validate_loaded_artifact(
+    artifact: object,
+    artifact_path: Path,
+    schema_path: Optional[Path] = None,
+    registry: Optional[SchemaRegistry] = None
+) -> dict:
+    """
+    Validate an already-parsed artifact.
+    
+    Same as validate_file, for callers that parsed the file themselves
+    (e.g. from an ArtifactCorpus).
+    """
+    with get_profiler().file("validate", artifact_path):
+        return _validate_loaded(artifact, artifact_path, schema_path, registry)[0]
+
+
+def validate_loaded_batch(
+    items: list[tuple[Path, object]],
+    registry: Optional[SchemaRegistry] = None
+) -> list[dict]:
+    """
+    Validate many already-parsed (path, artifact) pairs.
+    
+    Same results as validate_loaded_artifact on each, but the semantic
+    rules run once over every artifact that reached schema validation,
+    column by column (see semantic_rules).
+    
+    Returns list of result dicts, in input order.
+    """
+    profiler = get_profiler()
+    results = []
+    checked = []
+    for path, artifact in items:
+        with profiler.file("validate", path):
+            result, schema_checked = _validate_loaded(
+                artifact, path, None, registry, check_semantics=False
+            )
+        results.append(result)
+        if schema_checked:
+            checked.append((result, artifact))
+    
+    with profiler.stage("semantic"):
+        semantic_errors = evaluate([artifact for _, artifact in checked])
+    for row, errors in semantic_errors.items():
+        result = checked[row][0]
+        result["passed"] = False
+        result["errors"].extend(errors)
+    
+    return results
+
+
+def _validate_file_batch(paths: list[Path], registry: Optional[SchemaRegistry]) -> list[dict]:
+    """Parse and validate files, evaluating the semantic rules per SEMANTIC_BATCH_SIZE files."""
+    results = []
+    for batch in chunk(paths, SEMANTIC_BATCH_SIZE):
+        loaded = []
+        slots = []
+        for path in batch:
+            artifact, error_result = _load_for_validation(path)
+            slots.append(error_result)
+            if error_result is None:
+                loaded.append((path, artifact))
+        validated = iter(validate_loaded_batch(loaded, registry))
+        results.extend(next(validated) if slot is None else slot for slot in slots)
+    return results
+
+
+def _validate_loaded(
+    artifact: object,
+    artifact_path: Path,
+    schema_path: Optional[Path],
+    registry: Optional[SchemaRegistry],
+    check_semantics: bool = True
+) -> tuple[dict, bool]:
+    """The result, and whether the artifact reached schema validation."""
+    if registry is None:
+        registry = get_registry()
+    
+    if not isinstance(artifact, dict):
+        return load_error_result(
+            artifact_path,
+            f"Artifact must be a YAML mapping, got {type(artifact).__name__}",
+        ), False
     
     # Determine schema
     if schema_path:
         schema_file = schema_path
     else:
-        schema_dir = find_schema_dir()
         schema_name = detect_artifact_type(artifact)
         
         if not schema_name:
@@ -254,12 +298,15 @@ def validate_file(
                     "message": f"Cannot detect artifact type. Unknown level: {artifact.get('level')}",
                 }],
                 "warnings": [],
-            }
+            }, False
         
-        schema_file = schema_dir / schema_name
+        schema_file = registry.schema_dir / schema_name
     
     try:
-        schema = load_schema(schema_file)
+        if schema_path:
+            validator = registry.get_validator_for_path(schema_file)
+        else:
+            validator = registry.get_validator(schema_name)
     except Exception as e:
         return {
             "linter": "validate_artifact",
@@ -271,34 +318,166 @@ def validate_file(
                 "message": f"Failed to load schema {schema_file}: {e}",
             }],
             "warnings": [],
-        }
+        }, False
     
-    return validate_artifact(artifact, schema, artifact_path)
+    result = validate_artifact(
+        artifact, None, artifact_path, validator=validator, check_semantics=check_semantics
+    )
+    return result, True
 
 
-def validate_directory(
-    directory: Path,
-    recursive: bool = False
+# Registry of a pool worker process, compiled once by init_worker
+_worker_registry: Optional[SchemaRegistry] = None
+
+
+def init_worker(schema_dir: Path) -> None:
+    """Pool initializer: compile every schema once per worker process."""
+    global _worker_registry
+    _worker_registry = SchemaRegistry(schema_dir=schema_dir)
+    _worker_registry.compile_all()
+
+
+def worker_registry() -> Optional[SchemaRegistry]:
+    """The registry compiled by init_worker in this pool worker."""
+    return _worker_registry
+
+
+def _validate_chunk(paths: list[Path]) -> list[dict]:
+    """Pool task: validate a chunk of files with the worker's registry."""
+    return _validate_file_batch(paths, _worker_registry)
+
+
+def _validate_loaded_chunk(items: list[tuple[Path, object]]) -> list[dict]:
+    """Pool task: validate a chunk of pre-parsed artifacts."""
+    return validate_loaded_batch(items, _worker_registry)
+
+
+def validate_files(
+    paths: list[Path],
+    registry: Optional[SchemaRegistry] = None,
+    jobs: int = 1
 ) -> list:
     """
-    Validate all YAML files in a directory.
+    Validate many artifact files, optionally across a process pool.
+    
+    With jobs > 1, files are sent to workers in chunks; each worker compiles
+    the registry's schemas once. Results are returned in the order of paths.
     
     Returns list of result dicts.
     """
-    results = []
+    if registry is None:
+        registry = get_registry()
     
-    pattern = "**/*.yaml" if recursive else "*.yaml"
-    for artifact_path in directory.glob(pattern):
-        # Skip non-artifact files
-        if artifact_path.name.startswith("."):
-            continue
+    with get_profiler().stage("validate"):
+        if not use_pool(len(paths), jobs):
+            return _validate_file_batch(paths, registry)
         
-        result = validate_file(artifact_path)
-        results.append(result)
+        return map_chunked(
+            _validate_chunk,
+            paths,
+            jobs,
+            initializer=init_worker,
+            initargs=(registry.schema_dir,),
+        )
+
+
+def iter_validate_files(
+    paths: Iterable[Path],
+    registry: Optional[SchemaRegistry] = None,
+    jobs: int = 1
+) -> Iterator[dict]:
+    """
+    Validate many artifact files, yielding each result as soon as it is ready.
+    
+    The streaming form of validate_files: paths may be a lazy iterable
+    (see corpus.iter_artifact_files), results come in its order, and only
+    a bounded window of paths and results is held at any time.
+    """
+    if registry is None:
+        registry = get_registry()
+    
+    # Peek far enough to tell whether a pool is worth starting
+    paths = iter(paths)
+    head = list(islice(paths, PARALLEL_MIN_ITEMS))
+    
+    with get_profiler().stage("validate"):
+        if not use_pool(len(head), jobs):
+            for path in chain(head, paths):
+                yield validate_file(path, registry=registry)
+            return
+        
+        yield from imap_chunked(
+            _validate_chunk,
+            chain(head, paths),
+            jobs,
+            initializer=init_worker,
+            initargs=(registry.schema_dir,),
+        )
+
+
+def validate_corpus(
+    corpus: ArtifactCorpus,
+    registry: Optional[SchemaRegistry] = None,
+    jobs: int = 1
+) -> list:
+    """
+    Validate every entry of a parsed corpus without re-reading any file.
+    
+    Entries that failed to parse produce a single load-error result. With
+    jobs > 1, the parsed artifacts are validated in a process pool.
+    
+    Returns list of result dicts, in corpus order.
+    """
+    if registry is None:
+        registry = get_registry()
+    
+    with get_profiler().stage("validate"):
+        return _validate_entries(corpus, registry, jobs)
+
+
+def _validate_entries(corpus: ArtifactCorpus, registry: SchemaRegistry, jobs: int) -> list:
+    loaded = [(entry.path, entry.artifact) for entry in corpus if entry.error is None]
+    
+    if use_pool(len(loaded), jobs):
+        validated = iter(map_chunked(
+            _validate_loaded_chunk,
+            loaded,
+            jobs,
+            initializer=init_worker,
+            initargs=(registry.schema_dir,),
+        ))
+    else:
+        validated = iter(validate_loaded_batch(loaded, registry))
+    
+    results = []
+    for entry in corpus:
+        if entry.error is not None:
+            results.append(load_error_result(entry.path, entry.error))
+        else:
+            results.append(next(validated))
     
     return results
 
 
+def validate_directory(
+    directory: Path,
+    recursive: bool = False,
+    registry: Optional[SchemaRegistry] = None,
+    jobs: int = 1
+) -> list:
+    """
+    Validate all YAML files in a directory.
+    
+    All files share the compiled validators of one registry. With jobs > 1
+    the files are validated in a process pool (see validate_files).
+    
+    Returns list of result dicts.
+    """
+    with get_profiler().stage("discover"):
+        paths = find_artifact_files(directory, recursive)
+    return validate_files(paths, registry, jobs)
+
+
 def print_results(results: list, output_json: bool = False) -> int:
     """
     Print validation results.
@@ -337,6 +516,59 @@ def print_results(results: list, output_json: bool = False) -> int:
     return EXIT_SUCCESS
 
 
+def write_ndjson(record: dict, out: TextIO) -> None:
+    """Write one NDJSON line and flush it, so readers see it immediately."""
+    out.write(json.dumps(record, default=str))
+    out.write("\n")
+    out.flush()
+
+
+def close_stdout_quietly() -> None:
+    """
+    Point stdout at /dev/null once its reader has gone (e.g. `| head`).
+    
+    A streaming run stops at the first failed write; without this, the
+    interpreter would fail again flushing stdout at exit.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+
+
+def print_ndjson(results: Iterable[dict], out: Optional[TextIO] = None) -> int:
+    """
+    Stream validation results as NDJSON.
+    
+    Each result is written as a {"type": "result", ...} line as soon as it
+    arrives, followed by one {"type": "summary", ...} line. Only running
+    counts are kept, so memory does not grow with the number of files.
+    
+    Returns appropriate exit code.
+    """
+    if out is None:
+        out = sys.stdout
+    
+    summary = {
+        "type": "summary",
+        "linter": "validate_artifact",
+        "passed": True,
+        "files_checked": 0,
+        "files_failed": 0,
+        "errors": 0,
+        "warnings": 0,
+    }
+    for result in results:
+        write_ndjson({"type": "result", **result}, out)
+        summary["files_checked"] += 1
+        summary["errors"] += len(result["errors"])
+        summary["warnings"] += len(result.get("warnings", []))
+        if not result["passed"]:
+            summary["passed"] = False
+            summary["files_failed"] += 1
+    write_ndjson(summary, out)
+    
+    return EXIT_SUCCESS if summary["passed"] else EXIT_VALIDATION_ERROR
+
+
 def main() -> int:
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -357,33 +589,70 @@ def main() -> int:
         action="store_true",
         help="Recursively validate directory",
     )
-    parser.add_argument(
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
         "--json",
         action="store_true",
         help="Output results as JSON",
     )
+    output.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Stream one JSON line per file as it is validated, then a summary line",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=default_jobs(),
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
+    if args.jobs < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
     if not args.path.exists():
         print(f"Error: Path not found: {args.path}", file=sys.stderr)
         return EXIT_USAGE_ERROR
     
     try:
+        profiler = start_profiling(args)
+        registry = SchemaRegistry()
+        if args.ndjson:
+            if args.path.is_file():
+                results = iter([validate_file(args.path, args.schema, registry)])
+            elif args.path.is_dir():
+                paths = iter_artifact_files(args.path, args.recursive)
+                results = iter_validate_files(paths, registry, args.jobs)
+            else:
+                print(f"Error: Invalid path type: {args.path}", file=sys.stderr)
+                return EXIT_USAGE_ERROR
+            exit_code = print_ndjson(results)
+            finish_profiling(profiler, "validate_artifact", args)
+            return exit_code
+        
         if args.path.is_file():
-            results = [validate_file(args.path, args.schema)]
+            results = [validate_file(args.path, args.schema, registry)]
         elif args.path.is_dir():
-            results = validate_directory(args.path, args.recursive)
+            results = validate_directory(args.path, args.recursive, registry, args.jobs)
         else:
             print(f"Error: Invalid path type: {args.path}", file=sys.stderr)
             return EXIT_USAGE_ERROR
+        finish_profiling(profiler, "validate_artifact", args)
         
         if not results:
             print("No artifacts found to validate.")
             return EXIT_SUCCESS
         
         return print_results(results, args.json)
-        
+    
+    except BrokenPipeError:
+        close_stdout_quietly()
+        return EXIT_SUCCESS
+    
     except Exception as e:
         print(f"Internal error: {e}", file=sys.stderr)
         return EXIT_INTERNAL_ERROR
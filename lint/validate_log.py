@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Cheddar Documentation Log Validation
+
+Verifies that documentation logs are append-only.
+Enforces: INV-010 (Documentation log entries MUST NOT be modified after creation)
+
+Entries are hash-chained. Each sealed entry carries entry_hash, the SHA-256
+of the next older entry's entry_hash together with its own content; the
+oldest entry chains from an empty digest. Rewriting any entry changes every
+digest above it.
+
+Entries are kept newest first, so new entries appear at the top of the
+entries list. A checkpoint (in .cheddar/cache/log-checkpoints.json) records
+the newest entry verified so far. With a checkpoint, the verifier reads the
+file only down to that entry and never parses the rest:
+
+    1. The checkpointed entry must still be present with the same digest,
+       and its content must still hash to it. A rewrite of any older entry
+       that was re-chained to look consistent changes that digest.
+    2. Every entry added above it must chain correctly from it.
+
+Without a checkpoint, or if the entries cannot be scanned line by line
+(e.g. flow-style YAML), the whole log is verified. An edit below the
+checkpoint that was not re-chained is only caught by a full run (--full).
+
+Usage:
+    python validate_log.py <log.yaml>                # Verify new entries
+    python validate_log.py <directory> --recursive   # Verify every log
+    python validate_log.py <log.yaml> --full         # Verify every entry
+    python validate_log.py <log.yaml> --seal         # Add entry_hash to new entries
+
+Exit codes:
+    0 - All logs verified
+    1 - Append-only violations found
+    2 - Usage/configuration error
+    3 - Internal error
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from corpus import find_artifact_files
+from loader import load_yaml_file, parse_yaml
+from schema_registry import find_cache_dir
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_VALIDATION_ERROR = 1
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+ENTRY_HASH_SEED = b"cheddar-log-v1"
+
+CHECKPOINTS_NAME = "log-checkpoints.json"
+
+# Bytes read from the top of a file to decide whether it is a log
+LOG_SNIFF_SIZE = 4096
+
+_LOG_KEY = re.compile(r"^documentation_log:\s*(#.*)?$", re.MULTILINE)
+_ENTRIES_KEY = re.compile(r"^(\s*)entries:\s*(#.*)?$")
+_ITEM_START = re.compile(r"^(\s*)- ")
+_STORED_HASH = re.compile(r"^\s*(?:- )?entry_hash:\s*[\"']?(sha256:[0-9a-f]{64})[\"']?\s*(#.*)?$")
+
+
+class LogScanError(ValueError):
+    """The entries of a log cannot be located line by line."""
+
+
+def entry_hash(previous: Optional[str], entry: dict) -> str:
+    """Chain one entry onto the digest of the next older entry."""
+    content = {key: value for key, value in entry.items() if key != "entry_hash"}
+    hasher = hashlib.sha256(ENTRY_HASH_SEED)
+    hasher.update(b"\0" + (previous or "").encode("ascii") + b"\0")
+    hasher.update(
+        json.dumps(content, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    )
+    return f"sha256:{hasher.hexdigest()}"
+
+
+def is_log_file(path: Path) -> bool:
+    """Whether a YAML file is a documentation log, judged from its first bytes."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(LOG_SNIFF_SIZE)
+    except OSError:
+        return False
+    return bool(_LOG_KEY.search(head.decode("utf-8", errors="replace")))
+
+
+def iter_entry_blocks(lines: Iterable[str]) -> Iterator[tuple[int, list[str]]]:
+    """
+    Yield (first line number, lines) for each item of the entries sequence.
+    
+    Lines are consumed lazily, so a caller that stops early never reads the
+    rest of the file. Raises LogScanError if the entries are not a block
+    sequence.
+    """
+    item_indent = None
+    in_entries = False
+    start = None
+    block: list[str] = []
+    
+    for number, line in enumerate(lines):
+        stripped = line.strip()
+        
+        if not in_entries:
+            if _ENTRIES_KEY.match(line):
+                in_entries = True
+            continue
+        
+        if not stripped or stripped.startswith("#"):
+            if block:
+                block.append(line)
+            continue
+        
+        indent = len(line) - len(line.lstrip(" "))
+        item = _ITEM_START.match(line)
+        if item_indent is None:
+            if not item:
+                raise LogScanError("entries is not a block sequence")
+            item_indent = indent
+        
+        if item and indent == item_indent:
+            if block:
+                yield start, block
+            start, block = number, [line]
+        elif indent > item_indent:
+            block.append(line)
+        else:
+            break
+    
+    if not in_entries:
+        raise LogScanError("No entries sequence found")
+    if block:
+        yield start, block
+
+
+def stored_hash(block: list[str]) -> Optional[str]:
+    """The entry_hash written in an entry's lines, if any."""
+    for line in block:
+        match = _STORED_HASH.match(line)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _parse_blocks(blocks: list[list[str]], name: str) -> list[dict]:
+    entries = parse_yaml("".join(line for block in blocks for line in block).encode("utf-8"), name)
+    if not isinstance(entries, list) or len(entries) != len(blocks):
+        raise LogScanError("entries did not parse as one mapping per item")
+    return entries
+
+
+class LogCheckpoints:
+    """Newest verified entry of every log, keyed by absolute path."""
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries: dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self._dirty = False
+    
+    def get(self, log_path: Path) -> Optional[dict]:
+        return self.entries.get(os.path.abspath(log_path))
+    
+    def set(self, log_path: Path, checkpoint: Optional[dict]) -> None:
+        key = os.path.abspath(log_path)
+        if checkpoint is None or self.entries.get(key) == checkpoint:
+            return
+        self.entries[key] = checkpoint
+        self._dirty = True
+    
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            # Checkpoints are an optimisation; without them logs are fully verified
+            pass
+
+
+def _error(index: int, message: str) -> dict:
+    return {"invariant": "INV-010", "field": f"entries[{index}]", "message": message}
+
+
+def _check_chain(
+    entries: list[dict],
+    previous: Optional[str],
+    checked_before: int,
+    result: dict
+) -> Optional[dict]:
+    """
+    Verify entries (newest first) chaining from previous, oldest upwards.
+    
+    checked_before is the number of older entries below them. Returns the
+    checkpoint of the newest sealed entry that verified, or None.
+    """
+    checkpoint = None
+    unsealed = 0
+    for offset, entry in enumerate(reversed(entries)):
+        index = len(entries) - 1 - offset
+        if not isinstance(entry, dict):
+            result["errors"].append(_error(index, "Entry is not a mapping"))
+            return None
+        
+        computed = entry_hash(previous, entry)
+        recorded = entry.get("entry_hash")
+        if recorded is None:
+            unsealed += 1
+        elif recorded != computed:
+            result["errors"].append(_error(
+                index,
+                f"Entry modified after it was sealed: stored={recorded}, computed={computed}",
+            ))
+            return None
+        else:
+            unsealed = 0
+            checkpoint = {
+                "entries": checked_before + offset + 1,
+                "entry_hash": computed,
+                "previous_hash": previous,
+            }
+        previous = computed
+    
+    if unsealed:
+        result["warnings"].append({
+            "field": "entries",
+            "message": f"{unsealed} newest entries are not sealed (no entry_hash); "
+                       f"run validate_log.py --seal",
+        })
+    return checkpoint
+
+
+def _new_result(path: Path, mode: str) -> dict:
+    return {
+        "linter": "validate_log",
+        "file": str(path),
+        "passed": True,
+        "mode": mode,
+        "entries_checked": 0,
+        "errors": [],
+        "warnings": [],
+    }
+
+
+def verify_log_full(path: Path, checkpoint: Optional[dict] = None) -> tuple[dict, Optional[dict]]:
+    """
+    Verify every entry of a log.
+    
+    If a checkpoint is given, the entry it names must still hash to it.
+    Returns (result, new checkpoint or None).
+    """
+    result = _new_result(path, "full")
+    try:
+        document = load_yaml_file(path)
+        entries = document["documentation_log"]["entries"]
+        if not isinstance(entries, list):
+            raise TypeError("entries is not a list")
+    except Exception as e:
+        result["errors"].append({
+            "invariant": "INV-010",
+            "field": "entries",
+            "message": f"Cannot read log entries: {e}",
+        })
+        result["passed"] = False
+        return result, None
+    
+    result["entries_checked"] = len(entries)
+    new_checkpoint = _check_chain(entries, None, 0, result)
+    
+    if checkpoint is not None and not result["errors"]:
+        # The chain's own digest at the checkpointed position, oldest first
+        digest = None
+        for entry in entries[::-1][:checkpoint["entries"]]:
+            digest = entry_hash(digest, entry)
+        index = len(entries) - checkpoint["entries"]
+        if index < 0 or digest != checkpoint["entry_hash"]:
+            result["errors"].append(_error(
+                max(index, 0),
+                f"Entry {checkpoint['entries']} (oldest first) no longer matches its "
+                f"checkpoint {checkpoint['entry_hash']}; earlier entries were modified or removed",
+            ))
+    
+    result["passed"] = not result["errors"]
+    return result, new_checkpoint if result["passed"] else None
+
+
+def verify_log(path: Path, checkpoint: Optional[dict] = None) -> tuple[dict, Optional[dict]]:
+    """
+    Verify a log, reading only the entries above the checkpoint.
+    
+    Falls back to verify_log_full when there is no checkpoint or the file
+    cannot be scanned. Returns (result, new checkpoint or None).
+    """
+    if checkpoint is None:
+        return verify_log_full(path)
+    
+    result = _new_result(path, "incremental")
+    try:
+        blocks = []
+        found = False
+        with open(path, "r", encoding="utf-8") as f:
+            for _, block in iter_entry_blocks(f):
+                blocks.append(block)
+                if stored_hash(block) == checkpoint["entry_hash"]:
+                    found = True
+                    break
+        if not found:
+            # The checkpointed digest is gone: let a full run say why
+            return verify_log_full(path, checkpoint)
+        entries = _parse_blocks(blocks, str(path))
+    except (LogScanError, UnicodeDecodeError):
+        return verify_log_full(path, checkpoint)
+    except Exception as e:
+        result["errors"].append({
+            "invariant": "INV-010",
+            "field": "entries",
+            "message": f"Cannot read log entries: {e}",
+        })
+        result["passed"] = False
+        return result, None
+    
+    result["entries_checked"] = len(entries)
+    
+    # The checkpointed entry must be unchanged...
+    anchor = entries[-1]
+    if (
+        not isinstance(anchor, dict)
+        or entry_hash(checkpoint["previous_hash"], anchor) != checkpoint["entry_hash"]
+    ):
+        result["errors"].append(_error(
+            len(entries) - 1,
+            f"Checkpointed entry modified after it was sealed: {checkpoint['entry_hash']}",
+        ))
+        result["passed"] = False
+        return result, None
+    
+    # ...and everything above it must chain from it
+    new_checkpoint = _check_chain(
+        entries[:-1], checkpoint["entry_hash"], checkpoint["entries"], result
+    )
+    result["passed"] = not result["errors"]
+    if not result["passed"]:
+        return result, None
+    return result, new_checkpoint or checkpoint
+
+
+def seal_log(path: Path) -> int:
+    """
+    Add entry_hash to every unsealed entry, editing the file text in place.
+    
+    Comments and formatting are preserved. Refuses (ValueError) if a sealed
+    entry no longer matches its digest. Returns the number of entries sealed.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    
+    blocks = list(iter_entry_blocks(lines))
+    entries = _parse_blocks([block for _, block in blocks], str(path))
+    
+    digests = [None] * len(entries)
+    previous = None
+    for index in range(len(entries) - 1, -1, -1):
+        computed = entry_hash(previous, entries[index])
+        recorded = entries[index].get("entry_hash")
+        if recorded is not None and recorded != computed:
+            raise ValueError(f"entries[{index}] was modified after it was sealed")
+        digests[index] = computed
+        previous = computed
+    
+    # Insert from the bottom up so earlier line numbers stay valid
+    sealed = 0
+    for index in range(len(blocks) - 1, -1, -1):
+        if entries[index].get("entry_hash") is not None:
+            continue
+        start, block = blocks[index]
+        item_indent = len(block[0]) - len(block[0].lstrip(" "))
+        last = max(
+            offset for offset, line in enumerate(block)
+            if line.strip() and not line.strip().startswith("#")
+        )
+        newline = "\n" if block[last].endswith("\n") else ""
+        if not newline:
+            lines[start + last] += "\n"
+        lines.insert(
+            start + last + 1,
+            f"{' ' * (item_indent + 2)}entry_hash: \"{digests[index]}\"\n",
+        )
+        sealed += 1
+    
+    if sealed:
+        tmp_path = Path(path).with_suffix(f".tmp{os.getpid()}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp_path, path)
+    return sealed
+
+
+def find_log_files(paths: list[Path], recursive: bool = False) -> list[Path]:
+    """Documentation logs among paths (directories are searched)."""
+    found = []
+    for path in paths:
+        if path.is_file():
+            found.append(path)
+        elif path.is_dir():
+            found.extend(p for p in find_artifact_files(path, recursive) if is_log_file(p))
+    return found
+
+
+def print_result(result: dict, output_json: bool = False) -> None:
+    """Print one log's result."""
+    if output_json:
+        print(json.dumps(result, indent=2))
+        return
+    
+    if result["passed"]:
+        print(f"✓ {result['file']} ({result['entries_checked']} entries checked, {result['mode']})")
+    else:
+        print(f"✗ {result['file']}")
+        for error in result["errors"]:
+            print(f"  [{error['invariant']}] {error['field']}: {error['message']}")
+    for warning in result["warnings"]:
+        print(f"  ⚠ {warning['field']}: {warning['message']}")
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Verify that Cheddar documentation logs are append-only (INV-010)."
+    )
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="+",
+        help="Log files or directories",
+    )
+    parser.add_argument(
+        "--recursive", "-r",
+        action="store_true",
+        help="Recursively process directories",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Verify every entry, not just those above the checkpoint",
+    )
+    parser.add_argument(
+        "--seal",
+        action="store_true",
+        help="Add entry_hash to unsealed entries before verifying",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor update checkpoints",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output results as JSON",
+    )
+    
+    args = parser.parse_args()
+    
+    for path in args.paths:
+        if not path.exists():
+            print(f"Error: Path not found: {path}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+    
+    try:
+        checkpoints = None if args.no_cache else LogCheckpoints(find_cache_dir() / CHECKPOINTS_NAME)
+        
+        results = []
+        for path in find_log_files(args.paths, args.recursive):
+            if args.seal:
+                try:
+                    sealed = seal_log(path)
+                    if sealed and not args.json:
+                        print(f"Sealed {sealed} entries in {path}")
+                except (ValueError, LogScanError) as e:
+                    print(f"Error: Cannot seal {path}: {e}", file=sys.stderr)
+            
+            checkpoint = checkpoints.get(path) if checkpoints is not None else None
+            if args.full:
+                result, new_checkpoint = verify_log_full(path, checkpoint)
+            else:
+                result, new_checkpoint = verify_log(path, checkpoint)
+            if checkpoints is not None:
+                checkpoints.set(path, new_checkpoint)
+            results.append(result)
+        
+        if checkpoints is not None:
+            checkpoints.save()
+        
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            for result in results:
+                print_result(result)
+            if not results:
+                print("No documentation logs found.")
+        
+        all_passed = all(result["passed"] for result in results)
+        return EXIT_SUCCESS if all_passed else EXIT_VALIDATION_ERROR
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,14 @@ Checks:
     4. Mission artifacts have null upstream_hash
     5. No orphaned artifacts (all parents exist)
     6. No circular references
+    7. No two artifacts share an id (INV-001)
+
+All checks run in a single pass over a LineageGraph; cycle detection is
+linear in the number of artifacts.
+
+Files are reduced to compact LineageRecords as they are loaded: each
+artifact's own hash is verified while its document is at hand, and the
+document is then dropped, so memory holds only a few fields per artifact.
 
 Usage:
     python verify_lineage.py <directory>             # Verify all artifacts in directory
@@ -31,9 +39,10 @@ import sys
 from pathlib import Path
 from typing import Optional
 
-import yaml
-
 from compute_hash import compute_hash
+from lineage_graph import LineageGraph, LineageRecord, find_cycle_entries
+from loader import load_yaml_file
+from profiler import add_profile_arguments, finish_profiling, get_profiler, start_profiling
 
 # Exit codes
 EXIT_SUCCESS = 0
@@ -44,10 +53,9 @@ EXIT_INTERNAL_ERROR = 3
 
 def load_artifact(path: Path) -> dict:
     """Load a YAML artifact file."""
-    with open(path, "r", encoding="utf-8") as f:
-        content = yaml.safe_load(f)
-        content["_source_path"] = str(path)
-        return content
+    content = load_yaml_file(path)
+    content["_source_path"] = str(path)
+    return content
 
 
 def get_artifact_id(artifact: dict) -> Optional[str]:
@@ -70,18 +78,32 @@ def get_upstream_ref(artifact: dict) -> Optional[str]:
     return artifact.get("supports_upper_layer")
 
 
-def load_artifacts(paths: list[Path], recursive: bool = False) -> list[dict]:
+def load_artifacts(
+    paths: list[Path],
+    recursive: bool = False,
+    verify_hashes: bool = False
+) -> list[LineageRecord]:
     """
-    Load all artifacts from paths.
+    Load the lineage records of all artifacts under paths.
     
-    Paths can be files or directories.
+    Paths can be files or directories. Each file is parsed, reduced to its
+    LineageRecord and dropped. With verify_hashes, each artifact's INV-004
+    check runs as it is loaded and its errors are kept on the record.
     """
-    artifacts = []
+    with get_profiler().stage("parse"):
+        return _load_artifacts(paths, recursive, verify_hashes)
+
+
+def _load_artifacts(paths: list[Path], recursive: bool, verify_hashes: bool) -> list[LineageRecord]:
+    profiler = get_profiler()
+    records = []
     
     for path in paths:
         if path.is_file() and path.suffix in (".yaml", ".yml"):
             try:
-                artifacts.append(load_artifact(path))
+                with profiler.file("parse", path):
+                    artifact = load_artifact(path)
+                records.append(lineage_record(artifact, verify_hashes))
             except Exception as e:
                 print(f"Warning: Failed to load {path}: {e}", file=sys.stderr)
         
@@ -91,14 +113,30 @@ def load_artifacts(paths: list[Path], recursive: bool = False) -> list[dict]:
                 if file_path.name.startswith("."):
                     continue
                 try:
-                    artifact = load_artifact(file_path)
+                    with profiler.file("parse", file_path):
+                        artifact = load_artifact(file_path)
                     # Skip non-artifact YAML files
                     if artifact.get("level") or artifact.get("documentation_log"):
-                        artifacts.append(artifact)
+                        records.append(lineage_record(artifact, verify_hashes))
                 except Exception as e:
                     print(f"Warning: Failed to load {file_path}: {e}", file=sys.stderr)
     
-    return artifacts
+    return records
+
+
+def lineage_record(artifact: dict, verify_hash: bool = False) -> LineageRecord:
+    """
+    Reduce a parsed artifact to its LineageRecord.
+    
+    With verify_hash, the artifact's own hash is checked now, while the
+    full document is still at hand, and any INV-004 errors are kept on the
+    record for verify_chain to report.
+    """
+    record = LineageRecord.from_artifact(artifact, artifact.get("_source_path", "(unknown)"))
+    if verify_hash and not record.is_log:
+        with get_profiler().file("hash", record.path):
+            record.hash_errors = verify_artifact_hash(artifact) or None
+    return record
 
 
 def build_artifact_index(artifacts: list[dict]) -> dict[str, dict]:
@@ -138,7 +176,10 @@ def verify_artifact_hash(artifact: dict) -> list[dict]:
         # Example hashes like "sha256:a1b2c3d4e5f6..." are placeholders
         return []
     
-    computed = compute_hash(artifact)
+    # _source_path is added by the loader, not part of the hashed content
+    computed = compute_hash(
+        {key: value for key, value in artifact.items() if key != "_source_path"}
+    )
     
     if existing_hash != computed:
         errors.append({
@@ -226,6 +267,28 @@ def verify_upstream_reference(
     return errors
 
 
+def cycle_error(artifact: dict, involving: str) -> dict:
+    """Error dict for an artifact whose ancestor walk loops."""
+    return {
+        "invariant": "INV-005",
+        "artifact": get_artifact_id(artifact),
+        "file": artifact.get("_source_path", "(unknown)"),
+        "message": f"Circular reference detected involving: {involving}",
+    }
+
+
+def duplicate_error(artifact: dict, first: dict) -> dict:
+    """Error dict for an artifact reusing an id defined earlier."""
+    return {
+        "invariant": "INV-001",
+        "artifact": get_artifact_id(artifact),
+        "file": artifact.get("_source_path", "(unknown)"),
+        "message": (
+            f"Duplicate artifact id, also defined in {first.get('_source_path', '(unknown)')}"
+        ),
+    }
+
+
 def detect_cycles(
     artifacts: list[dict],
     artifact_index: dict[str, dict]
@@ -233,82 +296,111 @@ def detect_cycles(
     """
     Detect circular references in artifact chain.
     
+    Ancestor walks are memoised, so this is linear in the number of ids
+    visited rather than one full walk per artifact.
+    
     Returns list of error dicts.
     """
+    entries = find_cycle_entries(
+        artifact_index, (get_artifact_id(artifact) for artifact in artifacts)
+    )
+    
     errors = []
+    for artifact in artifacts:
+        involving = entries.get(get_artifact_id(artifact))
+        if involving:
+            errors.append(cycle_error(artifact, involving))
     
+    return errors
+
+
+def detect_duplicates(artifacts: list[dict]) -> list[dict]:
+    """
+    Detect artifacts that reuse an id defined earlier in the list.
+    
+    Returns list of error dicts.
+    """
+    errors = []
+    first_seen = {}
     for artifact in artifacts:
         artifact_id = get_artifact_id(artifact)
         if not artifact_id:
             continue
-        
-        # Walk up the chain, tracking visited nodes
-        visited = set()
-        current_id = artifact_id
-        
-        while current_id:
-            if current_id in visited:
-                errors.append({
-                    "invariant": "INV-005",
-                    "artifact": artifact_id,
-                    "file": artifact.get("_source_path", "(unknown)"),
-                    "message": f"Circular reference detected involving: {current_id}",
-                })
-                break
-            
-            visited.add(current_id)
-            current = artifact_index.get(current_id)
-            
-            if not current:
-                break
-            
-            current_id = get_upstream_ref(current)
+        first = first_seen.setdefault(artifact_id, artifact)
+        if first is not artifact:
+            errors.append(duplicate_error(artifact, first))
     
     return errors
 
 
 def verify_chain(
-    artifacts: list[dict],
+    artifacts: list,
     skip_hash_verify: bool = False
 ) -> dict:
     """
     Verify complete artifact chain integrity.
     
+    artifacts may be parsed artifact dicts (with _source_path) or
+    LineageRecords. Dicts are reduced to records first, verifying their
+    hashes unless skip_hash_verify. Records cannot be re-hashed, so for
+    them hash errors are those found when they were loaded (see
+    load_artifacts).
+    
     Returns result dict with:
         - passed: bool
         - artifacts_checked: int
         - errors: list[dict]
         - warnings: list[dict]
     """
+    with get_profiler().stage("chain"):
+        return _verify_chain(artifacts, skip_hash_verify)
+
+
+def _verify_chain(artifacts: list, skip_hash_verify: bool) -> dict:
+    records = [
+        artifact if isinstance(artifact, LineageRecord)
+        else lineage_record(artifact, not skip_hash_verify)
+        for artifact in artifacts
+    ]
+    
     result = {
         "linter": "verify_lineage",
         "passed": True,
-        "artifacts_checked": len(artifacts),
+        "artifacts_checked": len(records),
         "errors": [],
         "warnings": [],
     }
     
-    # Build index
-    artifact_index = build_artifact_index(artifacts)
-    
-    # Check each artifact
-    for artifact in artifacts:
+    graph = LineageGraph(records)
+    cycle_entries = graph.cycle_entries()
+    duplicates = graph.duplicates()
+    cycle_errors = []
+    duplicate_errors = []
+    
+    # One pass: every check for an artifact is made when it is visited
+    for record in records:
+        if record.id:
+            definitions = duplicates.get(record.id)
+            if definitions and definitions[0] is not record:
+                duplicate_errors.append(duplicate_error(record, definitions[0]))
+            
+            involving = cycle_entries[record.id]
+            if involving:
+                cycle_errors.append(cycle_error(record, involving))
+        
         # Skip documentation logs (no lineage chain)
-        if "documentation_log" in artifact:
+        if record.is_log:
             continue
         
-        # Verify own hash
-        if not skip_hash_verify:
-            hash_errors = verify_artifact_hash(artifact)
-            result["errors"].extend(hash_errors)
+        # Own hash, verified when the record was made
+        if not skip_hash_verify and record.hash_errors:
+            result["errors"].extend(record.hash_errors)
         
         # Verify upstream reference
-        upstream_errors = verify_upstream_reference(artifact, artifact_index)
-        result["errors"].extend(upstream_errors)
+        result["errors"].extend(verify_upstream_reference(record, graph.index))
     
-    # Check for cycles
-    cycle_errors = detect_cycles(artifacts, artifact_index)
     result["errors"].extend(cycle_errors)
+    result["errors"].extend(duplicate_errors)
     
     if result["errors"]:
         result["passed"] = False
@@ -370,6 +462,7 @@ def main() -> int:
         action="store_true",
         help="Output results as JSON",
     )
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
@@ -380,15 +473,18 @@ def main() -> int:
             return EXIT_USAGE_ERROR
     
     try:
-        artifacts = load_artifacts(args.paths, args.recursive)
+        profiler = start_profiling(args)
+        artifacts = load_artifacts(args.paths, args.recursive, verify_hashes=not args.skip_hash)
         
         if not artifacts:
+            finish_profiling(profiler, "verify_lineage", args)
             print("No artifacts found to verify.")
             return EXIT_SUCCESS
         
         result = verify_chain(artifacts, skip_hash_verify=args.skip_hash)
+        finish_profiling(profiler, "verify_lineage", args)
         return print_results(result, args.json)
-        
+    
     except Exception as e:
         print(f"Internal error: {e}", file=sys.stderr)
         import traceback
@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+"""
+Cheddar Signature Verification
+
+Verifies the signatures behind lineage.signed_by claims.
+Enforces: INV-023 (Artifacts with signed_by claims MUST have verifiable signatures)
+
+An artifact that names a signer carries the signature in its lineage block:
+
+    lineage:
+      hash: "sha256:..."
+      signed_by: "vp_of_engineering"
+      timestamp: "2026-01-06T01:00:00Z"
+      signature:
+        algorithm: "ed25519"
+        key_id: "vpe-2026"
+        value: "<base64 Ed25519 signature of the UTF-8 content hash>"
+
+The signed message is the artifact's content hash as compute_hash.py
+computes it ("sha256:<hex>"), so it covers signed_by and timestamp too;
+lineage.signature itself is left out of that hash. Keys come from a
+keyring file (default: roles/keyring.yaml):
+
+    keyring:
+      - key_id: "vpe-2026"
+        identity: "vp_of_engineering"       # The signed_by it may sign as
+        algorithm: "ed25519"
+        public_key: "<base64 raw 32-byte public key>"
+        not_before: "2026-01-01T00:00:00Z"  # Optional
+        not_after: "2027-01-01T00:00:00Z"   # Optional; set when rotating the key out
+        revoked: false                      # Optional
+
+A claim is accepted when the signature's key is in the keyring, belongs
+to signed_by, is not revoked and was valid at lineage.timestamp, and the
+signature verifies against the content hash. When a role catalog exists
+(roles/catalog, see role_resolver.py), signed_by must also hold signing
+authority over the artifact's type, directly or by delegation.
+
+Only the signature check is cryptographic. Successful verifications are cached
+in .cheddar/cache/signatures.sqlite under (content hash, key id), with the
+signature value and a fingerprint of the key's keyring entry. An unchanged
+artifact therefore skips the cryptography on later runs. Revoking,
+rotating or replacing a key changes its fingerprint and drops its cached
+results. The keyring and authority checks run on every run, so a revocation
+takes effect at once. Cache misses are verified in chunks across a process pool.
+
+Verifying needs the `cryptography` package
+(`pip install -e .[signatures]`); it is only imported when a
+signature is not in the cache.
+
+Usage:
+    python verify_signature.py <directory> --recursive
+    python verify_signature.py <directory> -r --keyring keys.yaml --json
+    python verify_signature.py <directory> -r --roles path/to/catalog
+    python run_all.py <directory> -r --signatures   # With the other checks
+
+Exit codes:
+    0 - All signature claims verified
+    1 - Signature errors found
+    2 - Usage/configuration error (invalid keyring, cryptography missing)
+    3 - Internal error
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+from artifact_fields import LEVEL_TYPES, parse_datetime
+from compute_hash import compute_hash
+from corpus import ArtifactCorpus
+from loader import load_yaml_file
+from parallel import default_jobs, map_chunked, use_pool
+from profiler import add_profile_arguments, finish_profiling, get_profiler, start_profiling
+from role_resolver import RoleCatalogError, RoleResolver, find_catalog_dir
+from schema_registry import find_cache_dir
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_SIGNATURE_ERROR = 1
+EXIT_USAGE_ERROR = 2
+EXIT_INTERNAL_ERROR = 3
+
+SIGNATURE_CACHE_NAME = "signatures.sqlite"
+
+SUPPORTED_ALGORITHMS = frozenset({"ed25519"})
+
+ED25519_KEY_BYTES = 32
+
+CACHE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS verified (
+    artifact_hash TEXT NOT NULL,
+    key_id TEXT NOT NULL,
+    key_fingerprint TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    PRIMARY KEY (artifact_hash, key_id)
+);
+"""
+
+
+class SignatureConfigError(Exception):
+    """The keyring is invalid, or no signature backend is installed."""
+
+
+def find_keyring_path() -> Path:
+    """Locate the default keyring (roles/keyring.yaml at repo root)."""
+    return Path(__file__).parent.parent / "roles" / "keyring.yaml"
+
+
+class KeyringKey:
+    """One public key of the keyring and the identity it signs for."""
+    
+    __slots__ = (
+        "key_id", "identity", "algorithm", "public_key",
+        "not_before", "not_after", "revoked", "fingerprint",
+    )
+    
+    def __init__(self, entry: dict):
+        for field in ("key_id", "identity", "algorithm", "public_key"):
+            if not isinstance(entry.get(field), str) or not entry[field]:
+                raise SignatureConfigError(f"Keyring entry missing {field}: {entry!r}")
+        
+        self.key_id = entry["key_id"]
+        self.identity = entry["identity"]
+        self.algorithm = entry["algorithm"]
+        if self.algorithm not in SUPPORTED_ALGORITHMS:
+            raise SignatureConfigError(f"Key {self.key_id}: unsupported algorithm {self.algorithm}")
+        try:
+            self.public_key = base64.b64decode(entry["public_key"], validate=True)
+        except binascii.Error:
+            raise SignatureConfigError(f"Key {self.key_id}: public_key is not base64") from None
+        if len(self.public_key) != ED25519_KEY_BYTES:
+            raise SignatureConfigError(
+                f"Key {self.key_id}: public_key must be {ED25519_KEY_BYTES} bytes"
+            )
+        
+        self.not_before = self.not_after = None
+        for field in ("not_before", "not_after"):
+            if entry.get(field) is not None:
+                parsed = parse_datetime(entry[field])
+                if parsed is None:
+                    raise SignatureConfigError(f"Key {self.key_id}: invalid {field}")
+                setattr(self, field, parsed)
+        self.revoked = bool(entry.get("revoked", False))
+        
+        # Any change to the entry (revocation, rotation window, new key
+        # material) changes the fingerprint and invalidates cached results
+        canonical = json.dumps(
+            [self.key_id, self.identity, self.algorithm, entry["public_key"],
+             str(self.not_before), str(self.not_after), self.revoked],
+        )
+        self.fingerprint = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def valid_at(self, when: datetime) -> bool:
+        """Whether the key's validity window includes when."""
+        if self.not_before is not None and when < self.not_before:
+            return False
+        if self.not_after is not None and when > self.not_after:
+            return False
+        return True
+
+
+def load_keyring(path: Path) -> dict[str, KeyringKey]:
+    """Load a keyring file; returns {key_id: key}. Raises SignatureConfigError."""
+    try:
+        document = load_yaml_file(path)
+    except OSError as e:
+        raise SignatureConfigError(f"Cannot read keyring {path}: {e}") from None
+    except yaml.YAMLError as e:
+        raise SignatureConfigError(f"Invalid keyring {path}: {e}") from None
+    
+    entries = document.get("keyring") if isinstance(document, dict) else None
+    if not isinstance(entries, list):
+        raise SignatureConfigError(f"Keyring {path} must hold a 'keyring' list")
+    
+    keys = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise SignatureConfigError(f"Keyring entry must be a mapping: {entry!r}")
+        key = KeyringKey(entry)
+        if key.key_id in keys:
+            raise SignatureConfigError(f"Duplicate key_id in keyring: {key.key_id}")
+        keys[key.key_id] = key
+    return keys
+
+
+class SignatureCache:
+    """
+    Persistent record of signatures that verified.
+    
+    Only successes are stored: a failure is re-checked on every run, so
+    fixing a signature or the keyring needs no cache invalidation.
+    """
+    
+    def __init__(self, db_path: Optional[Path]):
+        self.conn = sqlite3.connect(":memory:" if db_path is None else str(db_path))
+        self.conn.executescript(CACHE_SCHEMA_SQL)
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def open(cls, cache_dir: Optional[Path]) -> "SignatureCache":
+        """The cache in cache_dir, or an in-memory one if cache_dir is None."""
+        if cache_dir is None:
+            return cls(None)
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        return cls(Path(cache_dir) / SIGNATURE_CACHE_NAME)
+    
+    def close(self) -> None:
+        self.conn.close()
+    
+    def prune(self, keyring: dict[str, KeyringKey]) -> int:
+        """Drop results of keys removed from, revoked in or changed in the keyring."""
+        current = {
+            (key.key_id, key.fingerprint) for key in keyring.values() if not key.revoked
+        }
+        stale = [
+            row
+            for row in self.conn.execute("SELECT DISTINCT key_id, key_fingerprint FROM verified")
+            if row not in current
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM verified WHERE key_id = ? AND key_fingerprint = ?", stale
+            )
+        return len(stale)
+    
+    def lookup(self, artifact_hash: str, key: KeyringKey, signature: str) -> bool:
+        """Whether this exact signature was verified with this version of key."""
+        row = self.conn.execute(
+            "SELECT key_fingerprint, signature FROM verified "
+            "WHERE artifact_hash = ? AND key_id = ?",
+            (artifact_hash, key.key_id),
+        ).fetchone()
+        hit = row == (key.fingerprint, signature)
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return hit
+    
+    def store(self, verified: list[tuple[str, KeyringKey, str]]) -> None:
+        """Record (artifact hash, key, signature) triples that verified."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO verified VALUES (?, ?, ?, ?)",
+                [(h, key.key_id, key.fingerprint, signature) for h, key, signature in verified],
+            )
+
+
+def verify_ed25519(public_key: bytes, signature: str, message: str) -> bool:
+    """Check one base64 Ed25519 signature of message; raises SignatureConfigError."""
+    try:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+    except ImportError:
+        raise SignatureConfigError(
+            "Signature verification needs the cryptography package "
+            "(pip install -e .[signatures])"
+        ) from None
+    
+    try:
+        raw = base64.b64decode(signature, validate=True)
+        Ed25519PublicKey.from_public_bytes(public_key).verify(raw, message.encode("utf-8"))
+    except (binascii.Error, InvalidSignature, ValueError):
+        return False
+    return True
+
+
+def _verify_chunk(items: list[tuple[bytes, str, str]]) -> list[bool]:
+    """Pool task: verify a chunk of (public key, signature, message) triples."""
+    return [verify_ed25519(*item) for item in items]
+
+
+def signature_error(claim: dict, message: str) -> dict:
+    """Error dict for a failed signature claim."""
+    return {
+        "invariant": "INV-023",
+        "artifact": claim["artifact"],
+        "file": claim["file"],
+        "message": message,
+    }
+
+
+def signature_claim(artifact: object, path: str) -> Optional[dict]:
+    """
+    The signed_by claim of a parsed artifact, or None if it makes none.
+    
+    The content hash is computed here, while the document is loaded.
+    """
+    if not isinstance(artifact, dict):
+        return None
+    lineage = artifact.get("lineage")
+    if not isinstance(lineage, dict) or lineage.get("signed_by") is None:
+        return None
+    level = artifact.get("level")
+    return {
+        "artifact": artifact.get("id"),
+        "file": path,
+        "artifact_type": LEVEL_TYPES.get(level, level),
+        "signed_by": lineage["signed_by"],
+        "timestamp": lineage.get("timestamp"),
+        "signature": lineage.get("signature"),
+        "hash": compute_hash(artifact),
+    }
+
+
+def check_claim(
+    claim: dict,
+    keyring: dict[str, KeyringKey],
+    resolver: Optional[RoleResolver] = None
+) -> tuple[Optional[str], Optional[KeyringKey]]:
+    """
+    The keyring and authority checks of one claim, without cryptography.
+    
+    Returns (error message, None) or (None, the key to verify with).
+    """
+    signature = claim["signature"]
+    if not isinstance(signature, dict):
+        return f"signed_by {claim['signed_by']} but no lineage.signature", None
+    
+    key = keyring.get(signature.get("key_id"))
+    if key is None:
+        return f"Signing key not in keyring: {signature.get('key_id')}", None
+    algorithm = signature.get("algorithm")
+    if algorithm != key.algorithm:
+        return f"Signature algorithm {algorithm} does not match key {key.key_id}", None
+    signer = claim["signed_by"]
+    if key.identity != signer:
+        return f"Key {key.key_id} belongs to {key.identity}, not signed_by {signer}", None
+    if key.revoked:
+        return f"Signing key {key.key_id} is revoked", None
+    if resolver is not None and not resolver.authorised(claim["signed_by"], claim["artifact_type"]):
+        return f"{claim['signed_by']} has no signing authority over {claim['artifact_type']}", None
+    
+    signed_at = parse_datetime(claim["timestamp"])
+    if signed_at is None:
+        return "Signed artifact has no valid lineage.timestamp", None
+    if not key.valid_at(signed_at):
+        return f"Signing key {key.key_id} was not valid at {claim['timestamp']}", None
+    if not isinstance(signature.get("value"), str):
+        return "lineage.signature has no value", None
+    
+    return None, key
+
+
+def verify_claims(
+    claims: list[dict],
+    keyring: dict[str, KeyringKey],
+    cache: Optional[SignatureCache] = None,
+    jobs: int = 1,
+    resolver: Optional[RoleResolver] = None
+) -> dict:
+    """
+    Verify signature claims, skipping the cryptography for cached ones.
+    
+    With a resolver, signers must also hold authority over each type.
+    
+    Cache misses are verified together, in a process pool when there are
+    enough of them. Returns the result dict; raises SignatureConfigError
+    if a signature needs verifying and no backend is installed.
+    """
+    if cache is None:
+        cache = SignatureCache(None)
+    
+    result = {
+        "linter": "verify_signature",
+        "passed": True,
+        "artifacts_checked": len(claims),
+        "signatures_verified": 0,
+        "cache_hits": 0,
+        "errors": [],
+        "warnings": [],
+    }
+    
+    pending = []
+    for claim in claims:
+        error, key = check_claim(claim, keyring, resolver)
+        if error is not None:
+            result["errors"].append(signature_error(claim, error))
+        elif cache.lookup(claim["hash"], key, claim["signature"]["value"]):
+            result["cache_hits"] += 1
+        else:
+            pending.append((claim, key))
+    
+    with get_profiler().stage("signatures"):
+        items = [
+            (key.public_key, claim["signature"]["value"], claim["hash"]) for claim, key in pending
+        ]
+        if use_pool(len(items), jobs):
+            outcomes = map_chunked(_verify_chunk, items, jobs)
+        else:
+            outcomes = _verify_chunk(items)
+    
+    verified = []
+    for (claim, key), ok in zip(pending, outcomes):
+        if ok:
+            verified.append((claim["hash"], key, claim["signature"]["value"]))
+        else:
+            result["errors"].append(signature_error(
+                claim, f"Signature by {key.key_id} does not verify against the content hash"
+            ))
+    cache.store(verified)
+    result["signatures_verified"] = len(verified)
+    
+    if result["errors"]:
+        result["passed"] = False
+    
+    return result
+
+
+def corpus_claims(corpus: ArtifactCorpus) -> list[dict]:
+    """Signature claims of every chain artifact in a parsed corpus."""
+    claims = []
+    for entry in corpus:
+        if entry.in_chain:
+            claim = signature_claim(entry.artifact, str(entry.path))
+            if claim is not None:
+                claims.append(claim)
+    return claims
+
+
+def verify_signatures(
+    corpus: ArtifactCorpus,
+    keyring_path: Path,
+    cache_dir: Optional[Path] = None,
+    jobs: int = 1,
+    catalog_dir: Optional[Path] = None
+) -> dict:
+    """
+    Verify every signature claim in a corpus against the keyring at
+    keyring_path, with the cache in cache_dir (in memory if None), and
+    signing authority against the role catalog in catalog_dir, if given.
+    """
+    keyring = load_keyring(keyring_path)
+    resolver = None
+    if catalog_dir is not None:
+        try:
+            resolver = RoleResolver(catalog_dir)
+        except RoleCatalogError as e:
+            raise SignatureConfigError(str(e)) from None
+    cache = SignatureCache.open(cache_dir)
+    try:
+        cache.prune(keyring)
+        return verify_claims(corpus_claims(corpus), keyring, cache, jobs, resolver)
+    finally:
+        cache.close()
+
+
+def default_catalog_dir() -> Optional[Path]:
+    """The default role catalog, or None while the repository has none."""
+    catalog_dir = find_catalog_dir()
+    return catalog_dir if catalog_dir.is_dir() else None
+
+
+def print_results(result: dict, output_json: bool = False) -> int:
+    """
+    Print verification results.
+    
+    Returns appropriate exit code.
+    """
+    if output_json:
+        print(json.dumps(result, indent=2))
+    else:
+        summary = (
+            f"{result['artifacts_checked']} signed artifacts, "
+            f"{result['cache_hits']} from cache"
+        )
+        if result["passed"]:
+            print(f"✓ Signature verification passed ({summary})")
+        else:
+            print(f"✗ Signature verification failed ({summary})")
+            print()
+            
+            for error in result["errors"]:
+                print(f"  [{error['invariant']}] {error['artifact']}")
+                print(f"    File: {error['file']}")
+                print(f"    {error['message']}")
+                print()
+    
+    return EXIT_SUCCESS if result["passed"] else EXIT_SIGNATURE_ERROR
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Verify the signatures of Cheddar artifacts with signed_by claims (INV-023)."
+    )
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="+",
+        help="Artifact files or directories to verify",
+    )
+    parser.add_argument(
+        "--recursive", "-r",
+        action="store_true",
+        help="Recursively process directories",
+    )
+    parser.add_argument(
+        "--keyring",
+        type=Path,
+        default=find_keyring_path(),
+        help="Keyring of public keys (default: roles/keyring.yaml)",
+    )
+    parser.add_argument(
+        "--roles",
+        type=Path,
+        help="Role catalog for signing authority (default: roles/catalog, if it exists)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=(
+            "Do not read or write the verified-signature cache "
+            f"(.cheddar/cache/{SIGNATURE_CACHE_NAME})"
+        ),
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=default_jobs(),
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output results as JSON",
+    )
+    add_profile_arguments(parser)
+    
+    args = parser.parse_args()
+    
+    if args.jobs < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    for path in args.paths:
+        if not path.exists():
+            print(f"Error: Path not found: {path}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+    if args.roles is not None and not args.roles.is_dir():
+        print(f"Error: Role catalog not found: {args.roles}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    try:
+        profiler = start_profiling(args)
+        corpus = ArtifactCorpus.load(args.paths, args.recursive, args.jobs)
+        result = verify_signatures(
+            corpus,
+            args.keyring,
+            cache_dir=None if args.no_cache else find_cache_dir(),
+            jobs=args.jobs,
+            catalog_dir=args.roles or default_catalog_dir(),
+        )
+        finish_profiling(profiler, "verify_signature", args)
+        return print_results(result, args.json)
+    
+    except SignatureConfigError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    except Exception as e:
+        print(f"Internal error: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Cheddar Lint Watch Mode
+
+Resident lint process for people editing artifacts all day. It keeps the
+parsed corpus, compiled schemas and lineage index in memory, watches the
+tree for saves, and re-lints only what a save can affect:
+
+    - the saved (created, modified or deleted) files themselves,
+    - artifacts whose supports_upper_layer points at a changed id
+      (their INV-005 upstream check depends on the parent's lineage.hash),
+    - descendants of changed artifacts (their cycle check walks through
+      the changed edge).
+
+Only diagnostics that changed are printed, as they change. With --json each
+change is one JSON line.
+
+File events come from inotify on Linux; elsewhere (or if inotify cannot be
+set up) the tree is polled.
+
+Usage:
+    python run_all.py artifacts/ --recursive --watch
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Optional, TextIO
+
+from corpus import ArtifactCorpus, CorpusEntry, parse_file
+from schema_registry import SchemaRegistry, get_registry
+from validate_artifact import load_error_result, validate_loaded_artifact
+from verify_lineage import detect_cycles, duplicate_error, verify_upstream_reference
+
+# Saves usually arrive as several events (write, rename, chmod); wait this
+# long after the first one before re-linting
+DEBOUNCE_SECONDS = 0.02
+
+DEFAULT_POLL_INTERVAL = 0.25
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_lint_target(path: Path, roots: list[Path], recursive: bool) -> bool:
+    """Whether path would be discovered by a lint run over roots."""
+    if path.name.startswith("."):
+        return False
+    
+    path = Path(os.path.abspath(path))
+    for root in roots:
+        root = Path(os.path.abspath(root))
+        if path == root:
+            return True
+        if path.suffix != ".yaml":
+            continue
+        if path.parent == root or (recursive and root in path.parents):
+            return True
+    
+    return False
+
+
+class PollingWatcher:
+    """Detects changes by re-scanning file stats at a fixed interval."""
+    
+    def __init__(self, roots: list[Path], recursive: bool, interval: float = DEFAULT_POLL_INTERVAL):
+        self.roots = roots
+        self.recursive = recursive
+        self.interval = interval
+        self._snapshot = self._scan()
+    
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for file_path, _ in ArtifactCorpus.discover(self.roots, self.recursive):
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[os.path.abspath(file_path)] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+    
+    def wait(self) -> set[Path]:
+        """Block until at least one file changed; return the changed files."""
+        while True:
+            time.sleep(self.interval)
+            snapshot = self._scan()
+            changed = {
+                Path(key)
+                for key in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(key) != self._snapshot.get(key)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+    
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher over every directory that can hold targets."""
+    
+    def __init__(self, roots: list[Path], recursive: bool):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify not available")
+        
+        self.roots = roots
+        self.recursive = recursive
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        
+        self._dirs: dict[int, Path] = {}
+        for root in roots:
+            if root.is_dir():
+                self._add_tree(root)
+            else:
+                self._add_dir(root.parent)
+    
+    def _add_dir(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(str(directory)), WATCH_MASK
+        )
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._dirs[wd] = directory
+    
+    def _add_tree(self, directory: Path) -> None:
+        self._add_dir(directory)
+        if self.recursive:
+            for dirpath, dirnames, _ in os.walk(directory):
+                for name in dirnames:
+                    self._add_dir(Path(dirpath) / name)
+    
+    def _read_events(self) -> tuple[set[Path], bool]:
+        """Drain pending events; returns (changed paths, overflowed)."""
+        changed = set()
+        overflow = False
+        
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                
+                path = directory / os.fsdecode(name)
+                if mask & IN_ISDIR:
+                    if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                        self._add_tree(path)
+                        changed.update(p for p, _ in ArtifactCorpus.discover([path], True))
+                    continue
+                
+                changed.add(path)
+        
+        return changed, overflow
+    
+    def wait(self) -> set[Path]:
+        """Block until at least one file changed; return the changed files."""
+        while True:
+            select.select([self._fd], [], [])
+            time.sleep(DEBOUNCE_SECONDS)
+            changed, overflow = self._read_events()
+            
+            if overflow:
+                # Events were lost; report every current target as changed
+                changed.update(p for p, _ in ArtifactCorpus.discover(self.roots, self.recursive))
+            
+            changed = {p for p in changed if is_lint_target(p, self.roots, self.recursive)}
+            if changed:
+                return changed
+    
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def make_watcher(roots: list[Path], recursive: bool, poll_interval: Optional[float] = None):
+    """Use inotify when available (and no poll interval was requested)."""
+    if poll_interval is None and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots, recursive)
+        except OSError:
+            pass
+    return PollingWatcher(roots, recursive, poll_interval or DEFAULT_POLL_INTERVAL)
+
+
+class LintSession:
+    """
+    In-memory lint state that can be updated file by file.
+    
+    Holds every parsed entry, its validation result, the lineage index and
+    per-artifact chain errors, so a save only re-checks what it affects.
+    """
+    
+    def __init__(
+        self,
+        roots: list[Path],
+        recursive: bool = False,
+        registry: Optional[SchemaRegistry] = None
+    ):
+        self.roots = roots
+        self.recursive = recursive
+        self.registry = registry if registry is not None else get_registry()
+        self.registry.compile_all()
+        
+        self.entries: dict[str, CorpusEntry] = {}
+        self.results: dict[str, dict] = {}
+        self.artifacts: dict[str, dict] = {}
+        self.ids: dict[str, set[str]] = {}
+        self.children: dict[str, set[str]] = {}
+        self.index: dict[str, dict] = {}
+        self.upstream_errors: dict[str, list] = {}
+        self.cycle_errors: dict[str, list] = {}
+        self.duplicate_errors: dict[str, list] = {}
+        self.failing_keys: set[str] = set()
+    
+    def load(self) -> dict[str, dict]:
+        """Lint the whole tree; returns diagnostics for every file."""
+        corpus = ArtifactCorpus.load(self.roots, self.recursive)
+        for entry in corpus:
+            self._add(entry)
+        for artifact_id in self.ids:
+            self._resolve(artifact_id)
+        
+        for key in self.entries:
+            self._check_chain(key)
+        
+        diagnostics = {key: self.diagnostics(key) for key in self.entries}
+        self.failing_keys = {key for key, diag in diagnostics.items() if not diag["passed"]}
+        return diagnostics
+    
+    def update(self, changed: set[Path]) -> dict[str, Optional[dict]]:
+        """
+        Re-lint after changes to the given files.
+        
+        Returns the new diagnostics of every file whose diagnostics changed;
+        None marks a file that no longer exists.
+        """
+        keys = {os.path.abspath(path) for path in changed}
+        
+        # Parse first so both the old and the new ids are known up front
+        new_entries = {}
+        touched_ids = set()
+        for key in keys:
+            if key in self.artifacts:
+                touched_ids.add(self.artifacts[key].get("id"))
+            path = Path(key)
+            if path.exists() and is_lint_target(path, self.roots, self.recursive):
+                artifact, error, digest = parse_file(path)
+                explicit = any(Path(os.path.abspath(root)) == path for root in self.roots)
+                entry = CorpusEntry(path, artifact, error, explicit, digest)
+                new_entries[key] = entry
+                if entry.in_chain:
+                    touched_ids.add(entry.artifact.get("id"))
+        touched_ids.discard(None)
+        
+        # Children of a touched id re-run their upstream check; everything
+        # below one re-runs its cycle check; other files defining a touched
+        # id re-run their duplicate check
+        recheck = keys | self._descendants_of_ids(touched_ids)
+        for artifact_id in touched_ids:
+            recheck |= self.ids.get(artifact_id, set())
+        before = {key: self.diagnostics(key) for key in recheck if key in self.entries}
+        
+        for key in keys:
+            self._remove(key)
+            if key in new_entries:
+                self._add(new_entries[key])
+        for artifact_id in touched_ids:
+            self._resolve(artifact_id)
+        
+        updates = {}
+        for key in recheck:
+            if key not in self.entries:
+                self.failing_keys.discard(key)
+                if key in before:
+                    updates[key] = None
+                continue
+            
+            self._check_chain(key)
+            after = self.diagnostics(key)
+            if after["passed"]:
+                self.failing_keys.discard(key)
+            else:
+                self.failing_keys.add(key)
+            if before.get(key) != after:
+                updates[key] = after
+        
+        return updates
+    
+    def _add(self, entry: CorpusEntry) -> None:
+        key = os.path.abspath(entry.path)
+        self.entries[key] = entry
+        
+        if entry.error is not None:
+            self.results[key] = load_error_result(entry.path, entry.error)
+        else:
+            self.results[key] = validate_loaded_artifact(
+                entry.artifact, entry.path, registry=self.registry
+            )
+        
+        if entry.in_chain:
+            artifact = dict(entry.artifact)
+            artifact["_source_path"] = str(entry.path)
+            self.artifacts[key] = artifact
+            artifact_id = artifact.get("id")
+            if artifact_id:
+                self.ids.setdefault(artifact_id, set()).add(key)
+            parent_id = artifact.get("supports_upper_layer")
+            if parent_id:
+                self.children.setdefault(parent_id, set()).add(key)
+    
+    def _remove(self, key: str) -> None:
+        self.entries.pop(key, None)
+        self.results.pop(key, None)
+        self.upstream_errors.pop(key, None)
+        self.cycle_errors.pop(key, None)
+        self.duplicate_errors.pop(key, None)
+        
+        artifact = self.artifacts.pop(key, None)
+        if artifact is None:
+            return
+        artifact_id = artifact.get("id")
+        if artifact_id in self.ids:
+            self.ids[artifact_id].discard(key)
+            if not self.ids[artifact_id]:
+                del self.ids[artifact_id]
+        parent_id = artifact.get("supports_upper_layer")
+        if parent_id in self.children:
+            self.children[parent_id].discard(key)
+            if not self.children[parent_id]:
+                del self.children[parent_id]
+    
+    def _resolve(self, artifact_id: str) -> None:
+        """Point the index at the artifact defining artifact_id (last path wins)."""
+        keys = self.ids.get(artifact_id)
+        if keys:
+            self.index[artifact_id] = self.artifacts[max(keys)]
+        else:
+            self.index.pop(artifact_id, None)
+    
+    def _descendants_of_ids(self, artifact_ids: set[str]) -> set[str]:
+        """All artifacts below the given ids in the current graph."""
+        found = set()
+        stack = list(artifact_ids)
+        seen_ids = set()
+        while stack:
+            artifact_id = stack.pop()
+            if not artifact_id or artifact_id in seen_ids:
+                continue
+            seen_ids.add(artifact_id)
+            for child in self.children.get(artifact_id, ()):
+                found.add(child)
+                stack.append(self.artifacts[child].get("id"))
+        return found
+    
+    def _check_chain(self, key: str) -> None:
+        artifact = self.artifacts.get(key)
+        if artifact is None:
+            self.upstream_errors.pop(key, None)
+            self.cycle_errors.pop(key, None)
+            self.duplicate_errors.pop(key, None)
+            return
+        
+        if "documentation_log" in artifact:
+            self.upstream_errors[key] = []
+        else:
+            self.upstream_errors[key] = verify_upstream_reference(artifact, self.index)
+        self.cycle_errors[key] = detect_cycles([artifact], self.index)
+        
+        # As in a full run, every definition after the first (in path
+        # order) is a duplicate
+        defining = self.ids.get(artifact.get("id"), ())
+        first = min(defining) if defining else key
+        if first != key:
+            self.duplicate_errors[key] = [duplicate_error(artifact, self.artifacts[first])]
+        else:
+            self.duplicate_errors[key] = []
+    
+    def diagnostics(self, key: str) -> dict:
+        """Validation and chain errors for one file."""
+        result = self.results[key]
+        chain_errors = (
+            self.upstream_errors.get(key, [])
+            + self.cycle_errors.get(key, [])
+            + self.duplicate_errors.get(key, [])
+        )
+        return {
+            "file": result["file"],
+            "passed": result["passed"] and not chain_errors,
+            "errors": result["errors"],
+            "chain_errors": chain_errors,
+        }
+    
+    def failing(self) -> int:
+        """Number of files that currently have diagnostics."""
+        return len(self.failing_keys)
+
+
+def print_diagnostics(diag: dict, out: TextIO) -> None:
+    """Print one file's diagnostics in the lint text format."""
+    status = "✓" if diag["passed"] else "✗"
+    print(f"{status} {diag['file']}", file=out)
+    for error in diag["errors"]:
+        inv = f"[{error['invariant']}] " if error.get("invariant") else ""
+        print(f"  {inv}{error['field']}: {error['message']}", file=out)
+    for error in diag["chain_errors"]:
+        inv = f"[{error['invariant']}] " if error.get("invariant") else ""
+        print(f"  {inv}{error['artifact']}: {error['message']}", file=out)
+
+
+def emit(record: dict, output_json: bool, out: TextIO) -> None:
+    if output_json:
+        print(json.dumps(record), file=out)
+    elif record["event"] == "file":
+        print_diagnostics(record, out)
+    elif record["event"] == "removed":
+        print(f"- {record['file']} (removed)", file=out)
+    elif record["event"] == "status":
+        stamp = time.strftime("%H:%M:%S")
+        print(
+            f"[{stamp}] {record['changed']} file(s) re-linted in "
+            f"{record['elapsed_ms']:.1f} ms; {record['failing']}/{record['files']} failing",
+            file=out,
+        )
+    out.flush()
+
+
+def watch(
+    roots: list[Path],
+    recursive: bool = False,
+    registry: Optional[SchemaRegistry] = None,
+    output_json: bool = False,
+    poll_interval: Optional[float] = None,
+    out: TextIO = sys.stdout
+) -> int:
+    """Run until interrupted, streaming diagnostics as they change."""
+    session = LintSession(roots, recursive, registry)
+    
+    start = time.perf_counter()
+    initial = session.load()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    for key in sorted(initial):
+        if not initial[key]["passed"]:
+            emit({"event": "file", **initial[key]}, output_json, out)
+    emit({
+        "event": "status",
+        "changed": len(initial),
+        "files": len(session.entries),
+        "failing": session.failing(),
+        "elapsed_ms": elapsed_ms,
+    }, output_json, out)
+    
+    watcher = make_watcher(roots, recursive, poll_interval)
+    try:
+        while True:
+            changed = watcher.wait()
+            start = time.perf_counter()
+            updates = session.update(changed)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            
+            for key in sorted(updates):
+                diag = updates[key]
+                if diag is None:
+                    emit({"event": "removed", "file": key}, output_json, out)
+                else:
+                    emit({"event": "file", **diag}, output_json, out)
+            emit({
+                "event": "status",
+                "changed": len(changed),
+                "files": len(session.entries),
+                "failing": session.failing(),
+                "elapsed_ms": elapsed_ms,
+            }, output_json, out)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
@@ -0,0 +1,9 @@
+"""
+Cheddar Framework
+
+Accountability framework for AI-augmented organizations. The `cheddar`
+command (cheddar.cli) runs the lint tools in the repository's lint/
+directory.
+"""
+
+__version__ = "0.1.0-dev"
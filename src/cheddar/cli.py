@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Cheddar Command-Line Interface
+
+One `cheddar` entry point for the lint tools in the repository's lint/
+directory. Each subcommand runs one tool's main() with the remaining
+arguments, so `cheddar hash a.yaml --verify` behaves exactly like
+`python lint/compute_hash.py a.yaml --verify`.
+
+Start-up is kept small because pre-commit hooks run these commands many
+times per commit:
+
+    - this module imports only os and sys; the command table is plain
+      data, so `cheddar --help` and unknown commands import nothing else,
+    - a subcommand imports its own tool module only, and the lint modules
+      defer their heavy imports (jsonschema, concurrent.futures,
+      tracemalloc) until a run needs them, so `cheddar hash --verify`
+      never loads jsonschema.
+
+lint/bench_startup.py measures start-up time against a budget.
+
+The tools are run from the source tree, so install the package in
+development mode (`pip install -e .`).
+
+Usage:
+    cheddar validate artifacts/ -r
+    cheddar hash artifacts/brief.yaml --verify
+    cheddar verify-chain artifacts/ -r
+    cheddar lint artifacts/ -r --ndjson
+    cheddar serve artifacts/ -r
+    cheddar <command> --help
+
+Exit codes:
+    Those of the subcommand's tool, and:
+    2 - Unknown command or lint tools not found
+"""
+
+import os
+import sys
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_USAGE_ERROR = 2
+
+# Subcommand -> (lint module, one-line summary)
+COMMANDS = {
+    "validate": ("validate_artifact", "Validate artifacts against their JSON Schemas"),
+    "hash": ("compute_hash", "Compute, verify or update lineage hashes"),
+    "verify-chain": ("verify_lineage", "Verify lineage chain integrity"),
+    "signatures": ("verify_signature", "Verify signed_by signatures against the keyring"),
+    "lint": ("run_all", "Run every lint check"),
+    "log": ("validate_log", "Validate and seal hash-chained documentation logs"),
+    "freshness": ("check_freshness", "Report stale and soon-stale artifacts"),
+    "audit": ("audit_store", "Index and query AI session audit logs"),
+    "context": ("build_context_chain", "Build combined_context for briefs"),
+    "merkle": ("merkle", "Compute and compare Merkle subtree digests"),
+    "graph": ("intent_graph", "Query the intent graph"),
+    "policy": ("policy_engine", "Check actions against the governance policy"),
+    "roles": ("role_resolver", "Resolve signing authority from the role catalog"),
+    "serve": ("serve", "Serve validation to editors and hooks over a local socket"),
+    "gen-corpus": ("gen_corpus", "Generate a synthetic artifact corpus"),
+    "bench": ("bench", "Benchmark the lint tools"),
+    "bench-startup": ("bench_startup", "Benchmark CLI start-up time"),
+}
+
+
+def find_lint_dir() -> str:
+    """Locate the lint tools (lint/ at the root of this source tree)."""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(os.path.dirname(os.path.dirname(package_dir)), "lint")
+
+
+def print_usage(out: object = None) -> None:
+    """Print the command list."""
+    out = sys.stdout if out is None else out
+    print("usage: cheddar <command> [arguments]", file=out)
+    print(file=out)
+    print("commands:", file=out)
+    for name, (_, summary) in COMMANDS.items():
+        print(f"  {name:<14} {summary}", file=out)
+    print(file=out)
+    print("Run 'cheddar <command> --help' for a command's options.", file=out)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Main entry point."""
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage(sys.stdout if argv else sys.stderr)
+        return EXIT_SUCCESS if argv else EXIT_USAGE_ERROR
+    
+    if argv[0] == "--version":
+        from cheddar import __version__
+        print(f"cheddar {__version__}")
+        return EXIT_SUCCESS
+    
+    command = COMMANDS.get(argv[0])
+    if command is None:
+        print(f"Error: Unknown command: {argv[0]}", file=sys.stderr)
+        print_usage(sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    lint_dir = find_lint_dir()
+    if not os.path.isdir(lint_dir):
+        print(f"Error: Lint tools not found: {lint_dir}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+    
+    # The tools import each other as top-level modules, as when run as scripts
+    sys.path.insert(0, lint_dir)
+    module = __import__(command[0])
+    
+    # argparse takes its program name from argv[0]
+    sys.argv = [f"cheddar {argv[0]}"] + argv[1:]
+    return module.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
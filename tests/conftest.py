@@ -0,0 +1,55 @@
+"""Shared fixtures for the Cheddar test suite."""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+REPO_ROOT = Path(__file__).parent.parent
+LINT_DIR = REPO_ROOT / "lint"
+EXAMPLES_DIR = REPO_ROOT / "schemas" / "examples"
+
+# The lint tools are flat scripts that import each other by module name
+sys.path.insert(0, str(LINT_DIR))
+
+
+@pytest.fixture
+def mission_artifact():
+    path = EXAMPLES_DIR / "mission_definition.example.yaml"
+    return yaml.safe_load(path.read_text())
+
+
+@pytest.fixture
+def artifact_chain():
+    """Load complete artifact chain for integration tests."""
+    return {
+        "mission": yaml.safe_load((EXAMPLES_DIR / "mission_definition.example.yaml").read_text()),
+        "initiative": yaml.safe_load((EXAMPLES_DIR / "flow_initiative.example.yaml").read_text()),
+        "track": yaml.safe_load((EXAMPLES_DIR / "cheddar_track.example.yaml").read_text()),
+        "brief": yaml.safe_load((EXAMPLES_DIR / "automation_brief.example.yaml").read_text()),
+        "personal": yaml.safe_load((EXAMPLES_DIR / "personal_artifact.example.yaml").read_text()),
+    }
+
+
+@pytest.fixture
+def examples_tree(tmp_path):
+    """A writable copy of schemas/examples/."""
+    tree = tmp_path / "artifacts"
+    shutil.copytree(EXAMPLES_DIR, tree)
+    return tree
+
+
+@pytest.fixture
+def run_tool():
+    """Run a lint tool the way a user would; returns the CompletedProcess."""
+    def run(script: str, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, str(LINT_DIR / script), *args],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+        )
+    return run
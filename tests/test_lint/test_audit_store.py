@@ -0,0 +1,53 @@
+"""Tests for lint/audit_store.py."""
+
+import pytest
+
+from audit_store import AuditStore
+
+
+def session(session_id):
+    return {"ai_session": {"session_id": session_id, "timestamp_start": "2026-01-02T03:04:05Z"}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AuditStore(tmp_path / "ai_audit", tmp_path / "index.sqlite")
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("session_id", ["x/../../../escaped", "..", "a.b", "a\\b", ""])
+def test_unsafe_session_id_is_rejected(store, tmp_path, session_id):
+    with pytest.raises(ValueError):
+        store.record(session(session_id))
+    
+    assert list(tmp_path.rglob("*.yaml")) == []
+
+
+def test_recorded_sessions_survive_rebuild(store):
+    path = store.record(session("3f2a-session_1"))
+    
+    assert path.is_relative_to(store.sessions_dir)
+    assert store.rebuild()["sessions_indexed"] == 1
+    assert [row["session_id"] for row in store.query()] == ["3f2a-session_1"]
+
+
+def test_roots_sharing_an_index_stay_separate(tmp_path):
+    index = tmp_path / "index.sqlite"
+    store_a = AuditStore(tmp_path / "a", index)
+    store_b = AuditStore(tmp_path / "b", index)
+    try:
+        for store, session_id in ((store_a, "aaa"), (store_b, "bbb")):
+            written = session(session_id)
+            written["ai_session"]["actions"] = [{"type": "write", "artifact": "brief_x_v1"}]
+            store.record(written)
+        
+        found = store_b.query(artifact="brief_x_v1", action="write")
+        assert [row["session_id"] for row in found] == ["bbb"]
+        
+        assert store_b.rebuild()["sessions_indexed"] == 1
+        assert [row["session_id"] for row in store_a.query()] == ["aaa"]
+        assert [row["session_id"] for row in store_a.query(artifact="brief_x_v1")] == ["aaa"]
+    finally:
+        store_a.close()
+        store_b.close()
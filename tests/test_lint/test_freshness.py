@@ -0,0 +1,31 @@
+"""Tests for lint/check_freshness.py."""
+
+from check_freshness import FreshnessIndex
+
+
+def indexed_paths(index):
+    return {row[0] for row in index.conn.execute("SELECT path FROM items")}
+
+
+def test_single_file_refresh_keeps_other_rows(examples_tree):
+    index = FreshnessIndex(":memory:")
+    index.refresh([examples_tree], recursive=True)
+    before = indexed_paths(index)
+    
+    index.refresh([examples_tree / "mission_definition.example.yaml"])
+    stats = index.refresh([examples_tree], recursive=True)
+    
+    assert indexed_paths(index) == before
+    assert stats == {"files_total": len(before), "files_reindexed": 0}
+
+
+def test_deleted_file_is_dropped(examples_tree):
+    index = FreshnessIndex(":memory:")
+    index.refresh([examples_tree], recursive=True)
+    deleted = examples_tree / "cheddar_track.example.yaml"
+    deleted.unlink()
+    
+    index.refresh([examples_tree], recursive=True)
+    
+    assert str(deleted) not in indexed_paths(index)
+    assert len(indexed_paths(index)) == 5
@@ -0,0 +1,70 @@
+"""Tests for lint/compute_hash.py."""
+
+import copy
+import hashlib
+import json
+
+import pytest
+import yaml
+
+from compute_hash import compute_hash
+from conftest import EXAMPLES_DIR
+from verify_lineage import load_artifact, verify_artifact_hash
+
+
+def baseline_hash(artifact):
+    """The original deep-copy-and-dumps encoder that stored hashes were made with."""
+    content = copy.deepcopy(artifact)
+    for lineage in (content.get("lineage"), content.get("documentation_log", {}).get("lineage")):
+        if isinstance(lineage, dict):
+            lineage.pop("hash", None)
+            lineage.pop("signature", None)
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@pytest.mark.parametrize("path", sorted(EXAMPLES_DIR.glob("*.yaml")), ids=lambda path: path.name)
+def test_examples_hash_like_baseline(path):
+    artifact = yaml.safe_load(path.read_text())
+    
+    assert compute_hash(artifact) == baseline_hash(artifact)
+
+
+@pytest.mark.parametrize("artifact", [
+    {},
+    {"id": "x_v1", "lineage": {"hash": "sha256:old", "upstream_hash": None}},
+    {"id": "é_v1", "title": "naïve ✓   \"quoted\"", "nested": {"b": [1, 2.5, True, None]}},
+    {"level": "mission", "empty": {}, "none": [], "deep": {"a": {"b": {"c": [{"z": 1, "a": 2}]}}}},
+    {"numbers": {1: "one", 2: "two"}, "floats": [1e300, -0.0, 0.1]},
+    {"documentation_log": {"artifact_ref": "x_v1", "lineage": {"hash": "h", "signature": {}}}},
+    {"items": [{"text": "x" * 1000, "n": n} for n in range(200)]},
+    {"id": "x_v1", "_note": "underscore keys are content too"},
+], ids=["empty", "lineage", "unicode", "deep", "non-string-keys", "log", "large", "underscore"])
+def test_digest_matches_baseline_encoder(artifact):
+    assert compute_hash(artifact) == baseline_hash(artifact)
+
+
+def test_hash_and_signature_are_excluded(mission_artifact):
+    before = compute_hash(mission_artifact)
+    mission_artifact["lineage"]["hash"] = "sha256:new"
+    mission_artifact["lineage"]["signature"] = {"key_id": "k", "value": "v"}
+    
+    assert compute_hash(mission_artifact) == before
+
+
+def test_artifact_is_not_modified(mission_artifact):
+    original = copy.deepcopy(mission_artifact)
+    compute_hash(mission_artifact)
+    
+    assert mission_artifact == original
+
+
+def test_loaded_artifact_verifies_against_its_stored_hash(mission_artifact, tmp_path):
+    mission_artifact["lineage"]["hash"] = compute_hash(mission_artifact)
+    path = tmp_path / "mission.yaml"
+    path.write_text(yaml.safe_dump(mission_artifact))
+    
+    artifact = load_artifact(path)
+    
+    assert artifact["_source_path"] == str(path)
+    assert verify_artifact_hash(artifact) == []
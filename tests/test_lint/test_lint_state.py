@@ -0,0 +1,66 @@
+"""Tests for lint/lint_state.py (run_all.py --incremental)."""
+
+import yaml
+
+import lint_state
+from lint_state import LintState
+
+
+def run(state_path, tree):
+    state = LintState(state_path)
+    try:
+        return state.run([tree], recursive=True)
+    finally:
+        state.close()
+
+
+def invariants(results, name):
+    [result] = [r for r in results if r["file"].endswith(name)]
+    return [error["invariant"] for error in result["errors"]]
+
+
+def test_unchanged_tree_is_not_revalidated(examples_tree, tmp_path):
+    state_path = tmp_path / "state.sqlite"
+    first, first_chain, first_stats = run(state_path, examples_tree)
+    second, second_chain, second_stats = run(state_path, examples_tree)
+    
+    assert first_stats["files_revalidated"] == first_stats["files_total"]
+    assert second_stats["files_revalidated"] == 0
+    assert second == first
+    assert second_chain == first_chain
+
+
+def test_changed_file_is_revalidated(examples_tree, tmp_path):
+    state_path = tmp_path / "state.sqlite"
+    run(state_path, examples_tree)
+    brief_path = examples_tree / "automation_brief.example.yaml"
+    brief = yaml.safe_load(brief_path.read_text())
+    del brief["owner"]
+    brief_path.write_text(yaml.safe_dump(brief, sort_keys=False))
+    
+    results, _, stats = run(state_path, examples_tree)
+    
+    assert stats["files_revalidated"] == 1
+    assert "INV-020" in invariants(results, "automation_brief.example.yaml")
+
+
+def test_rule_change_invalidates_state(examples_tree, tmp_path, monkeypatch):
+    state_path = tmp_path / "state.sqlite"
+    with monkeypatch.context() as patch:
+        patch.setattr(lint_state, "rules_fingerprint", lambda: "older-rules")
+        run(state_path, examples_tree)
+    
+    _, _, stats = run(state_path, examples_tree)
+    
+    assert stats["files_revalidated"] == stats["files_total"]
+
+
+def test_rules_version_invalidates_state(examples_tree, tmp_path, monkeypatch):
+    state_path = tmp_path / "state.sqlite"
+    with monkeypatch.context() as patch:
+        patch.setattr(lint_state, "RULES_VERSION", lint_state.RULES_VERSION - 1)
+        run(state_path, examples_tree)
+    
+    _, _, stats = run(state_path, examples_tree)
+    
+    assert stats["files_revalidated"] == stats["files_total"]
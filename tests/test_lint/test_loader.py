@@ -0,0 +1,39 @@
+"""Tests for lint/loader.py."""
+
+from loader import ParseCache, content_digest
+
+
+def cache_file(cache, path, document):
+    data = path.read_bytes()
+    cache.store(path, len(data), path.stat().st_mtime_ns, content_digest(data), document)
+    return len(data), content_digest(data)
+
+
+def test_cached_document_is_reused_after_save(tmp_path):
+    path = tmp_path / "a.yaml"
+    path.write_text("id: a_v1\n")
+    cache = ParseCache(tmp_path / "cache")
+    size, digest = cache_file(cache, path, {"id": "a_v1"})
+    cache.save()
+    
+    assert ParseCache(tmp_path / "cache").lookup(path, size, digest) == (True, {"id": "a_v1"})
+
+
+def test_entries_of_deleted_files_are_dropped_on_save(tmp_path):
+    kept = tmp_path / "kept.yaml"
+    renamed = tmp_path / "old.yaml"
+    kept.write_text("id: kept_v1\n")
+    renamed.write_text("id: old_v1\n")
+    cache = ParseCache(tmp_path / "cache")
+    kept_size, kept_digest = cache_file(cache, kept, {"id": "kept_v1"})
+    size, digest = cache_file(cache, renamed, {"id": "old_v1"})
+    cache.save()
+    
+    renamed.rename(tmp_path / "new.yaml")
+    cache = ParseCache(tmp_path / "cache")
+    cache_file(cache, tmp_path / "new.yaml", {"id": "old_v1"})
+    cache.save()
+    
+    reloaded = ParseCache(tmp_path / "cache")
+    assert reloaded.lookup(renamed, size, digest) == (False, None)
+    assert reloaded.lookup(kept, kept_size, kept_digest) == (True, {"id": "kept_v1"})
@@ -0,0 +1,70 @@
+"""Tests for lint/merkle.py."""
+
+import json
+
+import yaml
+
+import merkle
+from corpus import ArtifactCorpus
+from merkle import MerkleIndex
+
+
+def load_artifacts(tree):
+    return ArtifactCorpus.load([tree], recursive=True).lineage_artifacts()
+
+
+def set_hash(path, value):
+    artifact = yaml.safe_load(path.read_text())
+    artifact["lineage"]["hash"] = value
+    path.write_text(yaml.safe_dump(artifact, sort_keys=False))
+
+
+def test_refresh_matches_fresh_build(examples_tree):
+    index = MerkleIndex.build(load_artifacts(examples_tree))
+    set_hash(examples_tree / "cheddar_track.example.yaml", "sha256:" + "0" * 64)
+    
+    artifacts = load_artifacts(examples_tree)
+    touched = index.refresh(artifacts)
+    
+    assert touched == {"track_classifier_threshold_drift_v1"}
+    assert index.to_dict() == MerkleIndex.build(artifacts).to_dict()
+
+
+def test_saved_index_round_trips(examples_tree, tmp_path):
+    index = MerkleIndex.build(load_artifacts(examples_tree))
+    index.save(tmp_path / "merkle.json")
+    
+    loaded = MerkleIndex.load(tmp_path / "merkle.json")
+    
+    assert loaded.to_dict() == index.to_dict()
+    assert loaded.diff(index) == {"added": [], "removed": [], "changed": []}
+
+
+def test_second_run_refreshes_saved_index(examples_tree, tmp_path, run_tool):
+    index_path = tmp_path / "cache" / "merkle.json"
+    args = ("merkle.py", str(examples_tree), "-r", "--index", str(index_path), "--json")
+    
+    first = run_tool(*args)
+    assert first.returncode == 0, first.stderr
+    set_hash(examples_tree / "mission_definition.example.yaml", "sha256:" + "1" * 64)
+    second = run_tool(*args)
+    
+    assert second.returncode == 0, second.stderr
+    assert json.loads(second.stdout)["refreshed"] == ["mission_example_v1"]
+    assert json.loads(second.stdout)["root"] != json.loads(first.stdout)["root"]
+
+
+def test_second_run_with_default_index(examples_tree, tmp_path, monkeypatch, capsys):
+    """Without --index the index is saved in (and refreshed from) the cache dir."""
+    monkeypatch.setattr(merkle, "find_cache_dir", lambda: tmp_path / "cache")
+    monkeypatch.setattr("sys.argv", ["merkle.py", str(examples_tree), "-r", "--json"])
+    
+    assert merkle.main() == 0
+    first = json.loads(capsys.readouterr().out)
+    set_hash(examples_tree / "mission_definition.example.yaml", "sha256:" + "1" * 64)
+    assert merkle.main() == 0
+    second = json.loads(capsys.readouterr().out)
+    
+    assert (tmp_path / "cache" / merkle.MERKLE_INDEX_NAME).exists()
+    assert second["refreshed"] == ["mission_example_v1"]
+    assert second["root"] != first["root"]
@@ -0,0 +1,124 @@
+"""Tests for lint/policy_engine.py (INV-021, INV-022)."""
+
+import os
+
+import pytest
+import yaml
+
+from policy_engine import ALLOW, DENY, REQUIRE_APPROVAL, PolicyEngine, PolicyError
+
+
+def write_policy(path, autonomous=(), prohibited=(), signatures=None):
+    policy = {"ai_constraints": {
+        "autonomous_actions": list(autonomous),
+        "prohibited_actions": list(prohibited),
+    }}
+    if signatures is not None:
+        policy["signatures"] = signatures
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump({"policy": policy}))
+
+
+@pytest.fixture
+def policy_path(tmp_path):
+    return tmp_path / "governance" / "policy.yaml"
+
+
+def engine(policy_path):
+    return PolicyEngine(policy_path, reload_interval=None)
+
+
+@pytest.mark.parametrize("autonomous, prohibited, artifact_type, expected", [
+    # Same key: deny wins
+    (["modify_lineage"], ["modify_lineage"], "cheddar_track", DENY),
+    # Denied for every type, allowed on one type: still denied there
+    ([{"action": "modify_lineage", "artifact_types": ["cheddar_track"]}],
+     ["modify_lineage"], "cheddar_track", DENY),
+    # Denied on one type only: other types keep the allow
+    (["modify_lineage"], [{"action": "modify_lineage", "artifact_types": ["cheddar_track"]}],
+     "automation_brief", ALLOW),
+    (["modify_lineage"], [{"action": "modify_lineage", "artifact_types": ["cheddar_track"]}],
+     "cheddar_track", DENY),
+    # Type-specific allow does not leak to other types
+    ([{"action": "modify_lineage", "artifact_types": ["automation_brief"]}], [],
+     "cheddar_track", REQUIRE_APPROVAL),
+    ([], [], "cheddar_track", REQUIRE_APPROVAL),
+], ids=["same-key", "any-type-deny", "other-type", "typed-deny", "typed-allow", "no-rule"])
+def test_ai_decisions(policy_path, autonomous, prohibited, artifact_type, expected):
+    write_policy(policy_path, autonomous, prohibited)
+    
+    assert engine(policy_path).decide("ai", "modify_lineage", artifact_type).decision == expected
+
+
+def test_deny_in_module_overrides_allow_in_main_policy(policy_path):
+    write_policy(policy_path, autonomous=["modify_lineage"])
+    write_policy(policy_path.parent / "policies" / "ai.yaml", prohibited=["modify_lineage"])
+    
+    decision = engine(policy_path).decide("ai", "modify_lineage", "cheddar_track")
+    
+    assert decision.decision == DENY
+    assert decision.rule == "ai_constraints.prohibited_actions.modify_lineage"
+    assert decision.source == os.path.join("policies", "ai.yaml")
+
+
+@pytest.mark.parametrize("autonomous", [
+    [],
+    ["deploy_to_production"],
+    [{"action": "deploy_to_production", "artifact_types": ["automation_brief"]}],
+], ids=["no-rule", "allowed", "allowed-on-type"])
+@pytest.mark.parametrize("artifact_type", ["*", "automation_brief", "cheddar_track"])
+def test_ai_never_deploys_to_production(policy_path, autonomous, artifact_type):
+    write_policy(policy_path, autonomous=autonomous)
+    
+    decision = engine(policy_path).decide("ai", "deploy_to_production", artifact_type)
+    
+    assert decision.decision == DENY
+    assert decision.rule == "INV-021"
+
+
+def test_ai_never_deploys_to_production_without_policy(policy_path):
+    assert engine(policy_path).decide("ai", "deploy_to_production").decision == DENY
+
+
+@pytest.mark.parametrize("action, artifact_type, role, expected", [
+    ("sign", "mission_definition", "board_of_directors", ALLOW),
+    ("approve", "mission_definition", "board_of_directors", ALLOW),
+    ("sign", "mission_definition", "ceo", DENY),
+    ("sign", "mission_definition", None, DENY),
+    ("sign", "automation_brief", None, ALLOW),
+    ("modify", "mission_definition", None, ALLOW),
+])
+def test_required_roles_gate_signing(policy_path, action, artifact_type, role, expected):
+    signatures = {"mission_definition": {"required_roles": ["board_of_directors"]}}
+    write_policy(policy_path, signatures=signatures)
+    
+    assert engine(policy_path).decide("human", action, artifact_type, role).decision == expected
+
+
+def test_signatures_rule_defined_twice_is_rejected(policy_path):
+    signatures = {"mission_definition": {"required_roles": ["ceo"]}}
+    write_policy(policy_path, signatures=signatures)
+    write_policy(policy_path.parent / "policies" / "roles.yaml", signatures=signatures)
+    
+    with pytest.raises(PolicyError):
+        engine(policy_path)
+
+
+def test_hot_reload_keeps_last_good_policy(policy_path):
+    write_policy(policy_path, autonomous=["suggest_tests"])
+    policy_engine = engine(policy_path)
+    assert policy_engine.decide("ai", "suggest_tests").decision == ALLOW
+    
+    policy_path.write_text("policy: [not, a, mapping\n")
+    os.utime(policy_path, ns=(1, 1))
+    
+    assert policy_engine.reload_if_changed() is False
+    assert policy_engine.reload_error is not None
+    assert policy_engine.decide("ai", "suggest_tests").decision == ALLOW
+    
+    write_policy(policy_path, prohibited=["suggest_tests"])
+    os.utime(policy_path, ns=(2, 2))
+    
+    assert policy_engine.reload_if_changed() is True
+    assert policy_engine.reload_error is None
+    assert policy_engine.decide("ai", "suggest_tests").decision == DENY
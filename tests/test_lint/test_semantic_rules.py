@@ -0,0 +1,116 @@
+"""Tests for lint/semantic_rules.py."""
+
+import copy
+
+import pytest
+from jsonschema import Draft7Validator
+
+from schema_registry import SchemaRegistry
+from semantic_rules import evaluate, invariant_table, map_errors
+
+
+@pytest.fixture(scope="module")
+def registry():
+    return SchemaRegistry()
+
+
+def mapped(registry, schema_name, artifact):
+    """(field, keyword, invariant) of every validation error of artifact."""
+    validator = registry.get_validator(schema_name)
+    return {
+        (".".join(str(part) for part in error.absolute_path), error.validator, invariant)
+        for invariant, error in map_errors(validator.iter_errors(artifact), validator.schema)
+    }
+
+
+def test_missing_required_field_without_invariant_maps_to_none(registry, artifact_chain):
+    brief = artifact_chain["brief"]
+    del brief["tests"]
+    
+    assert mapped(registry, "automation_brief.schema.json", brief) == {("", "required", None)}
+
+
+@pytest.mark.parametrize("field, invariant", [
+    ("id", "INV-001"),
+    ("owner", "INV-020"),
+    ("supports_upper_layer", "INV-003"),
+])
+def test_missing_governed_field_maps_to_its_invariant(registry, artifact_chain, field, invariant):
+    brief = artifact_chain["brief"]
+    del brief[field]
+    
+    assert ("", "required", invariant) in mapped(registry, "automation_brief.schema.json", brief)
+
+
+def test_upstream_pattern_error_maps_to_inv_003(registry, artifact_chain):
+    brief = artifact_chain["brief"]
+    brief["supports_upper_layer"] = "flow_not_a_track_v1"
+    
+    assert mapped(registry, "automation_brief.schema.json", brief) == {
+        ("supports_upper_layer", "pattern", "INV-003"),
+    }
+
+
+def test_id_pattern_error_maps_to_inv_002(registry, artifact_chain):
+    brief = artifact_chain["brief"]
+    brief["id"] = "brief_unversioned"
+    
+    assert mapped(registry, "automation_brief.schema.json", brief) == {
+        ("id", "pattern", "INV-002"),
+    }
+
+
+def test_field_whose_path_contains_id_is_not_an_id_error(registry, artifact_chain):
+    brief = artifact_chain["brief"]
+    brief["lineage"]["signature"] = {"algorithm": "ed25519", "key_id": 5, "value": "x"}
+    
+    errors = mapped(registry, "automation_brief.schema.json", brief)
+    
+    assert ("lineage.signature.key_id", "type", None) in errors
+    assert all(invariant is None for _, _, invariant in errors)
+
+
+def test_edited_schema_with_same_id_gets_its_own_table(registry):
+    schema = registry.get_schema("automation_brief.schema.json")
+    edited = copy.deepcopy(schema)
+    edited["required"].remove("owner")
+    
+    assert ("owner", "required") in invariant_table(schema)
+    assert ("owner", "required") not in invariant_table(edited)
+    errors = Draft7Validator(edited).iter_errors({})
+    assert "INV-020" not in {invariant for invariant, _ in map_errors(errors, edited)}
+
+
+def test_evaluate_reports_failing_rows_only():
+    artifacts = [
+        {"id": "mission_ok_v1", "level": "mission", "lineage": {"upstream_hash": None}},
+        {"id": "brief_unversioned", "level": "brief", "supports_upper_layer": "track_x_v1"},
+        {"id": "track_x_v1", "level": "track"},
+        {"id": "mission_rooted_v1", "level": "mission", "lineage": {"upstream_hash": "sha256:x"}},
+        {"id": 7, "level": "brief", "supports_upper_layer": "track_x_v1"},
+    ]
+    
+    errors = evaluate(artifacts)
+    
+    found = {
+        row: [(error["invariant"], error["field"]) for error in row_errors]
+        for row, row_errors in errors.items()
+    }
+    assert found == {
+        1: [("INV-002", "id")],
+        2: [("INV-003", "supports_upper_layer")],
+        3: [("INV-003", "lineage.upstream_hash")],
+        4: [("INV-002", "id")],
+    }
+
+
+def test_evaluate_matches_one_artifact_at_a_time(artifact_chain):
+    artifacts = list(artifact_chain.values())
+    artifacts[1] = dict(artifacts[1], id="flow_unversioned")
+    artifacts[2] = dict(artifacts[2], supports_upper_layer=None)
+    
+    batch = evaluate(artifacts)
+    
+    for row, artifact in enumerate(artifacts):
+        assert batch.get(row, []) == evaluate([artifact]).get(0, [])
+    assert set(batch) == {1, 2}
@@ -0,0 +1,93 @@
+"""Tests for the request checks of lint/serve.py on a TCP port."""
+
+import http.client
+import json
+import threading
+
+import pytest
+
+from serve import ValidationService, make_server
+
+
+@pytest.fixture
+def server(examples_tree):
+    service = ValidationService([examples_tree], recursive=True, confined=True)
+    service.load()
+    server = make_server(service, None, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, endpoint, request, host=None, content_type="application/json"):
+    port = server.server_address[1]
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    try:
+        headers = {"Host": host or f"127.0.0.1:{port}", "Content-Type": content_type}
+        conn.request("POST", endpoint, json.dumps(request), headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_file_in_served_tree_is_validated(server, examples_tree):
+    path = examples_tree / "mission_definition.example.yaml"
+    
+    status, result = post(server, "/validate", {"path": str(path)})
+    
+    assert status == 200
+    assert result["passed"] is True
+
+
+def test_localhost_name_is_allowed(server, examples_tree):
+    path = examples_tree / "mission_definition.example.yaml"
+    host = f"localhost:{server.server_address[1]}"
+    
+    assert post(server, "/validate", {"path": str(path)}, host=host)[0] == 200
+
+
+@pytest.mark.parametrize("host", ["evil.example:8765", "127.0.0.1", "localhost:1"])
+def test_other_host_is_refused(server, examples_tree, host):
+    path = examples_tree / "mission_definition.example.yaml"
+    
+    assert post(server, "/validate", {"path": str(path)}, host=host)[0] == 403
+
+
+@pytest.mark.parametrize("content_type", ["text/plain", "application/x-www-form-urlencoded"])
+def test_non_json_content_type_is_refused(server, examples_tree, content_type):
+    path = examples_tree / "mission_definition.example.yaml"
+    
+    status, _ = post(server, "/validate", {"path": str(path)}, content_type=content_type)
+    
+    assert status == 400
+
+
+def test_path_outside_served_tree_is_refused(server, tmp_path):
+    outside = tmp_path / "secret.yaml"
+    outside.write_text("password: hunter2\n")
+    
+    status, result = post(server, "/validate", {"path": str(outside)})
+    
+    assert status == 403
+    assert "hunter2" not in json.dumps(result)
+
+
+def test_symlink_out_of_served_tree_is_refused(server, examples_tree, tmp_path):
+    outside = tmp_path / "secret.yaml"
+    outside.write_text("password: hunter2\n")
+    (examples_tree / "link.yaml").symlink_to(outside)
+    
+    assert post(server, "/validate", {"path": str(examples_tree / "link.yaml")})[0] == 403
+
+
+def test_batch_refuses_outside_items_only(server, examples_tree):
+    inside = str(examples_tree / "mission_definition.example.yaml")
+    items = [{"op": "hash", "path": inside}, {"op": "hash", "path": "/etc/passwd"}]
+    
+    status, response = post(server, "/batch", {"requests": items})
+    
+    assert status == 200
+    assert "error" not in response["results"][0]
+    assert "outside the served tree" in response["results"][1]["error"]
@@ -0,0 +1,83 @@
+"""Tests for lint/validate_log.py (INV-010)."""
+
+import re
+
+import pytest
+
+from validate_log import seal_log, verify_log, verify_log_full
+
+NEW_ENTRY = '''    - date: "2026-01-07"
+      summary: "Training finished."
+'''
+
+
+@pytest.fixture
+def sealed_log(examples_tree):
+    path = examples_tree / "documentation_log.example.yaml"
+    assert seal_log(path) == 2
+    return path
+
+
+def edit(path, old, new):
+    text = path.read_text()
+    assert old in text
+    path.write_text(text.replace(old, new, 1))
+
+
+def append_entry(path):
+    edit(path, "  entries:\n", "  entries:\n" + NEW_ENTRY)
+
+
+def test_sealed_log_verifies(sealed_log):
+    result, checkpoint = verify_log_full(sealed_log)
+    
+    assert result["passed"], result["errors"]
+    assert checkpoint["entries"] == 2
+
+
+def test_modified_entry_is_detected(sealed_log):
+    edit(sealed_log, "Prepared training environment", "Skipped training environment")
+    
+    result, checkpoint = verify_log_full(sealed_log)
+    
+    assert not result["passed"]
+    assert checkpoint is None
+
+
+def test_new_entries_verify_from_checkpoint(sealed_log):
+    _, checkpoint = verify_log_full(sealed_log)
+    append_entry(sealed_log)
+    assert seal_log(sealed_log) == 1
+    
+    result, new_checkpoint = verify_log(sealed_log, checkpoint)
+    
+    assert result["passed"], result["errors"]
+    assert result["entries_checked"] == 2
+    assert new_checkpoint["entries"] == 3
+
+
+def test_modified_checkpointed_entry_is_detected(sealed_log):
+    _, checkpoint = verify_log_full(sealed_log)
+    edit(sealed_log, "Started model retraining", "Abandoned model retraining")
+    
+    result, _ = verify_log(sealed_log, checkpoint)
+    
+    assert not result["passed"]
+
+
+def test_rechained_rewrite_is_detected(sealed_log):
+    _, checkpoint = verify_log_full(sealed_log)
+    edit(sealed_log, "Prepared training environment", "Skipped training environment")
+    # Strip every digest and re-seal, so the rewritten chain is self-consistent
+    sealed_log.write_text(re.sub(r"\n +entry_hash: .*", "", sealed_log.read_text()))
+    seal_log(sealed_log)
+    
+    assert verify_log_full(sealed_log)[0]["passed"]
+    assert not verify_log(sealed_log, checkpoint)[0]["passed"]
+
+
+def test_seal_refuses_modified_entries(sealed_log):
+    edit(sealed_log, "Prepared training environment", "Skipped training environment")
+    
+    with pytest.raises(ValueError):
+        seal_log(sealed_log)
@@ -0,0 +1,71 @@
+"""Tests for lint/verify_signature.py."""
+
+import base64
+
+import pytest
+
+from compute_hash import compute_hash
+from verify_signature import load_keyring, signature_claim, verify_claims
+
+ed25519 = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.ed25519")
+
+
+@pytest.fixture
+def private_key():
+    return ed25519.Ed25519PrivateKey.generate()
+
+
+def write_keyring(path, private_key, window):
+    public_key = base64.b64encode(private_key.public_key().public_bytes_raw()).decode()
+    path.write_text(
+        "keyring:\n"
+        '  - key_id: "vpe-2026"\n'
+        '    identity: "vp_of_engineering"\n'
+        '    algorithm: "ed25519"\n'
+        f'    public_key: "{public_key}"\n'
+        f"{window}"
+    )
+    return load_keyring(path)
+
+
+def signed(artifact, private_key):
+    artifact["lineage"]["signed_by"] = "vp_of_engineering"
+    value = private_key.sign(compute_hash(artifact).encode("utf-8"))
+    artifact["lineage"]["signature"] = {
+        "key_id": "vpe-2026",
+        "algorithm": "ed25519",
+        "value": base64.b64encode(value).decode(),
+    }
+    return signature_claim(artifact, "mission.yaml")
+
+
+def test_signature_within_key_window_verifies(mission_artifact, private_key, tmp_path):
+    # YAML dates and ISO strings both bound the validity window
+    keyring = write_keyring(
+        tmp_path / "keyring.yaml", private_key,
+        "    not_before: 2026-01-01\n    not_after: \"2027-01-01T00:00:00Z\"\n",
+    )
+    
+    result = verify_claims([signed(mission_artifact, private_key)], keyring)
+    
+    assert result["passed"], result["errors"]
+    assert result["signatures_verified"] == 1
+
+
+def test_signature_outside_key_window_fails(mission_artifact, private_key, tmp_path):
+    keyring = write_keyring(tmp_path / "keyring.yaml", private_key, "    not_after: 2026-01-01\n")
+    
+    result = verify_claims([signed(mission_artifact, private_key)], keyring)
+    
+    assert not result["passed"]
+    assert "was not valid at" in result["errors"][0]["message"]
+
+
+def test_tampered_artifact_fails(mission_artifact, private_key, tmp_path):
+    keyring = write_keyring(tmp_path / "keyring.yaml", private_key, "")
+    claim = signed(mission_artifact, private_key)
+    mission_artifact["title"] = "Changed after signing"
+    tampered = signature_claim(mission_artifact, "mission.yaml")
+    
+    assert verify_claims([claim], keyring)["passed"]
+    assert not verify_claims([tampered], keyring)["passed"]